@@ -12,37 +12,73 @@ __author__ = "Thomaz"
 __license__ = "MIT"
 
 
+import importlib
 import logging
 
-from pygmc.connection import Connection, Discovery
-from pygmc.connection.udev_rule_check import UDevRuleCheck
-from pygmc.devices import (
-    GMC300,
-    GMC300S,
-    GMC320,
-    GMC320S,
-    GMC500,
-    GMC600,
-    GMC800,
-    GMCSE,
-    GMC300EPlus,
-    GMC320Plus,
-    GMC320PlusV5,
-    GMC500Plus,
-    GMC600Plus,
-)
-from pygmc.devices import (
-    auto_get_device_from_discovery_details as _auto_get_device_class,
+logger = logging.getLogger(__name__)
+
+# Imported lazily (PEP 562 module __getattr__) so `import pygmc` & the CLI start fast.
+# e.g. pyserial & the device classes are only imported once they're used.
+_lazy_attributes = {
+    "Connection": "pygmc.connection",
+    "Discovery": "pygmc.connection",
+    "UDevRuleCheck": "pygmc.connection.udev_rule_check",
+    "GMC300": "pygmc.devices",
+    "GMC300S": "pygmc.devices",
+    "GMC320": "pygmc.devices",
+    "GMC320S": "pygmc.devices",
+    "GMC500": "pygmc.devices",
+    "GMC600": "pygmc.devices",
+    "GMC800": "pygmc.devices",
+    "GMCSE": "pygmc.devices",
+    "GMC300EPlus": "pygmc.devices",
+    "GMC320Plus": "pygmc.devices",
+    "GMC320PlusV5": "pygmc.devices",
+    "GMC500Plus": "pygmc.devices",
+    "GMC600Plus": "pygmc.devices",
+    "HistoryParser": "pygmc.history",
+    "PollScheduler": "pygmc.scheduler",
+    "RollingStats": "pygmc.stats",
+}
+_lazy_submodules = (
+    "broker",
+    "cache",
+    "cli",
+    "connection",
+    "devices",
+    "history",
+    "history_arrow",
+    "history_columnar",
+    "history_frames",
+    "scheduler",
+    "stats",
+    "store",
 )
-from pygmc.history import HistoryParser
 
-logger = logging.getLogger(__name__)
+
+def __getattr__(name):
+    """Import public classes & submodules on first use."""
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # only look it up once
+    return value
+
+
+def __dir__():
+    """List lazy attributes too (for auto-complete)."""
+    return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
 
 
 def connect(
     port=None,
     baudrate=None,
     timeout=5,
+    use_cache=True,
+    adaptive_timeout=False,
 ):
     """
     Connect to device.
@@ -64,17 +100,34 @@ def connect(
         is specified.
     timeout: int
         Time limit for pyserial to raise timeout.
+    use_cache: bool
+        Default=True tries the last known baudrate of each port first, which makes
+        reconnecting nearly instant. Set False to always run the full discovery.
+    adaptive_timeout: bool
+        Default=False. True limits each command's read to the time its response should
+        take (measured), so a lost reply fails in milliseconds instead of timeout.
+        See pygmc.connection.Connection
 
     Raises
     ------
     ConnectionError
         Unable to connect to device.
     """
+    from .connection import Discovery
+    from .connection.udev_rule_check import UDevRuleCheck
+    from .devices import auto_get_device_from_discovery_details as _auto_get_device_class
+
     # Difficult choice... Discovery is temporary... and is nearly always instant or
     # requires user action to dis/re-connect USB. (i.e. nothing pygmc can do)
     # So why make a long timeout? Fail fast but override Discovery timeout or fail slow
     # and use user provided timeout?
-    discover = Discovery(port=port, baudrate=baudrate, timeout=timeout)
+    discover = Discovery(
+        port=port,
+        baudrate=baudrate,
+        timeout=timeout,
+        use_cache=use_cache,
+        keep_connections=True,
+    )
     discovered_devices = discover.get_all_devices()
 
     if len(discovered_devices) == 0:
@@ -90,8 +143,18 @@ def connect(
 
     device_class = _auto_get_device_class(device_details)
 
+    # Re-use the validated connection instead of re-opening the port
+    connection = discover.pop_connection(device_details)
+    discover.close_connections()
+
     gc = device_class(
-        port=device_details.port, baudrate=device_details.baudrate, timeout=timeout
+        port=device_details.port,
+        baudrate=device_details.baudrate,
+        timeout=timeout,
+        connection=connection,
     )
+    gc.connection.adaptive_timeout = adaptive_timeout
+    # config is restored from the on-disk cache if this device was seen before
+    gc.set_identity(device_details.serial_number, device_details.version)
 
     return gc
@@ -0,0 +1,428 @@
+"""
+Share GMC devices between processes.
+
+Only one process can hold a serial port. The broker owns the device connection(s) and
+serves the device methods over a Unix domain socket. BrokerDevice is the client side
+and has the same methods as the device classes e.g. GMC500Plus.
+"""
+
+import datetime
+import getpass
+import logging
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+
+logger = logging.getLogger("pygmc.broker")
+
+
+# Frame: 4 byte big-endian payload length then payload.
+# Request payload: 1 byte opcode then encoded value.
+# Response payload: 1 byte status then encoded value.
+_FRAME_HEADER = struct.Struct(">I")
+_OP_LIST = 0
+_OP_CALL = 1
+_STATUS_OK = 0
+_STATUS_ERROR = 1
+
+# Generators & printing don't make sense across a socket
+_NOT_SERVED = (
+    "heartbeat_live",
+    "heartbeat_live_print",
+    "heartbeat_samples",
+    "iter_raw_history",
+    "iter_history_data",
+)
+
+# Error types the client re-raises as-is. Anything else is raised as RuntimeError.
+_KNOWN_ERRORS = {
+    x.__name__: x
+    for x in (
+        AttributeError,
+        ConnectionError,
+        KeyError,
+        NotImplementedError,
+        RuntimeError,
+        TimeoutError,
+        TypeError,
+        ValueError,
+    )
+}
+
+
+def get_default_socket_path() -> str:
+    """
+    Get default broker socket path.
+
+    Uses $XDG_RUNTIME_DIR when available (per-user & private), else the temp dir.
+
+    Returns
+    -------
+    str
+
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, "pygmc-broker.sock")
+
+
+# Compact tagged binary encoding for values that device methods take & return.
+_INT = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+_SIZE = struct.Struct(">I")
+_DATETIME = struct.Struct(">HBBBBBI")
+
+
+def _encode(value, out: bytearray) -> None:
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"i" + _INT.pack(value)
+    elif isinstance(value, float):
+        out += b"d" + _FLOAT.pack(value)
+    elif isinstance(value, str):
+        raw = value.encode("utf8")
+        out += b"s" + _SIZE.pack(len(raw)) + raw
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"b" + _SIZE.pack(len(value)) + value
+    elif isinstance(value, datetime.datetime):
+        out += b"D" + _DATETIME.pack(
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+        )
+    elif isinstance(value, (tuple, list)):
+        out += (b"t" if isinstance(value, tuple) else b"l") + _SIZE.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out += b"m" + _SIZE.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        raise TypeError(f"Unable to encode type={type(value)}")
+
+
+def _decode(data: bytes, i: int = 0) -> tuple:
+    """Decode value at position i. Returns (value, next position)."""
+    tag = data[i : i + 1]
+    i += 1
+    if tag == b"N":
+        return None, i
+    if tag == b"T":
+        return True, i
+    if tag == b"F":
+        return False, i
+    if tag == b"i":
+        return _INT.unpack_from(data, i)[0], i + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, i)[0], i + _FLOAT.size
+    if tag in (b"s", b"b"):
+        size = _SIZE.unpack_from(data, i)[0]
+        i += _SIZE.size
+        raw = bytes(data[i : i + size])
+        return (raw.decode("utf8") if tag == b"s" else raw), i + size
+    if tag == b"D":
+        return datetime.datetime(*_DATETIME.unpack_from(data, i)), i + _DATETIME.size
+    if tag in (b"t", b"l"):
+        count = _SIZE.unpack_from(data, i)[0]
+        i += _SIZE.size
+        items = []
+        for _ in range(count):
+            item, i = _decode(data, i)
+            items.append(item)
+        return (tuple(items) if tag == b"t" else items), i
+    if tag == b"m":
+        count = _SIZE.unpack_from(data, i)[0]
+        i += _SIZE.size
+        d = {}
+        for _ in range(count):
+            key, i = _decode(data, i)
+            d[key], i = _decode(data, i)
+        return d, i
+    raise ValueError(f"Unknown tag={tag}")
+
+
+def _dumps(value) -> bytes:
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def _loads(data: bytes):
+    value, _ = _decode(data)
+    return value
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise EOFError("Socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _send_frame(sock, payload: bytes) -> None:
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_frame(sock) -> bytes:
+    size = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))[0]
+    return _recv_exact(sock, size)
+
+
+class _Call:
+    """An in-flight device call other clients can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _CoalescingDevice:
+    """
+    Serialize calls to a device and coalesce identical concurrent reads.
+
+    Only one serial transaction runs at a time. A get_* call identical to one already
+    in-flight (queued or running) waits for that result instead of adding another
+    serial transaction.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self._serial_lock = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight = {}
+
+    def _run(self, method, args, kwargs):
+        with self._serial_lock:
+            return getattr(self.device, method)(*args, **kwargs)
+
+    def call(self, method: str, args: tuple, kwargs: dict):
+        if not method.startswith("get_"):
+            # writes/actions are never merged
+            return self._run(method, args, kwargs)
+
+        key = _dumps((method, args, sorted(kwargs.items())))
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._inflight[key] = call
+
+        if is_leader:
+            try:
+                call.result = self._run(method, args, kwargs)
+            except Exception as e:  # noqa - handed to every waiting client
+                call.error = e
+            finally:
+                with self._inflight_lock:
+                    del self._inflight[key]
+                call.done.set()
+        else:
+            logger.debug(f"Coalesced {method}{args}")
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class _BrokerRequestHandler(socketserver.BaseRequestHandler):
+    """Serve requests from one client until it disconnects."""
+
+    def handle(self):
+        while True:
+            try:
+                payload = _recv_frame(self.request)
+            except (EOFError, ConnectionError):
+                return
+
+            try:
+                result = self.server.broker._dispatch(payload)
+                response = bytes([_STATUS_OK]) + _dumps(result)
+            except Exception as e:  # noqa - error goes back to the client
+                logger.debug(f"Request failed: {e!r}")
+                response = bytes([_STATUS_ERROR]) + _dumps((type(e).__name__, str(e)))
+
+            _send_frame(self.request, response)
+
+
+class Broker:
+    """Serve GMC device methods to other processes over a Unix domain socket."""
+
+    def __init__(self, devices: dict, socket_path=None):
+        """
+        Represent a device broker.
+
+        Parameters
+        ----------
+        devices: dict
+            Devices to serve e.g. {serial_number: GMC500Plus(...)}
+            The first device is the default device for clients.
+        socket_path: str | None
+            Unix socket path. Default=None uses get_default_socket_path()
+        """
+        if not devices:
+            raise ValueError("Broker needs at least one device.")
+        server_class = getattr(socketserver, "ThreadingUnixStreamServer", None)
+        if server_class is None:
+            raise OSError("Unix domain sockets are not available on this platform.")
+
+        self.socket_path = socket_path or get_default_socket_path()
+        self._devices = {key: _CoalescingDevice(x) for key, x in devices.items()}
+        self._default_key = next(iter(self._devices))
+
+        self._remove_stale_socket()
+        self._server = server_class(self.socket_path, _BrokerRequestHandler)
+        self._server.daemon_threads = True  # don't block exit on idle clients
+        self._server.broker = self
+        # local IPC for the current user only
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Broker listening on {self.socket_path}")
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            logger.debug(f"Removing stale socket {self.socket_path}")
+            os.remove(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise OSError(f"A broker is already listening on {self.socket_path}")
+
+    def _dispatch(self, payload: bytes):
+        op = payload[0]
+        if op == _OP_LIST:
+            return list(self._devices)
+        if op != _OP_CALL:
+            raise ValueError(f"Unknown op={op}")
+
+        key, method, args, kwargs = _loads(payload[1:])
+        if key is None:
+            key = self._default_key
+        if key not in self._devices:
+            raise KeyError(f"No device={key}")
+
+        device = self._devices[key]
+        if method.startswith("_") or method in _NOT_SERVED:
+            raise AttributeError(f"Method not served by broker: {method}")
+        if not hasattr(device.device, method):
+            raise AttributeError(f"Device has no method: {method}")
+
+        return device.call(method, tuple(args), kwargs)
+
+    def serve_forever(self) -> None:
+        """Serve clients until shutdown() is called."""
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever(). Must be called from another thread."""
+        self._server.shutdown()
+
+    def close(self) -> None:
+        """Close the socket & device connections."""
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        for device in self._devices.values():
+            device.device.connection.close_connection()
+
+
+class BrokerDevice:
+    """
+    Client for a device served by a pygmc broker.
+
+    Has the same methods as the served device class e.g. gc.get_cpm()
+    """
+
+    def __init__(self, serial_number=None, socket_path=None, timeout=60):
+        """
+        Represent a device served by a broker.
+
+        Parameters
+        ----------
+        serial_number: str | None
+            Device to use. Default=None uses the broker's default (first) device.
+        socket_path: str | None
+            Broker socket path. Default=None uses get_default_socket_path()
+        timeout: int | float
+            Socket timeout in seconds. Keep it longer than the slowest device method.
+        """
+        self._serial_number = serial_number
+        self._socket_path = socket_path or get_default_socket_path()
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(self._socket_path)
+
+    def __repr__(self):
+        """Show which broker & device."""
+        return f"BrokerDevice(serial_number={self._serial_number}, socket_path={self._socket_path})"
+
+    def _request(self, payload: bytes):
+        with self._lock:
+            _send_frame(self._sock, payload)
+            response = _recv_frame(self._sock)
+
+        value = _loads(response[1:])
+        if response[0] == _STATUS_OK:
+            return value
+        name, msg = value
+        raise _KNOWN_ERRORS.get(name, RuntimeError)(msg)
+
+    def _call(self, method: str, *args, **kwargs):
+        call = (self._serial_number, method, args, kwargs)
+        return self._request(bytes([_OP_CALL]) + _dumps(call))
+
+    def __getattr__(self, name):
+        """Proxy device methods to the broker."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def remote_method(*args, **kwargs):
+            return self._call(name, *args, **kwargs)
+
+        remote_method.__name__ = name
+        return remote_method
+
+    def list_devices(self) -> list:
+        """
+        List devices served by the broker.
+
+        Returns
+        -------
+        list
+            Device keys (serial numbers)
+
+        """
+        return self._request(bytes([_OP_LIST]))
+
+    def set_wifi_password(self, password=None, bytes_encoding: str = "utf8"):
+        """Set WiFi password. Prompts locally, not on the broker, when None."""
+        if password is None:
+            password = getpass.getpass()
+        return self._call("set_wifi_password", password, bytes_encoding=bytes_encoding)
+
+    def close(self) -> None:
+        """Close connection to the broker. The device stays open in the broker."""
+        self._sock.close()
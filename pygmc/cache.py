@@ -0,0 +1,106 @@
+"""
+Small persistent caches.
+
+PyGMC remembers slow-to-learn facts about devices (e.g. baudrate) between processes so
+the next run doesn't have to learn them again. Everything here is best effort; a
+missing, corrupt, or read-only cache is logged and ignored, never raised.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger("pygmc.cache")
+
+
+def get_cache_dir() -> Path:
+    """
+    Get pygmc cache directory.
+
+    $XDG_CACHE_HOME/pygmc (default ~/.cache/pygmc) or %LOCALAPPDATA%/pygmc on Windows.
+
+    Returns
+    -------
+    Path
+
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = Path.home() / ".cache"
+    return Path(base) / "pygmc"
+
+
+class JsonCache:
+    """A dict persisted as a JSON file in the pygmc cache directory."""
+
+    def __init__(self, name, cache_dir=None):
+        """
+        Represent a JSON file cache.
+
+        Parameters
+        ----------
+        name: str
+            Cache name, used as file name e.g. 'discovery' -> discovery.json
+        cache_dir: str | Path | None
+            Default=None uses get_cache_dir()
+        """
+        cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+        self.path = cache_dir / f"{name}.json"
+
+    def load(self) -> dict:
+        """
+        Load cache.
+
+        Returns
+        -------
+        dict
+            Empty dict if cache is missing or unreadable.
+
+        """
+        try:
+            with open(self.path, encoding="utf8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache {self.path}: {e}")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+
+    def get(self, key: str, default=None):
+        """Get cached value for key."""
+        return self.load().get(key, default)
+
+    def set(self, key: str, value) -> None:
+        """Set & persist key. Value must be JSON serializable."""
+        data = self.load()
+        data[key] = value
+        self._save(data)
+
+    def delete(self, key: str) -> None:
+        """Remove key if cached."""
+        data = self.load()
+        if data.pop(key, None) is not None:
+            self._save(data)
+
+    def _save(self, data: dict) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # write-then-rename so readers in other processes never see half a file
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        except OSError as e:
+            logger.warning(f"Unable to write cache {self.path}: {e}")
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Unable to write cache {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -5,15 +5,9 @@ import datetime
 from pathlib import Path
 
 try:
-    from .connection import (
-        Discovery,
-        get_all_usb_devices,
-        get_gmc_usb_devices,
-    )
-    from .connection.udev_rule_check import UDevRuleCheck
-    from .devices import (
-        auto_get_device_from_discovery_details as _auto_get_device_class,
-    )
+    # Only the light-weight package. Discovery, devices, etc. are imported when an
+    # action needs them so e.g. `pygmc --help` & `pygmc usb` start fast.
+    from . import connection  # noqa: F401
 except ImportError:
     # Most likely error while trying 'python ./some_path/pygmc/cli.py --help'
     # ImportError: attempted relative import beyond top-level package
@@ -75,10 +69,32 @@ parser_history.add_argument(
 parser_history.add_argument(
     "--raw", action="store_true", help="Save raw as-is/unmodified device history."
 )
+parser_history.add_argument(
+    "--format",
+    choices=["csv", "col", "parquet"],
+    default="csv",
+    help="Tidy history file format. col is a compact columnar binary file. "
+    "parquet needs pyarrow installed.",
+)
+
+# ACTION - broker
+parser_broker = subparsers.add_parser(
+    "broker",
+    help="Share the GMC device(s) with other processes over a Unix socket.",
+)
+parser_broker.add_argument(
+    "-s",
+    "--socket",
+    type=str,
+    default=None,
+    help="Unix socket path. Default=None uses $XDG_RUNTIME_DIR/pygmc-broker.sock",
+)
 
 
 def _list_usb_flow(show_all=False):
     """Print simple information on USB devices."""
+    from .connection.utils import get_all_usb_devices, get_gmc_usb_devices
+
     if show_all:
         usbs = get_all_usb_devices()
     else:
@@ -88,10 +104,15 @@ def _list_usb_flow(show_all=False):
         print(f"device={usb.device} description={usb.description} hwid={usb.hwid}")
 
 
-def _get_gc(args):
-    """Get geiger-counter-class with provided info from pygmc Discovery."""
+def _discover(args):
+    """Get Discovery with validated connections kept open or raise ConnectionError."""
+    from .connection.discovery import Discovery
+    from .connection.udev_rule_check import UDevRuleCheck
+
     # Ugh... violating D.R.Y.
-    discover = Discovery(port=args.port, baudrate=args.baudrate, timeout=5)
+    discover = Discovery(
+        port=args.port, baudrate=args.baudrate, timeout=5, keep_connections=True
+    )
     discovered_devices = discover.get_all_devices()
     if len(discovered_devices) == 0:
         # Give user direction in case of brltty udev rule blocking GMC USB device
@@ -99,12 +120,29 @@ def _get_gc(args):
         # line below logs & prints info for user to resolve USB connection issue
         brltty_udev_rule_check.get_offending_brltty_rules()
         raise ConnectionError("No GMC devices found.")
+    return discover
+
+
+def _get_device(discover, device_details):
+    """Get device class instance re-using the discovery connection."""
+    from .devices import auto_get_device_from_discovery_details as _auto_get_device_class
 
-    device_details = discovered_devices[0]
     device_class = _auto_get_device_class(device_details)
     gc = device_class(
-        port=device_details.port, baudrate=device_details.baudrate, timeout=5
+        port=device_details.port,
+        baudrate=device_details.baudrate,
+        timeout=5,
+        connection=discover.pop_connection(device_details),
     )
+    gc.set_identity(device_details.serial_number, device_details.version)
+    return gc
+
+
+def _get_gc(args):
+    """Get geiger-counter-class with provided info from pygmc Discovery."""
+    discover = _discover(args)
+    gc = _get_device(discover, discover.get_all_devices()[0])
+    discover.close_connections()
     return gc
 
 
@@ -123,12 +161,18 @@ def _live_flow(args):
 
 
 def _cli_flow_save(args):
-    """Save device history as tidy CSV or raw data."""
+    """Save device history as tidy CSV, tidy columnar or raw data."""
     if args.file_name.exists():
         # Rather give user an error than the alternative... (why you edit my file)
         raise FileExistsError(f"File exists: {args.file_name}")
     gc = _get_gc(args)
-    if not args.raw:
+    file_format = getattr(args, "format", "csv")
+    if not args.raw and file_format == "col":
+        # tidy but small & quick to load
+        gc.save_history_columnar(args.file_name)
+    elif not args.raw and file_format == "parquet":
+        gc.save_history_parquet(args.file_name)
+    elif not args.raw:
         # user want's pygmc tidy data... good Lad or Lass or
         # Shklee or Shklim or Shkler (Futurama)
         gc.save_history_csv(args.file_name)
@@ -137,6 +181,30 @@ def _cli_flow_save(args):
         gc.save_history_raw(args.file_name)
 
 
+def _broker_flow(args):
+    """Serve every discovered device to other processes until Ctrl+C."""
+    from .broker import Broker
+
+    discover = _discover(args)
+    devices = {}
+    for device_details in discover.get_all_devices():
+        if device_details.serial_number in devices:
+            # same device via a sym-link
+            continue
+        devices[device_details.serial_number] = _get_device(discover, device_details)
+        print(f"Serving {device_details.version} serial={device_details.serial_number}")
+    discover.close_connections()
+
+    broker = Broker(devices, socket_path=args.socket)
+    print(f"PyGMC broker listening on {broker.socket_path} (Ctrl+C to stop)")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
+
+
 def main(argv=None) -> None:
     """
     CLI entry point.
@@ -159,6 +227,8 @@ def main(argv=None) -> None:
         _live_flow(args)
     elif args.actions == "save":
         _cli_flow_save(args)
+    elif args.actions == "broker":
+        _broker_flow(args)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,37 @@
-from .connection import Connection
-from .const import BAUDRATES
-from .discovery import Discovery
-from .utils import get_all_usb_devices, get_gmc_usb_devices
+import importlib
+
+# Imported lazily (PEP 562) so e.g. `pygmc usb` doesn't import discovery & friends.
+_lazy_attributes = {
+    "Connection": "pygmc.connection.connection",
+    "BAUDRATES": "pygmc.connection.const",
+    "Discovery": "pygmc.connection.discovery",
+    "get_all_usb_devices": "pygmc.connection.utils",
+    "get_gmc_usb_devices": "pygmc.connection.utils",
+    "HotplugEvent": "pygmc.connection.watcher",
+    "HotplugWatcher": "pygmc.connection.watcher",
+}
+_lazy_submodules = (
+    "connection",
+    "const",
+    "discovery",
+    "udev_rule_check",
+    "utils",
+    "watcher",
+)
+
+
+def __getattr__(name):
+    """Import public classes, functions & submodules on first use."""
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # only look it up once
+    return value
+
+
+def __dir__():
+    """List lazy attributes too (for auto-complete)."""
+    return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
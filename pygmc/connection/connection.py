@@ -15,6 +15,14 @@ from .const import BAUDRATES
 
 logger = logging.getLogger("pygmc.connection")
 
+# Adaptive timeout defaults, see Connection(adaptive_timeout=True)
+# Time for the device to start replying, seconds; starting guess until measured
+_TURNAROUND = 0.03
+# Weight of the newest turnaround measurement in the moving average
+_TURNAROUND_ALPHA = 0.2
+# Floor so OS/USB scheduling jitter isn't mistaken for a lost reply
+_MIN_TIMEOUT = 0.05
+
 
 class Connection:
     """
@@ -23,7 +31,15 @@ class Connection:
     A wrapper around pyserial with common operations for a GMC device.
     """
 
-    def __init__(self, port, baudrate, timeout=5, serial_connection=None):
+    def __init__(
+        self,
+        port,
+        baudrate,
+        timeout=5,
+        serial_connection=None,
+        adaptive_timeout=False,
+        safety_factor=3,
+    ):
         """
         Represent a connection to a GMC device.
 
@@ -38,7 +54,19 @@ class Connection:
             Serial connection timeout, seconds, by default 5
         serial_connection: serial.Serial | None
             An initialized Serial instance.
+        adaptive_timeout: bool
+            Default=False. True gives each get_exact() with a known size its own time
+            limit from the response size, baudrate & measured device turnaround, capped
+            at timeout. A reply later than the limit is still waited for up to timeout
+            (never left for the next command) & the turnaround estimate is raised.
+        safety_factor: float
+            Adaptive time limit multiplier, by default 3
         """
+        self.adaptive_timeout = adaptive_timeout
+        self.safety_factor = safety_factor
+        # moving average of seconds from write to the first response byte
+        self.turnaround = _TURNAROUND
+
         # pyserial has a breaking change from 3.4 to 3.5
         # TypeError:
         #     SerialBase.read_until() got an unexpected keyword argument 'expected'
@@ -85,6 +113,50 @@ class Connection:
         # maybe a nicer str?
         return str(self.__repr__())
 
+    @property
+    def timeout(self):
+        """Serial read timeout in seconds (pyserial timeout)."""
+        return self._con.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._con.timeout = value
+
+    def _get_transfer_time(self, size: int) -> float:
+        """Seconds to send size bytes at the baudrate, 10 bits per byte (8N1)."""
+        baudrate = getattr(self._con, "baudrate", None)
+        if not baudrate:
+            return 0.0
+        return size * 10 / baudrate
+
+    def get_adaptive_timeout(self, size: int) -> float:
+        """
+        Get time limit to read a response of size bytes.
+
+        safety_factor * (transfer time + turnaround), capped at timeout.
+
+        Parameters
+        ----------
+        size: int
+            Expected response size in bytes.
+
+        Returns
+        -------
+        float
+            Seconds.
+
+        """
+        limit = self.safety_factor * (self._get_transfer_time(size) + self.turnaround)
+        limit = max(limit, _MIN_TIMEOUT)
+        if self.timeout is not None:
+            limit = min(limit, self.timeout)
+        return limit
+
+    def _update_turnaround(self, elapsed: float, size: int) -> None:
+        measured = max(elapsed - self._get_transfer_time(size), 0.0)
+        self.turnaround += _TURNAROUND_ALPHA * (measured - self.turnaround)
+        logger.log(level=9, msg=f"turnaround={self.turnaround:.4f}s")
+
     def get_connection_details(self) -> dict:
         """
         Get connection details.
@@ -198,7 +270,7 @@ class Connection:
 
         return result
 
-    def read_until(self, size=None, expected=b"") -> bytes:
+    def read_until(self, size=None, expected=b"", timeout=None) -> bytes:
         r"""
         Read device data until expected LF is reached or expected result size is reached.
 
@@ -212,16 +284,26 @@ class Connection:
             Length of expected bytes, by default None
         expected : bytes, optional
             Expected end character, by default b''
+        timeout : float | None, optional
+            Time limit for this read only, by default None uses the connection timeout
 
         Returns
         -------
         bytes
             Device response
         """
-        logger.debug(f"read_until(size={size}, expected={expected})")
+        logger.debug(f"read_until(size={size}, expected={expected}, timeout={timeout})")
         # This is to resolve pyserial breaking change. See __init__ above.
         params = {self._read_until_param_name: expected, "size": size}
-        result = self._con.read_until(**params)
+        if timeout is None:
+            result = self._con.read_until(**params)
+        else:
+            previous_timeout = self._con.timeout
+            self._con.timeout = timeout
+            try:
+                result = self._con.read_until(**params)
+            finally:
+                self._con.timeout = previous_timeout
         if len(result) <= 50:
             logger.debug(f"response={result}")
         else:
@@ -232,6 +314,35 @@ class Connection:
             logger.log(level=9, msg=f"response={result}")
         return result
 
+    def read_samples(self, size: int) -> bytes:
+        """
+        Read all complete fixed-size samples waiting in the buffer.
+
+        For streams e.g. heartbeat. Waits for one sample (or timeout) like
+        read_until(size=size) then also reads whatever else is waiting, in whole
+        samples. A partial sample stays in the buffer for the next read.
+
+        Parameters
+        ----------
+        size: int
+            Sample size in bytes.
+
+        Returns
+        -------
+        bytes
+            A multiple of size bytes; less than size on timeout.
+
+        """
+        result = self.read_until(size=size)
+        if len(result) < size:
+            return result
+        waiting = self._con.in_waiting
+        extra = waiting - waiting % size
+        if extra:
+            logger.debug(f"read_samples draining {extra} bytes")
+            result += self._con.read(extra)
+        return result
+
     def read_at_least(self, size, wait_sleep=0.05) -> bytes:
         """
         Read at least <size> bytes then wait <wait_sleep> and read the buffer.
@@ -333,7 +444,7 @@ class Connection:
         result = self.read_at_least(size=size, wait_sleep=wait_sleep)
         return result
 
-    def get_exact(self, cmd, size=None, expected=b"") -> bytes:
+    def get_exact(self, cmd, size=None, expected=b"", timeout=None) -> bytes:
         """
         Write and read exact.
 
@@ -349,6 +460,9 @@ class Connection:
             Expected response size, by default None
         expected : bytes, optional
             Expected end char, by default b''
+        timeout : float | None, optional
+            Time limit for this read only, by default None uses the connection timeout
+            or, with adaptive_timeout, a time limit for the response size.
 
         Returns
         -------
@@ -356,6 +470,26 @@ class Connection:
             Device response
         """
         logger.debug(f"get_exact(cmd={cmd}, size={size}, expected={expected})")
+        adaptive = self.adaptive_timeout and timeout is None and size and not expected
+        if adaptive:
+            timeout = self.get_adaptive_timeout(size)
+        start = time.monotonic()
         self.write(cmd)
-        result = self.read_until(expected=expected, size=size)
+        if timeout is None:
+            # keep the plain call, e.g. subclasses without the timeout parameter
+            return self.read_until(expected=expected, size=size)
+        result = self.read_until(expected=expected, size=size, timeout=timeout)
+        if not adaptive:
+            return result
+
+        if len(result) != size:
+            # slower than estimated, or no reply. Wait the rest of the connection
+            # timeout so a late reply isn't cut short or read as the next command's
+            logger.debug(f"Adaptive timeout={timeout:.3f}s too short for size={size}")
+            if not result:
+                # estimate may be far off, catch up faster than the moving average
+                self.turnaround = max(2 * self.turnaround, _MIN_TIMEOUT)
+            result += self.read_until(size=size - len(result))
+        if len(result) == size:
+            self._update_turnaround(time.monotonic() - start, size)
         return result
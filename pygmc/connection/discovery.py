@@ -1,14 +1,18 @@
 """Discover GMC devices."""
 
 import logging
+import os
 import re
+import threading
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from serial import SerialException
 
+from ..cache import JsonCache
 from .connection import Connection
 from .const import BAUDRATES
-from .utils import get_gmc_usb_devices
+from .utils import get_all_usb_devices, get_gmc_usb_devices
 
 logger = logging.getLogger("pygmc.discovery")
 
@@ -19,11 +23,29 @@ DeviceDetails = namedtuple(
     "Device", ["port", "baudrate", "version", "serial_number", "model", "revision"]
 )
 
+# Fast-fail probe timing. A wrong baudrate gets no (or garbage) reply, so rather than
+# waiting the full user timeout per candidate, wait only as long as a correct reply
+# could take at that baudrate.
+# <GETSERIAL>> is 12 bytes out & 7 bytes back, 10 bits per byte on the wire (8N1)
+_PROBE_BITS = (12 + 7) * 10
+# Time for the device to start replying, seconds (GMC's reply within a few ms)
+_PROBE_TURNAROUND = 0.03
+_PROBE_SAFETY_FACTOR = 2
+
 
 class Discovery:
     """Discover GMC Devices"""
 
-    def __init__(self, port=None, baudrate=None, timeout=3):
+    def __init__(
+        self,
+        port=None,
+        baudrate=None,
+        timeout=3,
+        max_workers=None,
+        use_cache=True,
+        keep_connections=False,
+        slow_sweep=False,
+    ):
         """
         Discover GMC devices.
 
@@ -33,9 +55,36 @@ class Discovery:
             Dev device, port, com, if known. Leave None to auto-discover all ports.
         baudrate: int | None
             Device baudrate, if known. Leave None to auto-discover correct baudrate.
+        timeout: int
+            Time limit for pyserial to raise timeout.
+        max_workers: int | None
+            Max number of ports probed concurrently. Default=None probes all ports at
+            once.
+        use_cache: bool
+            Default=True tries the last known baudrate of a port first (a single probe)
+            and remembers discovered devices. See pygmc.cache.get_cache_dir()
+        keep_connections: bool
+            Default=False closes every probe connection. True keeps the validated
+            connections open to be handed to a device class via pop_connection().
+            Call close_connections() to close any not taken.
+        slow_sweep: bool
+            Default=False, when no fast probe replies only the known baudrate (port's
+            cached baudrate or the baudrate parameter) is retried at the user timeout.
+            True retries every baudrate, slow: up to len(BAUDRATES) x timeout for a
+            port without a GMC.
         """
         self._timeout = timeout
+        self._slow_sweep = slow_sweep
+        self._max_workers = max_workers
         self._discovered_devices = []
+        # ports are probed from worker threads
+        self._lock = threading.Lock()
+        # port -> USB hwid, to tell if a cached port still has the same USB device
+        self._hwids = {}
+        self._cache = JsonCache("discovery") if use_cache else None
+        self._keep_connections = keep_connections
+        # port -> open validated Connection (only if keep_connections)
+        self._connections = {}
         self._discover_devices_flow(port=port, baudrate=baudrate)
 
     def _discover_devices_flow(self, port=None, baudrate=None) -> None:
@@ -43,7 +92,8 @@ class Discovery:
         self._discovered_devices = []
         if port and baudrate:
             # what are you doing in discovery?
-            self._validate_device(port, baudrate)
+            # user knows the baudrate, no need to fast-fail
+            self._validate_device(port, baudrate, fast=False)
         elif port and not baudrate:
             # likely the 2nd most used
             self._discover_with_known_port(port=port)
@@ -89,16 +139,45 @@ class Discovery:
             return m.groups()
         return "", ""
 
-    @staticmethod
-    def _get_gmc_usb_ports() -> list:
+    def _get_gmc_usb_ports(self) -> list:
         devices = get_gmc_usb_devices()
+        self._hwids.update({x.device: x.hwid for x in devices})
         ports = [x.device for x in devices]
         # make the list intuitive
         ports = sorted(ports)
         return ports
 
+    def _get_hwid(self, port) -> str:
+        if port not in self._hwids:
+            # port given by user i.e. not from _get_gmc_usb_ports()
+            hwids = {x.device: x.hwid for x in get_all_usb_devices()}
+            self._hwids[port] = hwids.get(port, "")
+        return self._hwids[port]
+
+    def _get_cached_baudrate(self, port):
+        """Get last known baudrate of the device on port, if it's the same USB device."""
+        if self._cache is None:
+            return None
+        entry = self._cache.get(port)
+        if not entry:
+            return None
+        if entry.get("hwid", "") != self._get_hwid(port):
+            logger.debug(f"Cache miss, different USB device on port={port}")
+            return None
+        logger.debug(f"Cache hit port={port}: {entry}")
+        return entry.get("baudrate")
+
+    def _cache_device(self, device_details) -> None:
+        if self._cache is None:
+            return
+        entry = device_details._asdict()
+        entry["hwid"] = self._get_hwid(device_details.port)
+        with self._lock:
+            self._cache.set(device_details.port, entry)
+
     @staticmethod
-    def _get_device_info(conn):
+    def _get_device_info(conn, version=True):
+        """Read serial number (& version) of a GMC on conn, None if no GMC replies."""
         if conn._con.in_waiting != 0:
             # don't intrude
             logger.debug(f"Device has non-zero bytes waiting in in-buffer ({conn._con})")
@@ -112,30 +191,71 @@ class Discovery:
         try:
             conn.reset_buffers()
             serial_number = conn.get_exact(b"<GETSERIAL>>", size=7).hex()
-            version = conn.get_at_least(b"<GETVER>>", size=7, wait_sleep=0.01).decode()
-            if serial_number and version:
-                return {"serial_number": serial_number, "version": version}
-            else:
+            if not serial_number:
                 return None
+            info = {"serial_number": serial_number}
+            if version:
+                info["version"] = conn.get_at_least(
+                    b"<GETVER>>", size=7, wait_sleep=0.01
+                ).decode()
         except Exception as e:
             # Unsure of exception types.
             logger.warning(f"{e}", exc_info=True)
             return None
         finally:
             conn.reset_buffers()
+        if version and not info["version"]:
+            return None
+        return info
+
+    @staticmethod
+    def _get_probe_timeout(baudrate) -> float:
+        """Time limit (seconds) for a probe reply at baudrate."""
+        transfer_time = _PROBE_BITS / baudrate
+        return _PROBE_SAFETY_FACTOR * (transfer_time + _PROBE_TURNAROUND)
+
+    @classmethod
+    def _confirm_device(cls, conn, info):
+        """
+        Re-read serial number & read version at the connection's (user) timeout.
+
+        <GETVER>> isn't part of the fast probe, it's slow to reply on some devices
+        (see Connection.get_at_least).
+        """
+        confirmed = cls._get_device_info(conn)
+        if not confirmed or confirmed["serial_number"] != info["serial_number"]:
+            return None
+        return confirmed
+
+    def _validate_device(self, port, baudrate, fast=True) -> bool:
+        """
+        Check if a GMC is on port at baudrate.
 
-    def _validate_device(self, port, baudrate) -> bool:
+        Two-phase when fast=True: probe <GETSERIAL>> with a short timeout tuned to the
+        baudrate then confirm the responding candidate at the user timeout.
+        """
         logger.debug(f"Checking port={port} baudrate={baudrate}")
+        timeout = self._get_probe_timeout(baudrate) if fast else self._timeout
         try:
-            conn = Connection(port=port, baudrate=baudrate, timeout=self._timeout)
+            conn = Connection(port=port, baudrate=baudrate, timeout=timeout)
         except SerialException as e:
             # Should a convenience method log as warning/error?
             # If only GQ Electronics would put the version/serial in USB description...
             logger.warning(f"Skipping error connecting: {e}", exc_info=True)
             return False
 
-        info = self._get_device_info(conn)
-        conn.close_connection()
+        info = self._get_device_info(conn, version=not fast)
+        if info and fast:
+            conn.timeout = self._timeout
+            confirmed = self._confirm_device(conn, info)
+            if not confirmed:
+                logger.debug(f"Unconfirmed port={port} baudrate={baudrate}: {info}")
+            info = confirmed
+        if info and self._keep_connections:
+            with self._lock:
+                self._connections[port] = conn
+        else:
+            conn.close_connection()
         if info:
             version = info["version"]
             serial_number = info["serial_number"]
@@ -149,27 +269,110 @@ class Discovery:
                 serial_number=serial_number,
             )
             logger.debug(f"Discovered device: {discovered_device}")
-            self._discovered_devices.append(discovered_device)
+            with self._lock:
+                self._discovered_devices.append(discovered_device)
+            self._cache_device(discovered_device)
             return True
 
         return False
 
+    def _run_per_port(self, func, ports) -> None:
+        """
+        Run func(port) for each port concurrently.
+
+        Ports are independent, so total time is bounded by the slowest port instead of
+        the sum of all ports.
+        """
+        if len(ports) <= 1:
+            for port in ports:
+                func(port)
+            return
+
+        # Sym-links to the same device must not be probed at the same time, so they
+        # share a worker and are probed one after the other.
+        groups = {}
+        for port in ports:
+            groups.setdefault(os.path.realpath(port), []).append(port)
+
+        def run_group(group):
+            for port in group:
+                func(port)
+
+        max_workers = self._max_workers or len(groups)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # list() to wait for all ports & re-raise any unexpected exception
+            list(pool.map(run_group, groups.values()))
+
+        # keep the intuitive (sorted port) order regardless of which port finished first
+        self._discovered_devices.sort(key=lambda x: ports.index(x.port))
+
+    def _validate_port(self, port, baudrates, slow_baudrates=()) -> bool:
+        """
+        Find the baudrate of the GMC on port.
+
+        Fast-fail probes first; if none replies in time (e.g. a slow device or a high
+        turnaround at a low baudrate) try slow_baudrates again at the user timeout.
+        """
+        for baudrate in baudrates:
+            if self._validate_device(port=port, baudrate=baudrate):
+                return True
+        if self._slow_sweep:
+            slow_baudrates = baudrates
+        for baudrate in slow_baudrates:
+            logger.debug(f"No fast probe reply on port={port}, retry {baudrate} slow")
+            if self._validate_device(port=port, baudrate=baudrate, fast=False):
+                return True
+        return False
+
     def _discover_with_known_baudrate(self, baudrate) -> None:
         ports = self._get_gmc_usb_ports()
-        for port in ports:
-            self._validate_device(port=port, baudrate=baudrate)
+        self._run_per_port(
+            lambda port: self._validate_port(port, [baudrate], [baudrate]), ports
+        )
 
     def _discover_with_known_port(self, port) -> None:
-        for baudrate in BAUDRATES:
-            is_valid = self._validate_device(port=port, baudrate=baudrate)
-            if is_valid:
-                break
+        # Warm start: a single probe with the last known baudrate
+        cached_baudrate = self._get_cached_baudrate(port)
+        baudrates = [x for x in BAUDRATES if x != cached_baudrate]
+        slow_baudrates = []
+        if cached_baudrate:
+            baudrates = [cached_baudrate] + baudrates
+            slow_baudrates = [cached_baudrate]
+        self._validate_port(port, baudrates, slow_baudrates)
 
     def _discover_all(self) -> None:
         ports = self._get_gmc_usb_ports()
-        for port in ports:
-            # D.R.Y. (don't repeat yourself)
-            self._discover_with_known_port(port=port)
+        # D.R.Y. (don't repeat yourself)
+        self._run_per_port(self._discover_with_known_port, ports)
+
+    def pop_connection(self, device_details):
+        """
+        Take the open connection used to validate a discovered device.
+
+        Only available with keep_connections=True. Saves the device class from opening
+        the port again. The caller owns (and closes) the returned connection.
+
+        Parameters
+        ----------
+        device_details: DeviceDetails
+            A discovered device.
+
+        Returns
+        -------
+        pygmc.connection.Connection | None
+            None if there is no open connection for the device.
+
+        """
+        with self._lock:
+            return self._connections.pop(device_details.port, None)
+
+    def close_connections(self) -> None:
+        """Close all kept connections not taken via pop_connection()."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close_connection()
 
     def get_device_by_serial_number(self, serial_number) -> list:
         """
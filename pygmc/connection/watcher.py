@@ -0,0 +1,239 @@
+"""Watch for GMC devices being plugged in & unplugged."""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Generator
+
+from .discovery import Discovery
+from .utils import get_gmc_usb_devices
+
+logger = logging.getLogger("pygmc.connection.watcher")
+
+
+# action: "attach" or "detach"
+# device_details: discovery DeviceDetails (None for detach of a port that never had a
+# discovered GMC)
+HotplugEvent = namedtuple("HotplugEvent", ["action", "port", "device_details"])
+
+
+def _get_netlink_monitor():
+    """Get a udev netlink tty monitor if optional pyudev is installed (linux only)."""
+    try:
+        import pyudev
+    except ImportError:
+        return None
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by("tty")
+        monitor.start()
+    except Exception as e:  # noqa - unsure of exception types, fall back to polling
+        logger.debug(f"netlink monitor unavailable: {e}")
+        return None
+    logger.debug("Using udev netlink monitor")
+    return monitor
+
+
+class HotplugWatcher:
+    """
+    Watch for GMC USB devices being attached & detached.
+
+    Only newly appeared ports are probed (via Discovery), so a long-running service can
+    reconnect a replugged device without a full sweep of every port. Ports without a
+    GMC are re-probed with backoff until one answers or the port is unplugged.
+    Ports are probed in worker threads, a slow port doesn't hold up the others.
+    """
+
+    def __init__(
+        self,
+        poll_interval=1.0,
+        timeout=3,
+        use_netlink=True,
+        retry_interval=2.0,
+        max_retry_interval=60.0,
+        **usb_filter,
+    ):
+        """
+        Watch GMC USB devices.
+
+        Parameters
+        ----------
+        poll_interval: float
+            Seconds between checks of the USB port list. With netlink, a tty event
+            triggers a check immediately.
+        timeout: int
+            Discovery timeout used to probe new ports.
+        use_netlink: bool
+            Default=True uses udev netlink events if the optional pyudev package is
+            installed. Falls back to polling.
+        retry_interval: float
+            Seconds until a new port without a GMC (e.g. a counter that is still off
+            or booting) is probed again. Doubles after each failed probe.
+        max_retry_interval: float
+            Longest wait between re-probes of a port without a GMC.
+        usb_filter
+            Keyword arguments for pygmc.connection.get_gmc_usb_devices() e.g. vid, pid
+        """
+        self._poll_interval = poll_interval
+        self._timeout = timeout
+        self._usb_filter = usb_filter
+        self._monitor = _get_netlink_monitor() if use_netlink else None
+        self._stop = threading.Event()
+        self._thread = None
+        # port -> hwid of ports seen in the last poll
+        self._ports = {}
+        # port -> DeviceDetails of attached GMC's
+        self._devices = {}
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+        # port -> (next probe monotonic time, wait after that) of ports without a GMC
+        self._retries = {}
+        # port -> Future of a running probe
+        self._probes = {}
+        self._executor = None
+
+    def get_devices(self) -> list:
+        """
+        Get currently attached devices.
+
+        Returns
+        -------
+        list
+            Discovery DeviceDetails
+
+        """
+        return list(self._devices.values())
+
+    def poll(self) -> list:
+        """
+        Check USB ports once & probe only new ports.
+
+        Probes run in worker threads. Waits for them up to poll_interval; a probe
+        still running is reported by a later poll.
+
+        Returns
+        -------
+        list
+            HotplugEvent's since last poll.
+
+        """
+        current = {x.device: x.hwid for x in get_gmc_usb_devices(**self._usb_filter)}
+        events = []
+
+        for port, hwid in list(self._ports.items()):
+            if current.get(port) != hwid:
+                # unplugged (or a different USB device now has the port)
+                del self._ports[port]
+                self._retries.pop(port, None)
+                # a running probe's result is of the old device, ignore it
+                self._probes.pop(port, None)
+                details = self._devices.pop(port, None)
+                logger.info(f"Detached port={port}")
+                events.append(HotplugEvent("detach", port, details))
+
+        now = time.monotonic()
+        new_ports = set(current) - set(self._ports)
+        retry_ports = {x for x, (at, _) in self._retries.items() if at <= now}
+        for port in sorted((new_ports | retry_ports) - set(self._probes)):
+            self._ports[port] = current[port]
+            self._probes[port] = self._get_executor().submit(self._probe, port)
+
+        if self._probes:
+            wait(list(self._probes.values()), timeout=self._poll_interval)
+        for port in sorted(self._probes):
+            if self._probes[port].done():
+                events.extend(self._handle_probe(port, self._probes.pop(port)))
+        return events
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="pygmc-hotplug-probe")
+        return self._executor
+
+    def _probe(self, port) -> list:
+        return Discovery(port=port, timeout=self._timeout).get_all_devices()
+
+    def _handle_probe(self, port, future) -> list:
+        try:
+            discovered = future.result()
+        except Exception as e:  # noqa - unsure of exception types, probe again later
+            logger.warning(f"Probe of port={port} failed: {e}")
+            discovered = []
+        if not discovered:
+            # maybe powered off or still booting, probe again later (backoff)
+            _, retry_wait = self._retries.get(port, (None, self._retry_interval))
+            self._retries[port] = (
+                time.monotonic() + retry_wait,
+                min(2 * retry_wait, self._max_retry_interval),
+            )
+            logger.info(f"No GMC found on port={port}, probe again in {retry_wait}s")
+            return []
+        self._retries.pop(port, None)
+        details = discovered[0]
+        self._devices[port] = details
+        logger.info(f"Attached {details}")
+        return [HotplugEvent("attach", port, details)]
+
+    def _wait(self) -> None:
+        if self._monitor is None:
+            self._stop.wait(self._poll_interval)
+            return
+        # wakes on the first tty event; drain the burst a plug/unplug creates
+        device = self._monitor.poll(timeout=self._poll_interval)
+        while device is not None:
+            device = self._monitor.poll(timeout=0)
+
+    def events(self) -> Generator[HotplugEvent, None, None]:
+        """
+        Get hotplug events as they happen, as a generator.
+
+        The first events are "attach" for devices already plugged in.
+        Runs until stop() is called.
+
+        Yields
+        ------
+        HotplugEvent
+
+        """
+        self._stop.clear()
+        return self._events()
+
+    def _events(self) -> Generator[HotplugEvent, None, None]:
+        while not self._stop.is_set():
+            yield from self.poll()
+            self._wait()
+
+    def start(self, callback) -> None:
+        """
+        Watch in a background thread.
+
+        Parameters
+        ----------
+        callback: callable
+            Called with each HotplugEvent (from the watcher thread).
+
+        """
+
+        def run():
+            for event in self._events():
+                callback(event)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="pygmc-hotplug", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        # unfinished probes are dropped; their ports count as new next time
+        for port in self._probes:
+            self._ports.pop(port, None)
+        self._probes.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
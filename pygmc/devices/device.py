@@ -1,15 +1,36 @@
-import csv
+import bisect
+import datetime
 import logging
+import numbers
 import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from typing import Generator, Optional
 
-from ..history import HistoryParser
+from ..cache import JsonCache
+from ..history import HistoryParser, HistoryStream, write_csv
+from ..history_arrow import write_parquet
+from ..history_columnar import write_columnar
 
 logger = logging.getLogger("pygmc.device")
 
 
+# cps: counts-per-second
+# received: time.monotonic() when the sample was read from the serial buffer
+# timestamp: reconstructed datetime of the sample (heartbeat is one sample per second)
+HeartbeatSample = namedtuple("HeartbeatSample", ["cps", "received", "timestamp"])
+
+
 class BaseDevice:
     """Base device class which all devices inherit from."""
 
+    # Flash geometry, models with a different flash override these. An instance can
+    # too e.g. probe_flash_size()
+    _flash_memory_size_bytes = 2**20  # 1 MiB
+    _flash_memory_page_size_bytes = 2**11  # 2048 B
+
     def __init__(self, connection):
         """
         Represent a base GMC device.
@@ -21,14 +42,26 @@ class BaseDevice:
         """
         self.connection = connection
 
-        self._flash_memory_size_bytes = 2**20  # 1 MiB
-        self._flash_memory_page_size_bytes = 2**11  # 2048 B
+        # Larger <SPIR read sizes to try (largest first), fewer round trips per download.
+        # The size is 16 bits but how much a firmware can send in one go varies, so the
+        # largest that reads the same as page sized reads is used, see
+        # _tune_spir_chunk_size()
+        self._spir_chunk_sizes = (2**15, 2**14, 2**13, 2**12)
 
         # the config under the hood, initialize empty and lazily create
         self._config = dict()
+        # raw config bytes of self._config
+        self._cfg_bytes = b""
+        # _cfg_spec_map compiled by _compile_cfg_codec() on first use
+        self._cfg_codec = None
+        self._cfg_fields = {}
 
         # µSv calibration (max_cpm, slope, intercept)
         self._usv_calibration_tuple = tuple()
+        # _usv_calibration_tuple compiled for bisect, see _set_usv_calibration()
+        self._usv_breakpoints = []
+        self._usv_slopes = []
+        self._usv_intercepts = []
 
         # Best effort interpretation from:
         #     https://www.gqelectronicsllc.com/forum/topic.asp?TOPIC_ID=4948
@@ -113,6 +146,39 @@ class BaseDevice:
             },
         }
 
+        # Live readings get_snapshot() can batch into one serial exchange.
+        # cmd: write command
+        # size: fixed response size (bytes)
+        # type: struct.unpack type (str) or a function(raw bytes) -> value
+        # default: included in get_snapshot() when no fields are given
+        self._snapshot_spec_map = dict()
+
+        # Heartbeat sample struct.unpack type & bit mask (None = all bits)
+        self._heartbeat_format = ">I"
+        self._heartbeat_mask = None
+
+        # Config bytes cached on disk per device serial number & firmware version.
+        # Only used once the device identity is known, see set_identity()
+        self._config_cache = JsonCache("config")
+        self._config_cache_key = None
+
+        # Readings only some models/firmware have e.g. ("cpmh", "gyro") - names are
+        # _snapshot_spec_map keys. Unsupported ones cost a full timeout, so what's
+        # learned is cached on disk per model & revision, see set_identity()
+        self._optional_readings = tuple()
+        # name -> bool, True supported, False unsupported, missing unknown
+        # also firmware quirks e.g. spir_extra_byte, see _read_history_position()
+        # & spir_chunk_size/<baudrate> (int), see _tune_spir_chunk_size()
+        self._capabilities = dict()
+        self._capability_cache = JsonCache("capabilities")
+        self._capability_cache_key = None
+        # a slow or garbled reply isn't proof; only mark unsupported after a few misses
+        self._capability_times = dict()
+        self._capability_failures = dict()
+        self._capability_max_failures = 3
+        # (found, pages in a row) spir_extra_byte detections not cached yet
+        self._spir_extra_byte_seen = (None, 0)
+
         # will likely save someone a lot of time
         # heartbeat-on keeps writing to buffer making other functionality un-parsable
         self._heartbeat_off()
@@ -138,22 +204,176 @@ class BaseDevice:
         self.connection.write(b"<HEARTBEAT1>>")
         logger.debug("Heartbeat ON")
 
+    @staticmethod
+    def _parse_datetime(data: bytes) -> datetime.datetime:
+        # Seven bytes data: YY MM DD HH MM SS 0xAA
+        year = int("20{0:2d}".format(data[0]))
+        month = int("{0:2d}".format(data[1]))
+        day = int("{0:2d}".format(data[2]))
+        hour = int("{0:2d}".format(data[3]))
+        minute = int("{0:2d}".format(data[4]))
+        second = int("{0:2d}".format(data[5]))
+        return datetime.datetime(year, month, day, hour, minute, second)
+
+    @staticmethod
+    def _parse_gyro(data: bytes) -> tuple:
+        # X, Y, Z 16 bit signed big-endian then 0xAA
+        x, y, z, dummy = struct.unpack(">hhhB", data)
+        return x, y, z
+
+    def heartbeat_samples(self, count=60) -> Generator[HeartbeatSample, None, None]:
+        """
+        Get live timestamped CPS data, as a generator.
+
+        Everything waiting in the serial buffer is read & decoded at once, so a consumer
+        that stalls catches up cheaply and still knows when each sample happened.
+        Samples read together are one second apart, the newest one at the read time.
+
+        Parameters
+        ----------
+        count : int, optional
+            How many CPS samples to return (default=60). One per second.
+
+        Yields
+        ------
+        HeartbeatSample
+            (cps, received, timestamp)
+
+        Raises
+        ------
+        TimeoutError
+            No heartbeat data from device.
+
+        """
+        sample = struct.Struct(self._heartbeat_format)
+        pending = bytearray()
+        self.connection.reset_buffers()
+        try:
+            self._heartbeat_on()
+            while count > 0:
+                data = self.connection.read_samples(size=sample.size)
+                if not data:
+                    raise TimeoutError("No heartbeat data from device.")
+                received = time.monotonic()
+                now = datetime.datetime.now()
+                pending += data
+                # a partial sample (timeout mid-sample) waits for the rest
+                end = len(pending) - len(pending) % sample.size
+                values = [x[0] for x in sample.iter_unpack(pending[:end])]
+                del pending[:end]
+
+                newest = len(values) - 1
+                for i, cps in enumerate(values[:count]):
+                    if self._heartbeat_mask is not None:
+                        cps &= self._heartbeat_mask
+                    timestamp = now - datetime.timedelta(seconds=newest - i)
+                    yield HeartbeatSample(cps, received, timestamp)
+                count -= len(values)
+        finally:
+            self._heartbeat_off()
+
+    def _get_write_ack(self, cmd: bytes) -> bytes:
+        """Write a command that changes the device & read its 1 byte acknowledgement."""
+        # a write (e.g. to flash) can take longer than the adaptive time limit of a
+        # 1 byte reply; always wait the full timeout
+        return self.connection.get_exact(cmd, size=1, timeout=self.connection.timeout)
+
     def _read_history_position(self, start_position, chunk_size) -> bytes:
         # http://www.gqelectronicsllc.com/forum/topic.asp?TOPIC_ID=4445
-        # don't need spir fix because... reset read/write buffer.
+        # Some firmware has a bug & returns chunk_size + 1 bytes. If we read chunk_size,
+        # then there is one byte left in buffer which will throw off all further
+        # commands. Check if the device has the bug, then read exactly what it sends &
+        # skip resetting the buffers every page.
         start_s = struct.pack(">I", start_position)[1:]
         size_s = struct.pack(">H", chunk_size)
 
         cmd = b"<SPIR" + start_s + size_s + b">>"
-        data = self.connection.get_exact(cmd, size=chunk_size)
-
-        # MUST reset buffers... or deal with the bug
-        # device with bug returns chunk_size + 1
-        # if we read chunk_size, then there is one byte left in buffer
-        # which will throw off all further commands
+        extra_byte = self._capabilities.get("spir_extra_byte")
+        if extra_byte is False and self._has_spir_stray_byte():
+            # e.g. a late extra byte of the last page
+            extra_byte = None
+        if extra_byte is None:
+            data = self.connection.get_exact(cmd, size=chunk_size)
+            if len(data) == chunk_size:
+                # the extra byte comes right after the page, no need to wait long
+                timeout = self.connection.get_adaptive_timeout(1)
+                extra = self.connection.read_until(size=1, timeout=timeout)
+                self._detect_spir_extra_byte(len(extra) == 1)
+            self.connection.reset_buffers()
+            return data
+
+        size = chunk_size + 1 if extra_byte else chunk_size
+        data = self.connection.get_exact(cmd, size=size)
+        if len(data) != size:
+            # timed out mid-page; don't leave the rest in the buffer
+            self.connection.reset_buffers()
+        elif not extra_byte:
+            # the page itself is fine, the stray byte would shift the next one
+            self._has_spir_stray_byte()
+        return data[:chunk_size]
+
+    def _detect_spir_extra_byte(self, found: bool) -> None:
+        # a missed extra byte shifts every later page by one; only cache what's been
+        # seen on two pages in a row
+        seen, pages = self._spir_extra_byte_seen
+        pages = pages + 1 if seen is found else 1
+        self._spir_extra_byte_seen = (found, pages)
+        if pages >= 2:
+            self._set_capability("spir_extra_byte", found)
+
+    def _has_spir_stray_byte(self) -> bool:
+        # spir_extra_byte is False but a byte is waiting; detect again
+        if not self.connection.get_connection_details()["in_waiting"]:
+            return False
+        logger.warning("Stray byte after history page, detecting SPIR extra byte again")
         self.connection.reset_buffers()
+        self._spir_extra_byte_seen = (None, 0)
+        self._set_capability("spir_extra_byte", None)
+        return True
 
-        return data
+    def _compile_cfg_codec(self) -> None:
+        """
+        Compile _cfg_spec_map into struct.Struct's that decode every field at once.
+
+        Usually one Struct with pad bytes between fields. Fields of another byte order
+        (RFC1201 mixes big-endian ints & little-endian floats) or overlapping an earlier
+        field go in another Struct. Also an offset table {name: (index, Struct)} to
+        encode single fields.
+        """
+        groups = []  # [byte order, format, end index, names]
+        fields = {}
+        items = sorted(self._cfg_spec_map.items(), key=lambda x: x[1]["index"])
+        for name, d in items:
+            fmt = d["type"]
+            if fmt is None:
+                fmt = "B"  # treat byte literally
+            elif fmt == "tbd":
+                logger.warning(f"config={name} not understood")
+                continue
+            # "=" not native "@", native alignment would shift fields
+            order, code = (fmt[0], fmt[1:]) if fmt[0] in "@=<>!" else ("=", fmt)
+            index = d["index"]
+            codec = struct.Struct(order + code)
+            fields[name] = (index, codec)
+            # byte order doesn't matter for single bytes
+            order = order if codec.size > 1 else None
+
+            for group in groups:
+                fits = group[2] <= index
+                if fits and (order is None or group[0] in (order, None)):
+                    break
+            else:
+                group = [None, "", 0, []]
+                groups.append(group)
+            if group[0] is None:
+                group[0] = order
+            pad = index - group[2]
+            group[1] += (f"{pad}x" if pad else "") + code
+            group[2] = index + codec.size
+            group[3].append(name)
+
+        self._cfg_codec = [(struct.Struct((x[0] or "=") + x[1]), x[3]) for x in groups]
+        self._cfg_fields = fields
 
     def _parse_cfg(self, cfg_bytes: bytes) -> None:
         """
@@ -169,21 +389,263 @@ class BaseDevice:
         None
 
         """
-        cfg_map = self._cfg_spec_map
-        for name, d in cfg_map.items():
-            i = d["index"]
-            e = i + d["size"]
-            raw = cfg_bytes[i:e]
+        if self._cfg_codec is None:
+            self._compile_cfg_codec()
 
-            if d["type"] and d["type"] != "tbd":
-                value = struct.unpack(d["type"], raw)[0]
-            elif d["type"] is None:
-                value = raw[0]
-            else:
-                logger.warning(f"config={name} not understood")
-                value = None
+        values = {}
+        for codec, names in self._cfg_codec:
+            values.update(zip(names, codec.unpack_from(cfg_bytes)))
+
+        # keep the spec map order; fields not understood are None
+        for name in self._cfg_spec_map:
+            self._config[name] = values.get(name)
+        self._cfg_bytes = bytes(cfg_bytes)
+
+    def _encode_cfg(self, changes: dict) -> bytes:
+        """
+        Get config bytes with changed fields re-encoded.
+
+        Parameters
+        ----------
+        changes: dict
+            {config name: new value}
+
+        Returns
+        -------
+        bytes
+            Full config bytes.
 
-            self._config[name] = value
+        Raises
+        ------
+        ValueError
+            Unknown config name or value unable to be encoded.
+
+        """
+        if self._cfg_codec is None:
+            self._compile_cfg_codec()
+
+        cfg = bytearray(self._cfg_bytes)
+        for name, value in changes.items():
+            if name not in self._cfg_fields:
+                raise ValueError(f"Unknown config={name}")
+            index, codec = self._cfg_fields[name]
+            try:
+                codec.pack_into(cfg, index, value)
+            except struct.error as e:
+                raise ValueError(f"Invalid value for config={name}: {e}") from e
+        return bytes(cfg)
+
+    def _cache_config(self, cfg_bytes: bytes) -> None:
+        if self._config_cache_key is not None:
+            entry = {"cfg": cfg_bytes.hex(), "time": time.time()}
+            self._config_cache.set(self._config_cache_key, entry)
+
+    def _invalidate_config(self) -> None:
+        """Forget config after a write command; re-read from device when needed."""
+        self._config = dict()
+        self._cfg_bytes = b""
+        self._usv_calibration_tuple = tuple()
+        if self._config_cache_key is not None:
+            self._config_cache.delete(self._config_cache_key)
+
+    def set_identity(
+        self,
+        serial_number: str,
+        version: str,
+        config_max_age: float = 24 * 3600,
+        capabilities_max_age: float = 7 * 24 * 3600,
+    ) -> None:
+        """
+        Set which device & firmware this is, to use the on-disk config cache.
+
+        Restores the config (& µSv calibration) from the cache instead of a <GETCFG>>
+        read. Every get_config() refreshes the cache & write commands invalidate it.
+        Also restores known capabilities of the model & revision, see
+        probe_capabilities(). pygmc.connect() sets the identity from discovery.
+
+        The device has no cheap way to tell if its config changed (there's no partial
+        <GETCFG>> read), so a config changed from the device menu or another program is
+        only noticed once the cache entry is older than config_max_age. Call
+        get_config() to re-read it now.
+
+        Parameters
+        ----------
+        serial_number: str
+            Device serial number e.g. get_serial()
+        version: str
+            Device version e.g. get_version(). A firmware update is a new cache entry.
+        config_max_age: float
+            Default=86400 (a day). Seconds a cached config is trusted. 0 never
+            restores the config from the cache.
+        capabilities_max_age: float
+            Default=604800 (a week). Seconds a cached capability is trusted, see
+            reset_capabilities()
+
+        """
+        self._set_capability_identity(version, capabilities_max_age)
+        self._config_cache_key = f"{serial_number}/{version}"
+        entry = self._config_cache.get(self._config_cache_key)
+        if not entry:
+            return
+        try:
+            age = time.time() - entry["time"]
+            cfg_bytes = bytes.fromhex(entry["cfg"])
+        except (TypeError, KeyError, ValueError) as e:
+            logger.debug(f"Ignoring bad cached config: {e}")
+            self._invalidate_config()
+            return
+        if not 0 <= age < config_max_age:
+            logger.debug(f"Cached config is stale, age={age:.0f}s")
+            return
+        self._config = dict()
+        self._usv_calibration_tuple = tuple()
+        try:
+            self._parse_cfg(cfg_bytes)
+        except (TypeError, ValueError, IndexError, struct.error) as e:
+            logger.debug(f"Ignoring bad cached config: {e}")
+            self._invalidate_config()
+            return
+        logger.debug(f"Config restored from cache {self._config_cache_key}")
+
+    def _set_capability_identity(self, version: str, max_age: float) -> None:
+        from ..connection.discovery import Discovery
+
+        model, revision = Discovery._get_model_rev_from_version(version)
+        if not model:
+            logger.debug(f"Not caching capabilities, unknown model version={version}")
+            return
+        self._capability_cache_key = f"{model}/{revision}"
+        entry = self._capability_cache.get(self._capability_cache_key)
+        if not isinstance(entry, dict):
+            return
+        now = time.time()
+        # name -> [value, time learned]
+        for name, item in entry.items():
+            try:
+                value, learned = item
+                age = now - learned
+            except (TypeError, ValueError):
+                logger.debug(f"Ignoring bad cached capability {name}={item}")
+                continue
+            if isinstance(value, (bool, int)) and 0 <= age < max_age:
+                self._capabilities[name] = value
+                self._capability_times[name] = learned
+        logger.debug(f"Capabilities restored from cache {self._capabilities}")
+
+    def _set_capability(self, name: str, value) -> None:
+        if self._capabilities.get(name) == value:
+            return
+        logger.debug(f"Capability {name}={value}")
+        self._capabilities[name] = value
+        self._capability_times[name] = time.time()
+        if self._capability_cache_key is not None:
+            entry = {
+                x: [v, self._capability_times[x]] for x, v in self._capabilities.items()
+            }
+            self._capability_cache.set(self._capability_cache_key, entry)
+
+    def _check_capability(self, name: str) -> None:
+        if self._capabilities.get(name) is False:
+            raise RuntimeError(f"Device does not support {name}")
+
+    def _get_optional_reading(self, name: str) -> bytes:
+        """
+        Get raw response of a reading only some devices have.
+
+        Fails fast if the device is known not to support it. A missing or short
+        response marks it unsupported only after _capability_max_failures in a row,
+        one slow reply isn't proof.
+        """
+        self._check_capability(name)
+        d = self._snapshot_spec_map[name]
+        result = self.connection.get_exact(d["cmd"], expected=b"", size=d["size"])
+        if len(result) != d["size"]:
+            # don't leave junk in the buffer for the next command
+            self.connection.reset_buffers()
+            msg = f"(response {len(result)}/{d['size']} bytes)"
+            if not self._count_capability_miss(name):
+                raise RuntimeError(f"No {name} response {msg}")
+            raise RuntimeError(f"Device does not support {name} {msg}")
+        self._capability_failures.pop(name, None)
+        self._set_capability(name, True)
+        return result
+
+    def _count_capability_miss(self, name: str) -> bool:
+        """Count a missing reply, returns True once the reading is marked unsupported."""
+        failures = self._capability_failures.get(name, 0) + 1
+        self._capability_failures[name] = failures
+        if failures < self._capability_max_failures:
+            return False
+        self._set_capability(name, False)
+        return True
+
+    def reset_capabilities(self) -> None:
+        """
+        Forget known capabilities, also the ones cached for the model & revision.
+
+        e.g. a reading wrongly marked unsupported after a flaky connection.
+        """
+        self._capabilities.clear()
+        self._capability_times.clear()
+        self._capability_failures.clear()
+        self._spir_extra_byte_seen = (None, 0)
+        if self._capability_cache_key is not None:
+            self._capability_cache.delete(self._capability_cache_key)
+
+    def get_capabilities(self) -> dict:
+        """
+        Get known support of readings only some devices have.
+
+        Returns
+        -------
+        dict
+            {reading: True | False | None} None means not known yet.
+
+        """
+        return {x: self._capabilities.get(x) for x in self._optional_readings}
+
+    def probe_capabilities(self, timeout=None) -> dict:
+        """
+        Check which readings only some devices have are supported, e.g. cpmh, gyro.
+
+        Each command is tried once with a short time limit. A reply marks the reading
+        supported; a missing reply counts as one failure, like a get_* call that gets
+        no reply. Readings marked unsupported then raise RuntimeError straight away
+        instead of waiting the timeout.
+
+        Parameters
+        ----------
+        timeout: float | None
+            Time limit per command, seconds. Default=None limits each to the time its
+            response should take, see Connection.get_adaptive_timeout()
+
+        Returns
+        -------
+        dict
+            {reading: True | False | None} see get_capabilities()
+
+        """
+        for name in self._optional_readings:
+            if self._capabilities.get(name) is False:
+                continue
+            d = self._snapshot_spec_map[name]
+            limit = timeout or self.connection.get_adaptive_timeout(d["size"])
+            self.connection.reset_buffers()
+            result = self.connection.get_exact(
+                d["cmd"], expected=b"", size=d["size"], timeout=limit
+            )
+            if len(result) != d["size"]:
+                # a late reply must not be read as the next command's reply
+                late = self.connection.read_until(
+                    size=d["size"] - len(result), timeout=limit
+                )
+                self.connection.reset_buffers()
+                if len(result) + len(late) != d["size"]:
+                    self._count_capability_miss(name)
+                    continue
+            self._capability_failures.pop(name, None)
+            self._set_capability(name, True)
+        return self.get_capabilities()
 
     def _set_usv_calibration(self, calibrations: list) -> None:
         """
@@ -234,6 +696,222 @@ class BaseDevice:
 
         self._usv_calibration_tuple = tuple(usv_range_slope_intercept)
 
+        # Compile for bisect. The first calibration with cpm <= max_cpm is used, so a
+        # calibration with max_cpm <= an earlier max_cpm is never used. Dropping those
+        # leaves sorted breakpoints; breakpoint i is the first with cpm <= max_cpm.
+        # Past the last breakpoint extrapolate from the last calibration, like before.
+        self._usv_breakpoints = []
+        self._usv_slopes = []
+        self._usv_intercepts = []
+        for max_cpm, m, b in self._usv_calibration_tuple:
+            if not self._usv_breakpoints or max_cpm > self._usv_breakpoints[-1]:
+                self._usv_breakpoints.append(max_cpm)
+                self._usv_slopes.append(m)
+                self._usv_intercepts.append(b)
+        max_cpm, m, b = self._usv_calibration_tuple[-1]
+        self._usv_slopes.append(m)
+        self._usv_intercepts.append(b)
+
+    def _get_usv_calibrations(self) -> list:
+        """Get µSv calibration points [(cpm, µSv), ...] from config."""
+        raise NotImplementedError
+
+    def _load_usv_calibration(self) -> None:
+        # lazily load config... i.e. don't load it until it's needed.
+        if not self._config:
+            self.get_config()
+
+        if not self._usv_calibration_tuple:
+            self._set_usv_calibration(self._get_usv_calibrations())
+
+    def cpm_to_usv_h(self, cpm):
+        """
+        Convert CPM to µSv/h with the device calibration, one value or many at once.
+
+        Same result as get_usv_h(cpm=...) for every value, without a call per value.
+        e.g. convert a whole history count column.
+
+        Parameters
+        ----------
+        cpm: int | float | Iterable | numpy.ndarray
+            Counts per minute.
+
+        Returns
+        -------
+        float | list | numpy.ndarray
+            µSv/h; float for a number, numpy.ndarray for an array, else list.
+
+        Notes
+        -----
+        Uses device calibration config. See get_usv_h()
+
+        """
+        self._load_usv_calibration()
+        breakpoints = self._usv_breakpoints
+        slopes = self._usv_slopes
+        intercepts = self._usv_intercepts
+
+        if isinstance(cpm, numbers.Number):
+            i = bisect.bisect_left(breakpoints, cpm)
+            return cpm * slopes[i] + intercepts[i]
+
+        # numpy is optional; if it's not imported, cpm isn't an array
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(cpm, numpy.ndarray):
+            i = numpy.searchsorted(numpy.asarray(breakpoints), cpm, side="left")
+            return cpm * numpy.asarray(slopes)[i] + numpy.asarray(intercepts)[i]
+
+        usv_h = []
+        for x in cpm:
+            i = bisect.bisect_left(breakpoints, x)
+            usv_h.append(x * slopes[i] + intercepts[i])
+        return usv_h
+
+    def history_to_usv_h(self, history) -> list:
+        """
+        Convert history counts to µSv/h with the device calibration, all at once.
+
+        Parameters
+        ----------
+        history: list
+            Rows from get_history_data() (column names row is skipped) or
+            HistoryParser.get_data()
+
+        Returns
+        -------
+        list
+            µSv/h per history row. CPS counts are converted as count * 60 CPM.
+
+        """
+        rows = history
+        if rows and rows[0][1] == "count":
+            rows = rows[1:]  # column names
+        cpm = [x[1] * 60 if x[2] == "CPS" else x[1] for x in rows]
+        return self.cpm_to_usv_h(cpm)
+
+    def _get_spir_chunk_size_name(self) -> str:
+        # a size tuned at one baudrate may be too slow for another
+        baudrate = self.connection.get_connection_details()["baudrate"]
+        return f"spir_chunk_size/{baudrate}"
+
+    def _get_spir_chunk_candidates(self) -> list:
+        """Get the <SPIR read sizes to try, largest first."""
+        page_size = self._flash_memory_page_size_bytes
+        timeout = self.connection.timeout
+
+        def fits(size):
+            # room for the device turnaround; 32 KiB takes ~2.8 s at 115200 baudrate
+            return not timeout or 1.5 * self.connection._get_transfer_time(size) < timeout
+
+        candidates = [
+            x
+            for x in self._spir_chunk_sizes
+            if page_size < x <= min(self._flash_memory_size_bytes, 0xFFFF)
+            and x % page_size == 0
+            and fits(x)
+        ]
+        return sorted(candidates, reverse=True)
+
+    def _get_spir_chunk_size(self) -> Optional[int]:
+        """Get the tuned <SPIR read size, None if not tuned yet."""
+        chunk_size = self._capabilities.get(self._get_spir_chunk_size_name())
+        if not chunk_size:
+            return None
+        # tuned with a longer timeout, use the largest that still fits
+        candidates = self._get_spir_chunk_candidates()
+        default = self._flash_memory_page_size_bytes
+        return max([x for x in candidates if x <= chunk_size], default=default)
+
+    def _tune_spir_chunk_size(self, reference: bytes) -> int:
+        """
+        Get the largest <SPIR read size that reads the same as page sized reads.
+
+        Tried once per model, revision & baudrate, then cached with the capabilities.
+        Only sizes that read well within the connection timeout are used.
+
+        Parameters
+        ----------
+        reference : bytes
+            History from the start of flash already read page by page, at least the
+            largest candidate size.
+
+        """
+        chunk_size = self._flash_memory_page_size_bytes
+        for candidate in self._get_spir_chunk_candidates():
+            data = self._read_history_position(0, candidate)
+            if data == reference[:candidate]:
+                chunk_size = candidate
+                break
+            logger.debug(f"SPIR size={candidate} unreliable, got {len(data)} bytes")
+            # don't let a confused device spoil the next try
+            self.connection.reset_buffers()
+        logger.debug(f"SPIR chunk size={chunk_size}")
+        self._set_capability(self._get_spir_chunk_size_name(), chunk_size)
+        return chunk_size
+
+    def iter_raw_history(self) -> Generator[bytes, None, None]:
+        """
+        Get device history data page by page as it's read, as a generator.
+
+        Stops reading when read entire page contains empty data.
+
+        Yields
+        ------
+        bytes
+            Raw history data of a page.
+
+        Raises
+        ------
+        TimeoutError
+            Device didn't send a whole page.
+
+        """
+        page_size = self._flash_memory_page_size_bytes
+        flash_size = self._flash_memory_size_bytes
+        chunk_size = self._get_spir_chunk_size()
+        # tune only when the result can be cached & the history is long enough to
+        # gain from it; the pages read so far are the reference
+        candidates = self._get_spir_chunk_candidates()
+        reference = None
+        if chunk_size is None and candidates and self._capability_cache_key is not None:
+            reference = bytearray()
+        chunk_size = chunk_size or page_size
+        i = 0
+        position = 0
+        while position < flash_size:
+            if reference is not None and position >= candidates[0]:
+                chunk_size = self._tune_spir_chunk_size(reference)
+                reference = None
+
+            size = min(chunk_size, flash_size - position)
+            data = self._read_history_position(position, size)
+            if len(data) != size:
+                if size <= page_size:
+                    msg = f"History read at {position} got {len(data)}/{size} bytes"
+                    raise TimeoutError(msg)
+                # never yield a cut short page; re-read this & the rest page by page
+                logger.warning(
+                    f"History read got {len(data)}/{size} bytes, reading page by page"
+                )
+                # tuned again next download
+                self._set_capability(self._get_spir_chunk_size_name(), None)
+                chunk_size = page_size
+                continue
+
+            # check page by page, same result whatever the chunk size
+            for page_start in range(0, size, page_size):
+                page = data[page_start : page_start + page_size]
+                if page.count(b"\xff") == page_size:
+                    logger.debug("Entire read block '\\xff' stop reading history")
+                    return
+                yield page
+
+                i += 1
+                logger.debug("Read history page {} done".format(i))
+            if reference is not None:
+                reference += data
+            position += size
+
     def get_raw_history(self) -> bytes:
         """
         Get device history data.
@@ -247,24 +925,75 @@ class BaseDevice:
             Raw history data.
 
         """
-        i = 0
-        hist = b""
-        for start_position in range(
-            0, self._flash_memory_size_bytes, self._flash_memory_page_size_bytes
-        ):
-            data = self._read_history_position(
-                start_position, self._flash_memory_page_size_bytes
-            )
+        # read straight into one buffer the size of the flash, no re-copying per page
+        hist = bytearray(self._flash_memory_size_bytes)
+        view = memoryview(hist)
+        size_read = 0
+        for page in self.iter_raw_history():
+            view[size_read : size_read + len(page)] = page
+            size_read += len(page)
+        return view[:size_read].tobytes()
+
+    def _download_history(self, stream) -> None:
+        """Feed history pages into a HistoryStream (producer thread)."""
+        try:
+            pages = self.iter_raw_history()
+            for page in pages:
+                if stream.closed:
+                    # parser is done e.g. hit its end of data, stop reading flash
+                    logger.debug("History stream closed, stop reading history")
+                    pages.close()
+                    break
+                stream.put(page)
+        except BaseException as e:  # noqa - handed to the parser thread to raise
+            stream.put_error(e)
+        finally:
+            stream.put_eof()
+
+    def probe_flash_size(self) -> int:
+        """
+        Confirm the flash memory size of the device.
 
-            if data.count(b"\xff") == self._flash_memory_page_size_bytes:
-                logger.debug("Entire read block '\\xff' stop reading history")
-                break
-            hist += data
+        Flash addresses wrap around, so a read at an address equal to the flash size
+        returns the first page again. Needs history in the first page to compare; with
+        an empty first page, a short read or no wrap around found the size is left
+        unchanged.
 
-            i += 1
-            logger.debug("Read history page {} done".format(i))
+        Returns
+        -------
+        int
+            Flash size in bytes used by get_raw_history()
 
-        return hist
+        """
+        page_size = self._flash_memory_page_size_bytes
+        first_page = self._read_history_position(0, page_size)
+        if len(first_page) != page_size or first_page.count(b"\xff") == page_size:
+            logger.info("Unable to probe flash size without history in the first page")
+            return self._flash_memory_size_bytes
+
+        # 64 KiB (smallest GMC flash) up to the 24 bit address limit
+        for size in (2**x for x in range(16, 24)):
+            data = self._read_history_position(size, page_size)
+            if len(data) != page_size:
+                # e.g. timed out; not proof of the end of flash
+                logger.warning(
+                    f"Unable to probe flash size, read at {size} got "
+                    f"{len(data)}/{page_size} bytes"
+                )
+                return self._flash_memory_size_bytes
+            # wrapped around to the start
+            if data == first_page:
+                break
+        else:
+            logger.info("Unable to probe flash size, no wrap around found")
+            return self._flash_memory_size_bytes
+
+        if size != self._flash_memory_size_bytes:
+            logger.info(
+                f"Flash size={size} (model default {self._flash_memory_size_bytes})"
+            )
+        self._flash_memory_size_bytes = size
+        return size
 
     def save_history_raw(self, file_path) -> None:
         """
@@ -280,6 +1009,34 @@ class BaseDevice:
         with open(file_path, "wb") as f:
             f.write(data)
 
+    def iter_history_data(self) -> Generator[tuple, None, None]:
+        """
+        Get tidy device memory history, as a generator.
+
+        History is parsed while it downloads and rows are yielded as they're parsed,
+        without keeping them in memory.
+        Columns: "datetime", "count", "unit", "mode", "reference_datetime", "notes"
+
+        Yields
+        ------
+        tuple
+
+        """
+        # parse pages as they're downloaded, instead of waiting for all of the flash
+        stream = HistoryStream()
+        producer = threading.Thread(
+            target=self._download_history,
+            args=(stream,),
+            name="pygmc-history-download",
+            daemon=True,
+        )
+        producer.start()
+        try:
+            yield from HistoryParser(filename=stream, lazy=True).iter_data()
+        finally:
+            stream.close()
+            producer.join()
+
     def get_history_data(self) -> list:
         """
         Get tidy device memory history in a list of tuples.
@@ -293,27 +1050,63 @@ class BaseDevice:
             List of tuples, first row is column names.
 
         """
-        data = self.get_raw_history()
-        h = HistoryParser(data=data)
-        data = [h.get_columns()]
-        data.extend(h.get_data())
+        data = [list(HistoryParser.columns)]
+        data.extend(self.iter_history_data())
         return data
 
     def save_history_csv(self, file_path: str) -> None:
         """
         Save device history as a CSV file.
 
+        Rows are written as they're parsed, so memory use doesn't grow with history size.
+
         Parameters
         ----------
         file_path: str
             Path to save.
 
         """
-        data = self.get_history_data()
-
         with open(file_path, "w", newline="") as csvfile:
-            csv_writer = csv.writer(csvfile, delimiter=",")
-            csv_writer.writerows(data)
+            write_csv(csvfile, self.iter_history_data(), columns=HistoryParser.columns)
+
+    def save_history_columnar(self, file_path: str) -> int:
+        """
+        Save device history as a compact columnar binary file.
+
+        Roughly 12 bytes per sample, read it back with
+        pygmc.history_columnar.ColumnarHistory (mmap, zero-copy columns).
+
+        Parameters
+        ----------
+        file_path: str
+            Path to save.
+
+        Returns
+        -------
+        int
+            Number of rows saved.
+
+        """
+        return write_columnar(file_path, self.iter_history_data())
+
+    def save_history_parquet(self, file_path: str) -> int:
+        """
+        Save device history as a Parquet file, needs optional pyarrow.
+
+        A row group per context segment (reference datetime, unit & mode).
+
+        Parameters
+        ----------
+        file_path: str
+            Path to save.
+
+        Returns
+        -------
+        int
+            Number of rows saved.
+
+        """
+        return write_parquet(file_path, self.iter_history_data())
 
     def get_version(self) -> str:
         """
@@ -339,6 +1132,93 @@ class BaseDevice:
         result = self.connection.get_exact(cmd, size=7)
         return result.hex()
 
+    def get_snapshot_fields(self) -> list:
+        """
+        Get readings available to get_snapshot() for this device.
+
+        Returns
+        -------
+        list
+            Field names e.g. ["cpm", "usv_h", "datetime"]
+
+        """
+        return list(self._snapshot_spec_map) + ["usv_h"]
+
+    def get_snapshot(self, fields=None) -> dict:
+        """
+        Get several live readings in one serial exchange.
+
+        The commands are written back-to-back and the fixed-size responses are read
+        with one read, then split. Much less serial latency than calling each get_*
+        method e.g. get_cpm(), get_datetime(), ...
+
+        Parameters
+        ----------
+        fields: list | tuple | None
+            Readings to get e.g. ["cpm", "usv_h", "datetime"]
+            Default=None gets the device's default readings, except the ones known
+            unsupported (see get_capabilities()).
+            See get_snapshot_fields() for what the device has.
+
+        Returns
+        -------
+        dict
+            {"timestamp": computer datetime of the read, "cpm": 28, ...}
+
+        Raises
+        ------
+        ValueError
+            Unknown field for this device.
+        RuntimeError
+            Incomplete response from device or a reading it doesn't support.
+
+        """
+        spec_map = self._snapshot_spec_map
+        if fields is None:
+            # e.g. max_cps on firmware without <GETMAXCPS>>
+            fields = [
+                x
+                for x, d in spec_map.items()
+                if d["default"] and self._capabilities.get(x) is not False
+            ]
+            fields.append("usv_h")
+        unknown = [x for x in fields if x not in spec_map and x != "usv_h"]
+        if unknown:
+            msg = f"Unknown snapshot fields={unknown}. "
+            msg += f"Available fields={self.get_snapshot_fields()}"
+            raise ValueError(msg)
+
+        # µSv/h is computed from cpm
+        reads = [x for x in spec_map if x in fields or (x == "cpm" and "usv_h" in fields)]
+        for name in reads:
+            self._check_capability(name)
+        cmd = b"".join(spec_map[x]["cmd"] for x in reads)
+        size = sum(spec_map[x]["size"] for x in reads)
+
+        timestamp = datetime.datetime.now()
+        data = self.connection.get_exact(cmd, expected=b"", size=size)
+        if len(data) != size:
+            # don't leave a partial response in the buffer for the next command
+            self.connection.reset_buffers()
+            raise RuntimeError(f"Incomplete snapshot response: {len(data)}/{size} bytes")
+
+        values = {}
+        i = 0
+        for name in reads:
+            d = spec_map[name]
+            raw = data[i : i + d["size"]]
+            i += d["size"]
+            if isinstance(d["type"], str):
+                values[name] = struct.unpack(d["type"], raw)[0]
+            else:
+                values[name] = d["type"](raw)
+        if "usv_h" in fields:
+            values["usv_h"] = self.get_usv_h(cpm=values["cpm"])
+
+        snapshot = {"timestamp": timestamp}
+        snapshot.update({x: values[x] for x in fields})
+        return snapshot
+
     def get_connection_details(self) -> dict:
         """
         Get connection details from pyserial.
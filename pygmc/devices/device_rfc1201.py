@@ -76,6 +76,57 @@ class DeviceRFC1201(BaseDevice):
             }
         )
 
+        self._snapshot_spec_map.update(
+            {
+                "cpm": {"cmd": b"<GETCPM>>", "size": 2, "type": ">H", "default": True},
+                "voltage": {
+                    "cmd": b"<GETVOLT>>",
+                    "size": 1,
+                    "type": self._parse_voltage,
+                    "default": True,
+                },
+                "temp": {
+                    "cmd": b"<GETTEMP>>",
+                    "size": 4,
+                    "type": self._parse_temp,
+                    "default": False,
+                },
+                "datetime": {
+                    "cmd": b"<GETDATETIME>>",
+                    "size": 7,
+                    "type": self._parse_datetime,
+                    "default": True,
+                },
+                "gyro": {
+                    "cmd": b"<GETGYRO>>",
+                    "size": 7,
+                    "type": self._parse_gyro,
+                    "default": False,
+                },
+            }
+        )
+
+        # GMC-320 Re.3.01 or later
+        self._optional_readings = ("temp", "gyro")
+
+        # heartbeat is 2 bytes & only first 14 bits are used, because why not complicate
+        # things
+        self._heartbeat_format = ">H"
+        self._heartbeat_mask = 0x3FFF
+
+    @staticmethod
+    def _parse_voltage(data: bytes) -> float:
+        # e.g. b'*'.hex() -> '2a' -> int('2a', 16) -> 42 -> 4.2V
+        return int(data.hex(), 16) / 10
+
+    @staticmethod
+    def _parse_temp(data: bytes) -> float:
+        # integer part, decimal part, sign (0 = positive), 0xAA
+        sign = 1
+        if data[2] != 0:
+            sign = -1
+        return sign * float("{}.{}".format(data[0], data[1]))
+
     def get_cpm(self) -> int:
         """
         Get CPM counts-per-minute data.
@@ -95,6 +146,13 @@ class DeviceRFC1201(BaseDevice):
         count = struct.unpack(">H", result)[0]
         return count
 
+    def _get_usv_calibrations(self) -> list:
+        return [
+            (self._config["CalibrationCPM_0"], self._config["Calibration_uSv_0"]),
+            (self._config["CalibrationCPM_1"], self._config["Calibration_uSv_1"]),
+            (self._config["CalibrationCPM_2"], self._config["Calibration_uSv_2"]),
+        ]
+
     def get_usv_h(self, cpm=None) -> float:
         """
         Get µSv/h as is displayed by the device. See notes below.
@@ -121,33 +179,7 @@ class DeviceRFC1201(BaseDevice):
         if cpm is None:
             cpm = self.get_cpm()
 
-        # lazily load config... i.e. don't load it until it's needed.
-        if not self._config:
-            self.get_config()
-
-        if not self._usv_calibration_tuple:
-            calibrations = [
-                (self._config["CalibrationCPM_0"], self._config["Calibration_uSv_0"]),
-                (self._config["CalibrationCPM_1"], self._config["Calibration_uSv_1"]),
-                (self._config["CalibrationCPM_2"], self._config["Calibration_uSv_2"]),
-            ]
-            self._set_usv_calibration(calibrations)
-
-        usv_h = None
-        for calib in self._usv_calibration_tuple:
-            calib_max_cpm, calib_slope, calib_intercept = calib
-            if cpm <= calib_max_cpm:
-                usv_h = cpm * calib_slope + calib_intercept
-                # valid range calibration exit condition
-                break
-
-        # if usv is still None... extrapolate from last _usv_calibration_tuple point
-        # which is implicitly the highest cpm calibration via _set_usv_calibration
-        if usv_h is None:
-            calib_max_cpm, calib_slope, calib_intercept = self._usv_calibration_tuple[-1]
-            usv_h = cpm * calib_slope + calib_intercept
-
-        return usv_h
+        return self.cpm_to_usv_h(cpm)
 
     def get_gyro(self) -> Tuple[int, int, int]:
         """
@@ -160,7 +192,6 @@ class DeviceRFC1201(BaseDevice):
         Tuple[int, int, int]
             (X, Y, Z) gyroscope data
         """
-        cmd = b"<GETGYRO>>"
         # Return: Seven bytes gyroscope data in hexdecimal:
         #   BYTE1,BYTE2,BYTE3,BYTE4,BYTE5,BYTE6,BYTE7
         # Here: BYTE1,BYTE2 are the X position data in 16 bits value.
@@ -170,9 +201,8 @@ class DeviceRFC1201(BaseDevice):
         # BYTE5,BYTE6 are the Z position data in 16 bits value.
         #   The first byte is MSB byte data and second byte is LSB byte data.
         # BYTE7 always 0xAA
-        result = self.connection.get_exact(cmd, expected=b"", size=7)
-        x, y, z, dummy = struct.unpack(">hhhB", result)
-        return x, y, z
+        result = self._get_optional_reading("gyro")
+        return self._parse_gyro(result)
 
     def get_voltage(self) -> float:
         """
@@ -186,9 +216,7 @@ class DeviceRFC1201(BaseDevice):
         """
         cmd = b"<GETVOLT>>"
         result = self.connection.get_exact(cmd, expected=b"", size=1)
-        # result example: b'*'.hex() -> '2a' -> int('2a', 16) -> 42 -> 4.2V
-        result = int(result.hex(), 16) / 10
-        return result
+        return self._parse_voltage(result)
 
     def get_datetime(self) -> datetime.datetime:
         """
@@ -202,13 +230,7 @@ class DeviceRFC1201(BaseDevice):
         # Return: Seven bytes data: YY MM DD HH MM SS 0xAA
         cmd = b"<GETDATETIME>>"
         data = self.connection.get_exact(cmd, expected=b"", size=7)
-        year = int("20{0:2d}".format(data[0]))
-        month = int("{0:2d}".format(data[1]))
-        day = int("{0:2d}".format(data[2]))
-        hour = int("{0:2d}".format(data[3]))
-        minute = int("{0:2d}".format(data[4]))
-        second = int("{0:2d}".format(data[5]))
-        return datetime.datetime(year, month, day, hour, minute, second)
+        return self._parse_datetime(data)
 
     def get_config(self) -> dict:
         """
@@ -223,6 +245,7 @@ class DeviceRFC1201(BaseDevice):
         self.connection.reset_buffers()
         cfg_bytes = self.connection.get_exact(cmd, expected=b"", size=256)
         self._parse_cfg(cfg_bytes)
+        self._cache_config(cfg_bytes)
         return self._config
 
     def get_temp(self) -> float:
@@ -241,12 +264,8 @@ class DeviceRFC1201(BaseDevice):
             Device temperature is celsius.
 
         """
-        result = self.connection.get_exact(b"<GETTEMP>>", size=4)
-        sign = 1
-        if result[2] != 0:
-            sign = -1
-        temp = sign * float("{}.{}".format(result[0], result[1]))
-        return temp
+        result = self._get_optional_reading("temp")
+        return self._parse_temp(result)
 
     def heartbeat_live(self, count=60) -> Generator[int, None, None]:
         """
@@ -263,16 +282,12 @@ class DeviceRFC1201(BaseDevice):
         int
             CPS
         """
-        self.connection.reset_buffers()
+        samples = self.heartbeat_samples(count=count)
         try:
-            self._heartbeat_on()
-            for i in range(count):
-                raw = self.connection.read_until(expected=b"", size=2)
-                # only first 14 bits are used, because why not complicate things
-                cps = struct.unpack(">H", raw)[0] & 0x3FFF
-                yield cps
+            for sample in samples:
+                yield sample.cps
         finally:
-            self._heartbeat_off()
+            samples.close()
 
     def heartbeat_live_print(self, count=60) -> None:
         """
@@ -311,12 +326,14 @@ class DeviceRFC1201(BaseDevice):
         cmd = b"<POWEROFF>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def power_on(self) -> None:
         """Power ON device."""
         cmd = b"<POWERON>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def send_key(self, key_number) -> None:
         """
@@ -339,6 +356,7 @@ class DeviceRFC1201(BaseDevice):
 
         cmd = "<KEY{}>>".format(key_number).encode()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def set_datetime(self, datetime_=None) -> None:
         """
@@ -377,7 +395,7 @@ class DeviceRFC1201(BaseDevice):
         )
         cmd = b"<SETDATETIME" + dt_cmd + b">>"
         self.connection.reset_buffers()
-        result = self.connection.get_exact(cmd, expected=b"", size=1)
+        result = self._get_write_ack(cmd)
         if not result == b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
 
@@ -77,6 +77,46 @@ class DeviceRFC1801(BaseDevice):
             }
         )
 
+        # cpmh, cpml, gyro are only on some models e.g. GMC-500+; ask for them
+        self._snapshot_spec_map.update(
+            {
+                "cpm": {"cmd": b"<GETCPM>>", "size": 4, "type": ">I", "default": True},
+                "cps": {"cmd": b"<GETCPS>>", "size": 4, "type": ">I", "default": True},
+                "max_cps": {
+                    "cmd": b"<GETMAXCPS>>",
+                    "size": 4,
+                    "type": ">I",
+                    "default": True,
+                },
+                "cpmh": {"cmd": b"<GETCPMH>>", "size": 4, "type": ">I", "default": False},
+                "cpml": {"cmd": b"<GETCPML>>", "size": 4, "type": ">I", "default": False},
+                "voltage": {
+                    "cmd": b"<GETVOLT>>",
+                    "size": 5,
+                    "type": self._parse_voltage,
+                    "default": True,
+                },
+                "datetime": {
+                    "cmd": b"<GETDATETIME>>",
+                    "size": 7,
+                    "type": self._parse_datetime,
+                    "default": True,
+                },
+                "gyro": {
+                    "cmd": b"<GETGYRO>>",
+                    "size": 7,
+                    "type": self._parse_gyro,
+                    "default": False,
+                },
+            }
+        )
+        self._optional_readings = ("max_cps", "cpmh", "cpml", "gyro")
+
+    @staticmethod
+    def _parse_voltage(data: bytes) -> float:
+        # e.g. b'4.8v\x00' -> float(b'4.8')
+        return float(data[0:3])
+
     def get_cpm(self) -> int:
         """
         Get CPM counts-per-minute data.
@@ -97,6 +137,13 @@ class DeviceRFC1801(BaseDevice):
         count = struct.unpack(">I", result)[0]
         return count
 
+    def _get_usv_calibrations(self) -> list:
+        return [
+            (self._config["CalibrationCPM_0"], self._config["Calibration_uSv_0"]),
+            (self._config["CalibrationCPM_1"], self._config["Calibration_uSv_1"]),
+            (self._config["CalibrationCPM_2"], self._config["Calibration_uSv_2"]),
+        ]
+
     def get_usv_h(self, cpm=None) -> float:
         """
         Get µSv/h as is displayed by the device. See notes below.
@@ -123,32 +170,7 @@ class DeviceRFC1801(BaseDevice):
         if cpm is None:
             cpm = self.get_cpm()
 
-        # lazily load config... i.e. don't load it until it's needed.
-        if not self._config:
-            self.get_config()
-
-        if not self._usv_calibration_tuple:
-            calibrations = [
-                (self._config["CalibrationCPM_0"], self._config["Calibration_uSv_0"]),
-                (self._config["CalibrationCPM_1"], self._config["Calibration_uSv_1"]),
-                (self._config["CalibrationCPM_2"], self._config["Calibration_uSv_2"]),
-            ]
-            self._set_usv_calibration(calibrations)
-
-        usv_h = None
-        for calib in self._usv_calibration_tuple:
-            calib_max_cpm, calib_slope, calib_intercept = calib
-            if cpm <= calib_max_cpm:
-                usv_h = cpm * calib_slope + calib_intercept
-                break
-
-        # if usv is still None... extrapolate from last _usv_calibration_tuple point
-        # which is implicitly the highest cpm calibration via _set_usv_calibration
-        if usv_h is None:
-            calib_max_cpm, calib_slope, calib_intercept = self._usv_calibration_tuple[-1]
-            usv_h = cpm * calib_slope + calib_intercept
-
-        return usv_h
+        return self.cpm_to_usv_h(cpm)
 
     def get_cps(self) -> int:
         """
@@ -173,8 +195,7 @@ class DeviceRFC1801(BaseDevice):
         int
             Max counts per second observed
         """
-        cmd = b"<GETMAXCPS>>"
-        result = self.connection.get_exact(cmd, expected=b"", size=4)
+        result = self._get_optional_reading("max_cps")
         count = struct.unpack(">I", result)[0]
         return count
 
@@ -194,8 +215,7 @@ class DeviceRFC1801(BaseDevice):
         # In total 4 bytes data return from GQ GMC unit.
         # The first byte is MSB byte data and fourth byte is LSB byte data.
         # e.g.: 00 00 00 1C     the returned CPM is 28. big-endian
-        cmd = b"<GETCPMH>>"
-        result = self.connection.get_exact(cmd, expected=b"", size=4)
+        result = self._get_optional_reading("cpmh")
         count = struct.unpack(">I", result)[0]
         return count
 
@@ -210,8 +230,7 @@ class DeviceRFC1801(BaseDevice):
         int
              Counts per minute on low dose tube (GMC has 2 tubes)
         """
-        cmd = b"<GETCPML>>"
-        result = self.connection.get_exact(cmd, expected=b"", size=4)
+        result = self._get_optional_reading("cpml")
         count = struct.unpack(">I", result)[0]
         return count
 
@@ -227,13 +246,7 @@ class DeviceRFC1801(BaseDevice):
         # Return: Seven bytes data: YY MM DD HH MM SS 0xAA
         cmd = b"<GETDATETIME>>"
         data = self.connection.get_exact(cmd, expected=b"", size=7)
-        year = int("20{0:2d}".format(data[0]))
-        month = int("{0:2d}".format(data[1]))
-        day = int("{0:2d}".format(data[2]))
-        hour = int("{0:2d}".format(data[3]))
-        minute = int("{0:2d}".format(data[4]))
-        second = int("{0:2d}".format(data[5]))
-        return datetime.datetime(year, month, day, hour, minute, second)
+        return self._parse_datetime(data)
 
     def get_gyro(self) -> Tuple[int, int, int]:
         """
@@ -246,7 +259,6 @@ class DeviceRFC1801(BaseDevice):
         Tuple[int, int, int]
             (X, Y, Z) gyroscope data
         """
-        cmd = b"<GETGYRO>>"
         # Return: Seven bytes gyroscope data in hexdecimal:
         #   BYTE1,BYTE2,BYTE3,BYTE4,BYTE5,BYTE6,BYTE7
         # Here: BYTE1,BYTE2 are the X position data in 16 bits value.
@@ -256,9 +268,8 @@ class DeviceRFC1801(BaseDevice):
         # BYTE5,BYTE6 are the Z position data in 16 bits value.
         #   The first byte is MSB byte data and second byte is LSB byte data.
         # BYTE7 always 0xAA
-        result = self.connection.get_exact(cmd, expected=b"", size=7)
-        x, y, z, dummy = struct.unpack(">hhhB", result)
-        return x, y, z
+        result = self._get_optional_reading("gyro")
+        return self._parse_gyro(result)
 
     def get_voltage(self) -> float:
         """
@@ -278,8 +289,7 @@ class DeviceRFC1801(BaseDevice):
         cmd = b"<GETVOLT>>"
         result = self.connection.get_exact(cmd, expected=b"", size=5)
         # result example: b'4.8v\x00'
-        result = float(result[0:3])  # e.g. float(b'4.8')
-        return result
+        return self._parse_voltage(result)
 
     def get_config(self) -> dict:
         """
@@ -294,6 +304,7 @@ class DeviceRFC1801(BaseDevice):
         self.connection.reset_buffers()
         cfg_bytes = self.connection.get_exact(cmd, expected=b"", size=512)
         self._parse_cfg(cfg_bytes)
+        self._cache_config(cfg_bytes)
         return self._config
 
     def power_off(self) -> None:
@@ -301,12 +312,14 @@ class DeviceRFC1801(BaseDevice):
         cmd = b"<POWEROFF>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def power_on(self) -> None:
         """Power ON device."""
         cmd = b"<POWERON>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def heartbeat_live(self, count=60) -> Generator[int, None, None]:
         """
@@ -326,15 +339,12 @@ class DeviceRFC1801(BaseDevice):
             CPS - Counts-Per-Second int
 
         """
-        self.connection.reset_buffers()
+        samples = self.heartbeat_samples(count=count)
         try:
-            self._heartbeat_on()
-            for i in range(count):
-                raw = self.connection.read_until(expected=b"", size=4)
-                cps = struct.unpack(">I", raw)[0]
-                yield cps
+            for sample in samples:
+                yield sample.cps
         finally:
-            self._heartbeat_off()
+            samples.close()
 
     def heartbeat_live_print(self, count=60) -> None:
         """
@@ -388,6 +398,7 @@ class DeviceRFC1801(BaseDevice):
 
         cmd = "<KEY{}>>".format(key_number).encode()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def set_datetime(self, datetime_=None) -> None:
         """
@@ -426,7 +437,7 @@ class DeviceRFC1801(BaseDevice):
         )
         cmd = b"<SETDATETIME" + dt_cmd + b">>"
         self.connection.reset_buffers()
-        result = self.connection.get_exact(cmd, expected=b"", size=1)
+        result = self._get_write_ack(cmd)
         if not result == b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
 
@@ -443,16 +454,18 @@ class DeviceRFC1801(BaseDevice):
     def set_wifi_on(self) -> None:
         """Set WiFi On"""
         cmd = b"<WiFiON>>"
-        result = self.connection.get_exact(cmd, size=1)
+        result = self._get_write_ack(cmd)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
 
     def set_wifi_off(self) -> None:
         """Set WiFi Off"""
         cmd = b"<WiFiOFF>>"
-        result = self.connection.get_exact(cmd, size=1)
+        result = self._get_write_ack(cmd)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
 
     def set_wifi_ssid(self, ssid, bytes_encoding: str = "utf8") -> None:
         r"""
@@ -474,9 +487,10 @@ class DeviceRFC1801(BaseDevice):
 
         """
         cmd = b"<SETSSID" + bytes(ssid, encoding=bytes_encoding) + b">>"
-        result = self.connection.get_exact(cmd, size=1)
+        result = self._get_write_ack(cmd)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
 
     def set_wifi_password(self, password=None, bytes_encoding: str = "utf8"):
         r"""
@@ -509,6 +523,7 @@ class DeviceRFC1801(BaseDevice):
         result = self.connection.read_until(size=1)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
 
     def set_gmcmap_user_id(self, user_id: str) -> None:
         r"""
@@ -529,9 +544,10 @@ class DeviceRFC1801(BaseDevice):
 
         """
         cmd = b"<SETUSERID" + bytes(user_id, encoding="utf8") + b">>"
-        result = self.connection.get_exact(cmd, size=1)
+        result = self._get_write_ack(cmd)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
 
     def set_gmcmap_counter_id(self, counter_id: str):
         r"""
@@ -550,6 +566,85 @@ class DeviceRFC1801(BaseDevice):
 
         """
         cmd = b"<SETCOUNTERID" + bytes(counter_id, encoding="utf8") + b">>"
-        result = self.connection.get_exact(cmd, size=1)
+        result = self._get_write_ack(cmd)
         if result != b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
+        self._invalidate_config()
+
+    def _write_cfg_cmd(self, cmd: bytes, retries: int = 1) -> None:
+        for attempt in range(retries + 1):
+            result = self._get_write_ack(cmd)
+            if result == b"\xaa":
+                return
+            logger.debug(f"Config write attempt={attempt} cmd={cmd} result={result}")
+            self.connection.reset_buffers()
+        raise RuntimeError("Unexpected response: {}".format(result))
+
+    def _write_cfg(self, cfg_bytes: bytes, indexes, erase: bool) -> None:
+        self.connection.reset_buffers()
+        if erase:
+            # erase sets every byte to 0xFF
+            self._write_cfg_cmd(b"<ECFG>>")
+        for i in indexes:
+            # <WCFG[A1][A0][D0]>> 2 byte address for the 512 byte config
+            self._write_cfg_cmd(b"<WCFG" + struct.pack(">HB", i, cfg_bytes[i]) + b">>")
+        self._write_cfg_cmd(b"<CFGUPDATE>>")
+
+    def set_config(self, changes: dict) -> None:
+        r"""
+        Set device config fields.
+
+        Only the changed bytes are written. Per GQ-RFC1801 <WCFG>> can't change a bit
+        from 0 to 1 without erasing the config first. So if a change only clears bits,
+        the changed bytes are written as-is; otherwise (e.g. turning a setting on) the
+        config is erased (<ECFG>>) & every non-0xFF byte written back, GQ's documented
+        sequence.
+
+        A failed write is retried once. If it still fails, the previous config is
+        written back (erase & rewrite) before the error is raised.
+
+        Parameters
+        ----------
+        changes: dict
+            {config name: new value} e.g. {"Power": 0} see get_config()
+
+        Raises
+        ------
+        ValueError
+            Unknown config name or invalid value.
+        RuntimeError:
+            GQ spec specifies a b"\xaa" response for success.
+            RuntimeError for Unexpected response.
+
+        """
+        if not self._cfg_bytes:
+            self.get_config()
+        old = self._cfg_bytes
+        new = self._encode_cfg(changes)
+        changed = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+        if not changed:
+            logger.debug("Config unchanged, nothing to write")
+            return
+
+        erase = not all(new[i] & old[i] == new[i] for i in changed)
+        writes = [i for i, x in enumerate(new) if x != 0xFF] if erase else changed
+        logger.debug(f"Writing {len(writes)} config byte(s), erase={erase}")
+
+        # the device config is unknown until every write succeeded
+        self._invalidate_config()
+        try:
+            self._write_cfg(new, writes, erase=erase)
+        except Exception as e:  # noqa - serial or unexpected response, restore & raise
+            logger.warning(f"Config write failed, restoring previous config: {e}")
+            try:
+                self._write_cfg(old, [i for i, x in enumerate(old) if x != 0xFF], True)
+            except Exception:  # noqa - same as above
+                logger.exception(
+                    "Unable to restore previous config, check device settings"
+                )
+            raise
+
+        self._parse_cfg(new)
+        # calibration may have changed
+        self._usv_calibration_tuple = tuple()
+        self._cache_config(new)
@@ -180,6 +180,19 @@ class DeviceSpec404(BaseDevice):
             },
         }
 
+        self._snapshot_spec_map.update(
+            {
+                "cpm": {"cmd": b"<GETCPM>>", "size": 4, "type": ">I", "default": True},
+                "cps": {"cmd": b"<GETCPS>>", "size": 4, "type": ">I", "default": True},
+                "datetime": {
+                    "cmd": b"<GETDATETIME>>",
+                    "size": 7,
+                    "type": self._parse_datetime,
+                    "default": True,
+                },
+            }
+        )
+
     def get_cpm(self) -> int:
         """
         Get CPM counts-per-minute data.
@@ -198,6 +211,16 @@ class DeviceSpec404(BaseDevice):
         count = struct.unpack(">I", result)[0]
         return count
 
+    def _get_usv_calibrations(self) -> list:
+        return [
+            (self._config["Calibration_CPM_1"], self._config["Calibration_USV_1"]),
+            (self._config["Calibration_CPM_2"], self._config["Calibration_USV_2"]),
+            (self._config["Calibration_CPM_3"], self._config["Calibration_USV_3"]),
+            (self._config["Calibration_CPM_4"], self._config["Calibration_USV_4"]),
+            (self._config["Calibration_CPM_5"], self._config["Calibration_USV_5"]),
+            (self._config["Calibration_CPM_6"], self._config["Calibration_USV_6"]),
+        ]
+
     def get_usv_h(self, cpm=None) -> float:
         """
         Get µSv/h as is displayed by the device. See notes below.
@@ -224,35 +247,7 @@ class DeviceSpec404(BaseDevice):
         if cpm is None:
             cpm = self.get_cpm()
 
-        # lazily load config... i.e. don't load it until it's needed.
-        if not self._config:
-            self.get_config()
-
-        if not self._usv_calibration_tuple:
-            calibrations = [
-                (self._config["Calibration_CPM_1"], self._config["Calibration_USV_1"]),
-                (self._config["Calibration_CPM_2"], self._config["Calibration_USV_2"]),
-                (self._config["Calibration_CPM_3"], self._config["Calibration_USV_3"]),
-                (self._config["Calibration_CPM_4"], self._config["Calibration_USV_4"]),
-                (self._config["Calibration_CPM_5"], self._config["Calibration_USV_5"]),
-                (self._config["Calibration_CPM_6"], self._config["Calibration_USV_6"]),
-            ]
-            self._set_usv_calibration(calibrations)
-
-        usv_h = None
-        for calib in self._usv_calibration_tuple:
-            calib_max_cpm, calib_slope, calib_intercept = calib
-            if cpm <= calib_max_cpm:
-                usv_h = cpm * calib_slope + calib_intercept
-                break
-
-        # if usv is still None... extrapolate from last _usv_calibration_tuple point
-        # which is implicitly the highest cpm calibration via _set_usv_calibration
-        if usv_h is None:
-            calib_max_cpm, calib_slope, calib_intercept = self._usv_calibration_tuple[-1]
-            usv_h = cpm * calib_slope + calib_intercept
-
-        return usv_h
+        return self.cpm_to_usv_h(cpm)
 
     def get_cps(self) -> int:
         """
@@ -280,13 +275,7 @@ class DeviceSpec404(BaseDevice):
         # Return: Seven bytes data: YY MM DD HH MM SS 0xAA
         cmd = b"<GETDATETIME>>"
         data = self.connection.get_exact(cmd, expected=b"", size=7)
-        year = int("20{0:2d}".format(data[0]))
-        month = int("{0:2d}".format(data[1]))
-        day = int("{0:2d}".format(data[2]))
-        hour = int("{0:2d}".format(data[3]))
-        minute = int("{0:2d}".format(data[4]))
-        second = int("{0:2d}".format(data[5]))
-        return datetime.datetime(year, month, day, hour, minute, second)
+        return self._parse_datetime(data)
 
     def get_config(self) -> dict:
         """
@@ -301,6 +290,7 @@ class DeviceSpec404(BaseDevice):
         self.connection.reset_buffers()
         cfg_bytes = self.connection.get_exact(cmd, expected=b"", size=512)
         self._parse_cfg(cfg_bytes)
+        self._cache_config(cfg_bytes)
         return self._config
 
     def power_off(self) -> None:
@@ -308,12 +298,14 @@ class DeviceSpec404(BaseDevice):
         cmd = b"<POWEROFF>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def power_on(self) -> None:
         """Power ON device."""
         cmd = b"<POWERON>>"
         self.connection.reset_buffers()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def heartbeat_live(self, count=60) -> Generator[int, None, None]:
         """
@@ -333,15 +325,12 @@ class DeviceSpec404(BaseDevice):
             CPS - Counts-Per-Second int
 
         """
-        self.connection.reset_buffers()
+        samples = self.heartbeat_samples(count=count)
         try:
-            self._heartbeat_on()
-            for i in range(count):
-                raw = self.connection.read_until(expected=b"", size=4)
-                cps = struct.unpack(">I", raw)[0]
-                yield cps
+            for sample in samples:
+                yield sample.cps
         finally:
-            self._heartbeat_off()
+            samples.close()
 
     def heartbeat_live_print(self, count=60) -> None:
         """
@@ -395,6 +384,7 @@ class DeviceSpec404(BaseDevice):
 
         cmd = "<KEY{}>>".format(key_number).encode()
         self.connection.write(cmd)
+        self._invalidate_config()
 
     def set_datetime(self, datetime_=None) -> None:
         """
@@ -433,7 +423,7 @@ class DeviceSpec404(BaseDevice):
         )
         cmd = b"<SETDATETIME" + dt_cmd + b">>"
         self.connection.reset_buffers()
-        result = self.connection.get_exact(cmd, expected=b"", size=1)
+        result = self._get_write_ack(cmd)
         if not result == b"\xaa":
             raise RuntimeError("Unexpected response: {}".format(result))
 
@@ -7,6 +7,8 @@ from .device_rfc1201 import DeviceRFC1201
 class GMC300(DeviceRFC1201):
     """GMC-300"""
 
+    _flash_memory_size_bytes = 2**16  # 64 KiB
+
     def __init__(
         self,
         port,
@@ -37,7 +39,6 @@ class GMC300(DeviceRFC1201):
             super().__init__(conn)
         else:
             raise ConnectionError(f"Unable to connect port={port} baudrate={baudrate}")
-        self._flash_memory_size_bytes = 2**16
         self._baudrate = 57600
 
 
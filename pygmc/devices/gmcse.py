@@ -7,6 +7,9 @@ from .device_rfc1201 import DeviceRFC1201
 class GMCSE(DeviceRFC1201):
     """GMC-SE"""
 
+    # https://www.gqelectronicsllc.com/support/GMC_Selection_Guide.htm
+    _flash_memory_size_bytes = 2**21  # 2 MiB
+
     def __init__(
         self,
         port,
@@ -38,6 +41,4 @@ class GMCSE(DeviceRFC1201):
         else:
             raise ConnectionError(f"Unable to connect port={port} baudrate={baudrate}")
 
-        # https://www.gqelectronicsllc.com/support/GMC_Selection_Guide.htm
-        self._flash_memory_size_bytes = 2**21  # 2 MiB
         self._baudrate = baudrate
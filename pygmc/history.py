@@ -1,7 +1,10 @@
+import csv
 import datetime
 import logging
+import queue
 import struct
 from io import BufferedIOBase
+from typing import Generator
 
 logger = logging.getLogger(__name__)
 
@@ -9,7 +12,9 @@ logger = logging.getLogger(__name__)
 class HistoryParser:
     """Parse GQ GMC device history data."""
 
-    def __init__(self, data=None, filename=None):
+    columns = ["datetime", "count", "unit", "mode", "reference_datetime", "notes"]
+
+    def __init__(self, data=None, filename=None, lazy=False):
         """
         Parse GMC flash memory saved history data.
 
@@ -21,6 +26,9 @@ class HistoryParser:
         filename: str | BufferedIOBase | None
             Path to file to open or an BufferedIOBase i.e. open(file, 'rb')
             data takes priority over filename.
+        lazy: bool
+            Default=False parses all data now. True parses as iter_data() is consumed
+            without keeping the parsed data, i.e. constant memory for any size history.
 
         """
         if isinstance(data, bytes):
@@ -35,14 +43,7 @@ class HistoryParser:
         self._datetime = None
         self._unit = None
         self._mode = None
-        self._columns = [
-            "datetime",
-            "count",
-            "unit",
-            "mode",
-            "reference_datetime",
-            "notes",
-        ]
+        self._columns = list(self.columns)
         self._data = []
         # notes = [(datetime, notes), ...]
         self._notes = []
@@ -53,9 +54,15 @@ class HistoryParser:
         # last notes - add to next data input and reset to blank
         self._last_note = None
         self._eof_check = 0
+        self._lazy = lazy
+        # lazy source already parsed by iter_data() or _get_columns(), nothing kept
+        self._consumed = False
+        # history_columnar.ColumnBuilder rows go to instead of _data, see _get_columns()
+        self._builder = None
 
         # parse
-        self._parse()
+        if not lazy:
+            self._parse()
 
     def _get_count_data(self, com_str):
         if len(com_str) == 1:
@@ -152,15 +159,19 @@ class HistoryParser:
         else:
             note = None
 
-        data = (
-            self._datetime,
-            count,
-            self._unit,
-            self._mode,
-            self._last_reference_datetime,
-            note,
-        )
-        self._data.append(data)
+        if self._builder is not None:
+            # typed columns, no row tuple
+            self._builder.add(self._datetime, count, self._context_history[-1], note)
+        else:
+            data = (
+                self._datetime,
+                count,
+                self._unit,
+                self._mode,
+                self._last_reference_datetime,
+                note,
+            )
+            self._data.append(data)
 
         # check suspicious 255 values
         # Ok, Hubert Farnsworth, Rick Sanchez...
@@ -186,92 +197,136 @@ class HistoryParser:
         # The meat of the matter...
         try:
             while True:
-                # command
-                com_str = self._raw.read(1)
-                if len(com_str) == 0:
-                    # nothing left to read...
-                    # use raise as exit ship...
-                    raise EOFError  # noqa
-
-                com = ord(com_str)
-                # 0x55 (85) Could be context, 2-byte count, notes, OR a regular count
-                if com == 85:
-                    com_str2 = self._raw.read(1)
-                    com2 = ord(com_str2)
-                    # 0xaa (170)
-                    if com2 == 170:
-                        com_str3 = self._raw.read(1)
-                        com3 = ord(com_str3)
-                        # 0x00 (0)
-                        # context data - save mode & datetime
-                        if com3 == 0:
-                            data = self._raw.read(9)
-                            ref_dt, unit, mode = self._get_context(data)
-                            self._set_context(ref_dt, unit, mode)
-                        # 0x01 (1)
-                        elif com3 == 1:
-                            # two byte count number
-                            # so... max CPM is 65,535?
-                            data = self._raw.read(2)
-                            n = self._get_count_data(data)
-                            self._add_to_df(n)
-                        # 0x02 (2)
-                        elif com3 == 2:
-                            # Notes flag
-                            # bytes size of notes (so max notes size is 255?)
-                            data = self._raw.read(1)
-                            size = ord(data)
-                            notes = self._raw.read(size)
-                            self._add_notes(notes)
-                        elif com3 == 3:
-                            # three byte count number
-                            # max CPM 16,777,216 (including 0) 2^24
-                            data = self._raw.read(3)
-                            n = self._get_count_data(data)
-                            self._add_to_df(n)
-                        elif com3 == 4:
-                            # four byte count number? 2^32
-                            # The last number you'll see! Guaranteed!
-                            data = self._raw.read(4)
-                            n = self._get_count_data(data)
-                            self._add_to_df(n)
-                        elif com3 == 5:
-                            # tube selection: 0=both
-                            tube = self._raw.read(1)
-                            # My GMC-500+ had instances where it failed to record tube
-                            if tube == b"U":
-                                # An unknown bug... start of cmd w/o tube specified
-                                # was expecting \x00 (both) or 1 or 2
-                                i = self._raw.tell()  # current read position
-                                self._raw.seek(i - 1)  # go back one byte
-                                # have to read more than 1 byte to get here i.e. not neg
-                            # perhaps add tube selection as column?
-                        else:
-                            # Whoa! You just hit a rare event
-                            # Counts: 85 then 170 then not 0, 1, 2, 3, 4, 5
-                            # Though a low number here would be a suspicious undocumented
-                            # feature/cmd... let's still treat them as counts to raise
-                            # the attention of a user to file an issue.
-                            n = self._get_count_data(com_str)
-                            self._add_to_df(n)
-                            n = self._get_count_data(com_str2)
-                            self._add_to_df(n)
-                            n = self._get_count_data(com_str3)
-                            self._add_to_df(n)
-                    else:
-                        # Turns out com=85 was a count and not a command flag
-                        # Need to log them as counts, then
-                        n = self._get_count_data(com_str)
-                        self._add_to_df(n)
-                        n = self._get_count_data(com_str2)
-                        self._add_to_df(n)
+                self._parse_command()
+        except EOFError:
+            # we hit end of file
+            logger.info("End of history data")
+            self._raw.close()
+
+    def _parse_command(self):
+        """Parse the next command (or count) in the data. Raises EOFError at the end."""
+        # command
+        com_str = self._raw.read(1)
+        if len(com_str) == 0:
+            # nothing left to read...
+            # use raise as exit ship...
+            raise EOFError  # noqa
+
+        com = ord(com_str)
+        # 0x55 (85) Could be context, 2-byte count, notes, OR a regular count
+        if com == 85:
+            com_str2 = self._raw.read(1)
+            com2 = ord(com_str2)
+            # 0xaa (170)
+            if com2 == 170:
+                com_str3 = self._raw.read(1)
+                com3 = ord(com_str3)
+                # 0x00 (0)
+                # context data - save mode & datetime
+                if com3 == 0:
+                    data = self._raw.read(9)
+                    ref_dt, unit, mode = self._get_context(data)
+                    self._set_context(ref_dt, unit, mode)
+                # 0x01 (1)
+                elif com3 == 1:
+                    # two byte count number
+                    # so... max CPM is 65,535?
+                    data = self._raw.read(2)
+                    n = self._get_count_data(data)
+                    self._add_to_df(n)
+                # 0x02 (2)
+                elif com3 == 2:
+                    # Notes flag
+                    # bytes size of notes (so max notes size is 255?)
+                    data = self._raw.read(1)
+                    size = ord(data)
+                    notes = self._raw.read(size)
+                    self._add_notes(notes)
+                elif com3 == 3:
+                    # three byte count number
+                    # max CPM 16,777,216 (including 0) 2^24
+                    data = self._raw.read(3)
+                    n = self._get_count_data(data)
+                    self._add_to_df(n)
+                elif com3 == 4:
+                    # four byte count number? 2^32
+                    # The last number you'll see! Guaranteed!
+                    data = self._raw.read(4)
+                    n = self._get_count_data(data)
+                    self._add_to_df(n)
+                elif com3 == 5:
+                    # tube selection: 0=both
+                    tube = self._raw.read(1)
+                    # My GMC-500+ had instances where it failed to record tube
+                    if tube == b"U":
+                        # An unknown bug... start of cmd w/o tube specified
+                        # was expecting \x00 (both) or 1 or 2
+                        i = self._raw.tell()  # current read position
+                        self._raw.seek(i - 1)  # go back one byte
+                        # have to read more than 1 byte to get here i.e. not neg
+                    # perhaps add tube selection as column?
                 else:
+                    # Whoa! You just hit a rare event
+                    # Counts: 85 then 170 then not 0, 1, 2, 3, 4, 5
+                    # Though a low number here would be a suspicious undocumented
+                    # feature/cmd... let's still treat them as counts to raise
+                    # the attention of a user to file an issue.
                     n = self._get_count_data(com_str)
                     self._add_to_df(n)
+                    n = self._get_count_data(com_str2)
+                    self._add_to_df(n)
+                    n = self._get_count_data(com_str3)
+                    self._add_to_df(n)
+            else:
+                # Turns out com=85 was a count and not a command flag
+                # Need to log them as counts, then
+                n = self._get_count_data(com_str)
+                self._add_to_df(n)
+                n = self._get_count_data(com_str2)
+                self._add_to_df(n)
+        else:
+            n = self._get_count_data(com_str)
+            self._add_to_df(n)
+
+    def iter_data(self) -> Generator[tuple, None, None]:
+        """
+        Get parsed data, as a generator.
+
+        With lazy=True, rows are parsed as they're consumed; a trailing run of 255
+        counts is held back until it's known not to be the end of data (like
+        get_data()). Can only be consumed once.
+
+        Yields
+        ------
+        tuple
+            ("datetime", "count", "unit", "mode", "reference_datetime", "notes")
+
+        Raises
+        ------
+        RuntimeError
+            lazy=True data already consumed.
+
+        """
+        if not self._lazy:
+            self._check_not_consumed()
+            yield from self.get_data()
+            return
+
+        self._lazy = False
+        self._consumed = True
+        try:
+            while True:
+                self._parse_command()
+                ready = len(self._data) - self._eof_check
+                if ready > 0:
+                    yield from self._data[:ready]
+                    del self._data[:ready]
         except EOFError:
             # we hit end of file
             logger.info("End of history data")
             self._raw.close()
+        # anything left is the trailing 255's get_data() drops
+        self._data.clear()
 
     def get_data(self):
         """Get parsed data."""
@@ -284,6 +339,172 @@ class HistoryParser:
         """Get column names."""
         return self._columns
 
+    def _check_not_consumed(self):
+        # rows of a lazy parser aren't kept, a second read would silently be empty
+        if self._consumed:
+            raise RuntimeError(
+                "History data already consumed; lazy=True can only be read once"
+            )
+
+    def _get_columns(self):
+        """
+        Get parsed data as history_columnar.Columns.
+
+        With lazy=True the parser writes typed columns directly, no row tuples. Like
+        iter_data(), can only be consumed once.
+        """
+        from .history_columnar import ColumnBuilder, collect_columns
+
+        if not self._lazy:
+            # already parsed
+            self._check_not_consumed()
+            return collect_columns(self.get_data())
+
+        self._lazy = False
+        self._consumed = True
+        self._builder = ColumnBuilder()
+        try:
+            self._parse()
+            # trailing 255's get_data() drops
+            self._builder.drop_last(self._eof_check)
+            return self._builder.get_columns()
+        finally:
+            self._builder = None
+
+    def to_arrow(self):
+        """
+        Get parsed data as an Arrow table, needs optional pyarrow.
+
+        unit & mode are dictionary encoded, datetimes are timestamp[s].
+        Parse with lazy=True, otherwise the rows are also kept as tuples (get_data()).
+
+        Returns
+        -------
+        pyarrow.Table
+            A chunk per context segment.
+
+        Raises
+        ------
+        RuntimeError
+            lazy=True data already consumed e.g. a second call.
+
+        """
+        from .history_arrow import to_arrow
+
+        return to_arrow(self._get_columns())
+
+    def to_pandas(self):
+        """
+        Get parsed data as a pandas DataFrame, needs optional pandas.
+
+        Built from typed arrays; datetime64[s] datetimes & categorical unit/mode.
+        Parse with lazy=True, otherwise the rows are also kept as tuples (get_data()).
+
+        Returns
+        -------
+        pandas.DataFrame
+
+        Raises
+        ------
+        RuntimeError
+            lazy=True data already consumed e.g. a second call.
+
+        """
+        from .history_frames import to_pandas
+
+        return to_pandas(self._get_columns())
+
+    def to_polars(self):
+        """
+        Get parsed data as a polars DataFrame, needs optional polars.
+
+        Built from typed arrays; datetime[ms] datetimes & categorical unit/mode.
+        Parse with lazy=True, otherwise the rows are also kept as tuples (get_data()).
+
+        Returns
+        -------
+        polars.DataFrame
+
+        Raises
+        ------
+        RuntimeError
+            lazy=True data already consumed e.g. a second call.
+
+        """
+        from .history_frames import to_polars
+
+        return to_polars(self._get_columns())
+
+
+class _DatetimeFormatter:
+    """
+    Render datetimes like str(datetime), but faster for rows in time order.
+
+    The date part is cached for the current day & the time part per second of the day
+    (at most 86,400 strings, no matter how long the history).
+    """
+
+    def __init__(self):
+        self._day = None
+        self._day_str = ""
+        self._times = {}
+
+    def __call__(self, dt):
+        if dt is None:
+            return None
+        if dt.microsecond:
+            return str(dt)
+        day = dt.toordinal()
+        if day != self._day:
+            self._day = day
+            self._day_str = f"{dt.date()} "
+        seconds = dt.hour * 3600 + dt.minute * 60 + dt.second
+        time_str = self._times.get(seconds)
+        if time_str is None:
+            time_str = f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+            self._times[seconds] = time_str
+        return self._day_str + time_str
+
+
+def write_csv(file, rows, columns=None, chunk_size=1024) -> None:
+    """
+    Write history rows as CSV, streaming in chunks.
+
+    Same output as csv.writer(file).writerows([columns, *rows]) but rows can be any
+    iterable (e.g. HistoryParser.iter_data()) and are never all in memory at once.
+
+    Parameters
+    ----------
+    file: file-like
+        Open text file e.g. open(file_path, "w", newline="")
+    rows: Iterable
+        Rows of HistoryParser data.
+    columns: list | None
+        Header row. Default=None writes no header.
+    chunk_size: int
+        Rows formatted & written per writerows() call.
+
+    """
+    csv_writer = csv.writer(file, delimiter=",")
+    if columns:
+        csv_writer.writerow(columns)
+
+    format_datetime = _DatetimeFormatter()
+    # reference datetime only changes once per context segment
+    reference = None
+    reference_str = None
+    chunk = []
+    for row in rows:
+        if row[4] is not reference:
+            reference = row[4]
+            reference_str = format_datetime(reference)
+        chunk.append((format_datetime(row[0]), *row[1:4], reference_str, *row[5:]))
+        if len(chunk) >= chunk_size:
+            csv_writer.writerows(chunk)
+            chunk.clear()
+    if chunk:
+        csv_writer.writerows(chunk)
+
 
 class _BinFile:
     """A dummy class so raw bytes and BufferedIOBase can be treated the same."""
@@ -332,3 +553,97 @@ class _BinFile:
         """
         self._i = i
         return self._i
+
+
+class HistoryStream(BufferedIOBase):
+    """
+    Read-only stream of history data that arrives in chunks, e.g. from another thread.
+
+    A producer put()'s pages as they're downloaded then put_eof(); HistoryParser reads
+    them as they arrive. Reads block until enough data has arrived. Like _BinFile, a
+    read past the end raises EOFError.
+    """
+
+    # keep this much read data for tell()/seek() back (the parser seeks back 1 byte)
+    _KEEP = 16
+
+    def __init__(self):
+        """Represent a history stream, empty until data is put."""
+        super().__init__()
+        self._queue = queue.Queue()
+        self._buffer = bytearray()
+        self._pos = 0  # read position in _buffer
+        self._offset = 0  # stream position of _buffer[0]
+        self._eof = False
+
+    def put(self, data: bytes) -> None:
+        """Add data to the end of the stream (producer)."""
+        self._queue.put(data)
+
+    def put_error(self, error: BaseException) -> None:
+        """Make the reader raise error once it has read all data put before (producer)."""
+        self._queue.put(error)
+
+    def put_eof(self) -> None:
+        """Mark the end of the stream (producer)."""
+        self._queue.put(None)
+
+    def readable(self):
+        """Stream is readable."""
+        return True
+
+    def read(self, size=-1):
+        """
+        Read size bytes, waiting for them to arrive.
+
+        Parameters
+        ----------
+        size: int
+            Bytes to read. Default=-1 reads until the end of the stream.
+
+        Returns
+        -------
+        bytes
+
+        Raises
+        ------
+        EOFError
+            Stream ended before size bytes.
+
+        """
+        while not self._eof and (size < 0 or len(self._buffer) - self._pos < size):
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+            elif isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            else:
+                self._buffer += item
+
+        if size < 0:
+            size = len(self._buffer) - self._pos
+        if len(self._buffer) - self._pos < size:
+            self._pos = len(self._buffer)
+            raise EOFError
+        data = bytes(self._buffer[self._pos : self._pos + size])
+        self._pos += size
+
+        if self._pos > 2**16:
+            # drop what's been read
+            drop = self._pos - self._KEEP
+            del self._buffer[:drop]
+            self._pos -= drop
+            self._offset += drop
+        return data
+
+    def tell(self):
+        """Return current stream position."""
+        return self._offset + self._pos
+
+    def seek(self, i, whence=0):
+        """Change stream position, only to a position since the last few bytes read."""
+        if whence != 0 or not 0 <= i - self._offset <= len(self._buffer):
+            raise ValueError(f"Unable to seek to {i} in a HistoryStream")
+        self._pos = i - self._offset
+        return i
@@ -0,0 +1,99 @@
+"""
+pandas & polars DataFrames of parsed history.
+
+Needs the optional pandas or polars package (both need NumPy).
+
+Rows are collected into typed arrays (history_columnar.collect_columns) and the frame is
+built from those: datetime64[s] datetimes, uint32 counts & categorical unit/mode. No
+object dtype datetime columns and no list of row tuples for the frame constructor.
+HistoryParser(lazy=True) parses straight into the typed arrays.
+
+e.g.
+    df = pygmc.HistoryParser(data=gc.get_raw_history(), lazy=True).to_pandas()
+"""
+
+from .history_columnar import MODES, UNITS, collect_columns
+
+
+def _get_numpy_columns(rows) -> dict:
+    """Get history rows as NumPy arrays; unit & mode as codes of UNITS & MODES."""
+    import numpy as np
+
+    timestamps, counts, segments, notes = collect_columns(rows)
+    n = len(counts)
+
+    # each segment's context repeated for its rows
+    starts = np.array([segment[0] for segment in segments] + [n], dtype=np.int64)
+    lengths = np.diff(starts)
+    references = np.array([segment[1] for segment in segments], dtype=np.int64)
+    units = np.array([segment[2] for segment in segments], dtype=np.int8)
+    modes = np.array([segment[3] for segment in segments], dtype=np.int8)
+
+    notes_column = np.full(n, None, dtype=object)
+    for row, note in notes:
+        notes_column[row] = note
+
+    return {
+        # frombuffer, no copy of the arrays
+        "datetime": np.frombuffer(timestamps, dtype=np.int64).view("datetime64[s]"),
+        "count": np.frombuffer(counts, dtype=np.uint32),
+        "unit": np.repeat(units, lengths),
+        "mode": np.repeat(modes, lengths),
+        # None reference is -2**63 i.e. NaT
+        "reference_datetime": np.repeat(references, lengths).view("datetime64[s]"),
+        "notes": notes_column,
+    }
+
+
+def to_pandas(rows):
+    """
+    Get history rows as a pandas DataFrame.
+
+    Parameters
+    ----------
+    rows: Iterable | Columns
+        Rows of HistoryParser data e.g. HistoryParser.iter_data(), or collect_columns()
+
+    Returns
+    -------
+    pandas.DataFrame
+        datetime64[s] datetimes (NaT for None), uint32 count, category unit & mode.
+
+    """
+    import pandas as pd
+
+    columns = _get_numpy_columns(rows)
+    columns["unit"] = pd.Categorical.from_codes(columns["unit"], categories=UNITS)
+    columns["mode"] = pd.Categorical.from_codes(columns["mode"], categories=MODES)
+    return pd.DataFrame(columns, copy=False)
+
+
+def to_polars(rows):
+    """
+    Get history rows as a polars DataFrame.
+
+    Parameters
+    ----------
+    rows: Iterable | Columns
+        Rows of HistoryParser data e.g. HistoryParser.iter_data(), or collect_columns()
+
+    Returns
+    -------
+    polars.DataFrame
+        datetime[ms] datetimes (polars has no second resolution), uint32 count,
+        categorical unit & mode.
+
+    """
+    import polars as pl
+
+    columns = _get_numpy_columns(rows)
+    return pl.DataFrame(
+        {
+            "datetime": columns["datetime"].astype("datetime64[ms]"),
+            "count": columns["count"],
+            "unit": pl.Series(UNITS).gather(columns["unit"]).cast(pl.Categorical),
+            "mode": pl.Series(MODES).gather(columns["mode"]).cast(pl.Categorical),
+            "reference_datetime": columns["reference_datetime"].astype("datetime64[ms]"),
+            "notes": pl.Series(columns["notes"].tolist(), dtype=pl.String),
+        }
+    )
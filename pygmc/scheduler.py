@@ -0,0 +1,216 @@
+"""
+Poll device readings at different rates from one thread.
+
+e.g. CPM every second, voltage every minute & config every hour, for one or more
+devices, without a hand-written loop per reading.
+"""
+
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+from typing import Generator
+
+logger = logging.getLogger("pygmc.scheduler")
+
+
+# device: name given to PollScheduler.add()
+# timestamp: computer datetime of the read
+# values: {metric: value} of the metrics polled together
+PollResult = namedtuple("PollResult", ["device", "timestamp", "values"])
+
+
+class PollScheduler:
+    """
+    Poll device readings, each at its own interval, deadline-first on one thread.
+
+    Deadlines are fixed to the start time (start + n * interval) so slow reads & jitter
+    don't make the schedule drift. A reading that falls behind skips the polls it
+    missed instead of running them back-to-back. Readings of a device that are due
+    together are read with one get_snapshot() serial exchange.
+    """
+
+    def __init__(self, batch_window=0.05):
+        """
+        Represent a multi-rate polling schedule.
+
+        Parameters
+        ----------
+        batch_window: float
+            Seconds. Readings due within this window of each other are polled together.
+        """
+        self._batch_window = batch_window
+        self._devices = {}
+        # name -> metrics in the order given, to keep results tidy
+        self._metrics = {}
+        # (deadline, seq, device name, metric, interval) - seq breaks ties
+        self._heap = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, device, intervals: dict, name=None) -> str:
+        """
+        Add a device to poll.
+
+        Add all devices before starting.
+
+        Parameters
+        ----------
+        device: pygmc device
+            e.g. GMC500Plus or BrokerDevice
+        intervals: dict
+            Seconds between polls per metric e.g. {"cpm": 1, "voltage": 60, "config": 3600}
+            A metric is a get_snapshot() field or any get_<metric> method.
+        name: str | None
+            Device name used in PollResult. Default=None names it device-<n>
+
+        Returns
+        -------
+        str
+            Device name.
+
+        Raises
+        ------
+        ValueError
+            Duplicate name, unknown metric, or interval not > 0.
+
+        """
+        if name is None:
+            name = f"device-{len(self._devices)}"
+        if name in self._devices:
+            raise ValueError(f"Device name={name} already added.")
+        for metric, interval in intervals.items():
+            if not interval > 0:
+                raise ValueError(f"Interval must be > 0 ({metric}={interval})")
+            if metric not in self._get_snapshot_fields(device) and not hasattr(
+                device, f"get_{metric}"
+            ):
+                raise ValueError(f"Device has no metric={metric}")
+
+        self._devices[name] = device
+        self._metrics[name] = list(intervals)
+        # everything is polled right away then every interval
+        now = time.monotonic()
+        for metric, interval in intervals.items():
+            heapq.heappush(self._heap, (now, next(self._seq), name, metric, interval))
+        return name
+
+    @staticmethod
+    def _get_snapshot_fields(device) -> list:
+        if hasattr(device, "get_snapshot_fields"):
+            return device.get_snapshot_fields()
+        return []
+
+    def _pop_due(self, now) -> dict:
+        """Pop due metrics & schedule their next deadline. Returns {name: [metric]}"""
+        due = {}
+        popped = []
+        while self._heap and self._heap[0][0] <= now + self._batch_window:
+            popped.append(heapq.heappop(self._heap))
+
+        for deadline, _, name, metric, interval in popped:
+            if metric not in due.setdefault(name, []):
+                due[name].append(metric)
+            next_deadline = deadline + interval
+            if next_deadline <= now:
+                # fell behind; skip what's missed rather than poll it back-to-back
+                missed = int((now - deadline) // interval)
+                logger.debug(f"Skipping {missed} overdue poll(s) of {name} {metric}")
+                next_deadline = deadline + (missed + 1) * interval
+            heapq.heappush(
+                self._heap, (next_deadline, next(self._seq), name, metric, interval)
+            )
+
+        for name, metrics in due.items():
+            metrics.sort(key=self._metrics[name].index)
+        return due
+
+    def _poll_device(self, name, metrics):
+        device = self._devices[name]
+        snapshot_fields = self._get_snapshot_fields(device)
+        batch = [x for x in metrics if x in snapshot_fields]
+        timestamp = datetime.datetime.now()
+        values = {}
+        try:
+            if batch:
+                snapshot = device.get_snapshot(fields=batch)
+                timestamp = snapshot.pop("timestamp")
+                values.update(snapshot)
+            for metric in metrics:
+                if metric not in batch:
+                    values[metric] = getattr(device, f"get_{metric}")()
+        except Exception as e:  # noqa - a failed poll must not stop monitoring
+            logger.warning(f"Poll failed {name} {metrics}: {e}", exc_info=True)
+            return None
+        return PollResult(name, timestamp, {x: values[x] for x in metrics})
+
+    def poll_due(self) -> list:
+        """
+        Wait for the next deadline then poll everything due.
+
+        Returns
+        -------
+        list
+            PollResult per device polled. Empty if stopped while waiting.
+
+        """
+        if not self._heap:
+            return []
+        delay = self._heap[0][0] - time.monotonic()
+        if delay > 0 and self._stop.wait(delay):
+            return []
+
+        results = []
+        for name, metrics in self._pop_due(time.monotonic()).items():
+            result = self._poll_device(name, metrics)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def results(self) -> Generator[PollResult, None, None]:
+        """
+        Get poll results as they happen, as a generator.
+
+        Runs until stop() is called.
+
+        Yields
+        ------
+        PollResult
+
+        """
+        self._stop.clear()
+        return self._results()
+
+    def _results(self) -> Generator[PollResult, None, None]:
+        while self._heap and not self._stop.is_set():
+            yield from self.poll_due()
+
+    def start(self, callback) -> None:
+        """
+        Poll in a background thread.
+
+        Parameters
+        ----------
+        callback: callable
+            Called with each PollResult (from the scheduler thread).
+
+        """
+
+        def run():
+            for result in self._results():
+                callback(result)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="pygmc-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
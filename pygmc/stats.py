@@ -0,0 +1,163 @@
+"""
+Rolling statistics over the live CPS stream.
+
+Heartbeat gives one CPS sample per second, so a window of 60 samples is one minute and
+its sum is the moving CPM. Each window is a fixed-size ring buffer updated in constant
+time per sample, no matter how long the stream runs.
+
+e.g.
+    stats = RollingStats()
+    for cps in stats.feed(gc.heartbeat_live(count=3600)):
+        print(cps, stats.get_stats()[60]["sum"])  # moving CPM
+"""
+
+import logging
+from array import array
+from typing import Generator, Iterable
+
+logger = logging.getLogger("pygmc.stats")
+
+
+class RollingWindow:
+    """Sum, mean, variance & slope of the last <size> samples."""
+
+    def __init__(self, size: int):
+        """
+        Represent a rolling window.
+
+        Parameters
+        ----------
+        size: int
+            Number of samples in the window.
+        """
+        if size < 1:
+            raise ValueError(f"Window size must be >= 1 (size={size})")
+        self.size = size
+        self._ring = array("q", [0]) * size
+        self._pos = 0  # where the next sample goes (oldest sample when full)
+        self.count = 0
+        # ints, so no floating point error builds up over a long stream
+        self._sum = 0
+        self._sum_sq = 0
+        # sum of i * sample, i=0 for the oldest sample in the window
+        self._sum_iy = 0
+
+    def add(self, value: int) -> None:
+        """Add a sample, dropping the oldest if the window is full."""
+        n = self.count
+        if n == self.size:
+            oldest = self._ring[self._pos]
+            # every sample's index drops by one & the oldest (index 0) leaves
+            self._sum_iy += -(self._sum - oldest) + (n - 1) * value
+            self._sum += value - oldest
+            self._sum_sq += value * value - oldest * oldest
+        else:
+            self._sum_iy += n * value
+            self._sum += value
+            self._sum_sq += value * value
+            self.count += 1
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+
+    @property
+    def sum(self) -> int:
+        """Sum of samples in the window e.g. CPM for a 60 second window."""
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        """Mean sample value."""
+        if not self.count:
+            return 0.0
+        return self._sum / self.count
+
+    @property
+    def variance(self) -> float:
+        """Population variance of samples."""
+        n = self.count
+        if not n:
+            return 0.0
+        return (n * self._sum_sq - self._sum * self._sum) / (n * n)
+
+    @property
+    def slope(self) -> float:
+        """Rate-of-change; least squares slope per sample (CPS per second)."""
+        n = self.count
+        if n < 2:
+            return 0.0
+        sum_i = n * (n - 1) // 2
+        sum_ii = (n - 1) * n * (2 * n - 1) // 6
+        return (n * self._sum_iy - sum_i * self._sum) / (n * sum_ii - sum_i * sum_i)
+
+    def get_values(self) -> list:
+        """Get samples in the window, oldest first."""
+        if self.count < self.size:
+            return self._ring[: self.count].tolist()
+        return (self._ring[self._pos :] + self._ring[: self._pos]).tolist()
+
+
+class RollingStats:
+    """Rolling statistics over several window sizes of a CPS stream."""
+
+    def __init__(self, windows=(60, 600, 3600)):
+        """
+        Represent rolling CPS statistics.
+
+        Parameters
+        ----------
+        windows: tuple
+            Window sizes in samples (seconds for heartbeat). Default=1 min, 10 min, 1 h
+        """
+        self.windows = {x: RollingWindow(x) for x in windows}
+        self.total = 0
+        self.max = 0
+        self.count = 0
+
+    def add(self, cps: int) -> None:
+        """Add a CPS sample to every window."""
+        self.total += cps
+        self.count += 1
+        if cps > self.max:
+            self.max = cps
+        for window in self.windows.values():
+            window.add(cps)
+
+    def feed(self, samples: Iterable) -> Generator[int, None, None]:
+        """
+        Add each sample of a stream as it's consumed, as a generator.
+
+        Parameters
+        ----------
+        samples: Iterable
+            CPS ints e.g. heartbeat_live() or HeartbeatSample's e.g. heartbeat_samples()
+
+        Yields
+        ------
+        int | HeartbeatSample
+            Each sample, after it's added.
+
+        """
+        for sample in samples:
+            self.add(getattr(sample, "cps", sample))
+            yield sample
+
+    def get_stats(self) -> dict:
+        """
+        Get the current statistics of every window.
+
+        Returns
+        -------
+        dict
+            {window size: {"count", "sum", "mean", "variance", "slope"}}
+
+        """
+        return {
+            size: {
+                "count": x.count,
+                "sum": x.sum,
+                "mean": x.mean,
+                "variance": x.variance,
+                "slope": x.slope,
+            }
+            for size, x in self.windows.items()
+        }
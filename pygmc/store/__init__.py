@@ -0,0 +1,26 @@
+"""Persistent stores for device history."""
+
+import importlib
+
+# Imported lazily (PEP 562), same as pygmc.connection.
+_lazy_attributes = {
+    "SqliteStore": "pygmc.store.sqlite",
+}
+_lazy_submodules = ("sqlite",)
+
+
+def __getattr__(name):
+    """Import public classes & submodules on first use."""
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # only look it up once
+    return value
+
+
+def __dir__():
+    """List lazy attributes too (for auto-complete)."""
+    return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
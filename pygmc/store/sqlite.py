@@ -0,0 +1,292 @@
+"""
+SQLite store for history of many devices.
+
+Rows are keyed by (serial, timestamp) so importing overlapping history dumps, e.g. a
+daily dump of the whole flash memory, only adds the new rows.
+
+e.g.
+    with SqliteStore("history.db") as store:
+        store.ingest(gc.get_serial(), gc.iter_history_data())
+        rows = list(store.query(start=datetime.datetime(2024, 1, 1)))
+"""
+
+import logging
+import sqlite3
+from array import array
+from itertools import chain, repeat
+from typing import Generator
+
+from ..history_columnar import (
+    _NO_TIMESTAMP,
+    MODES,
+    UNITS,
+    Columns,
+    _from_timestamp,
+    _to_timestamp,
+    collect_columns,
+)
+
+logger = logging.getLogger("pygmc.store.sqlite")
+
+# Timestamps are seconds since 1970-01-01 of the (naive) device datetime, see
+# history_columnar.
+# Few columns per history row, inserting is mostly binding parameters; serial, the
+# context (reference datetime, unit & mode) & the rare notes live in their own tables.
+# WITHOUT ROWID, the primary key is the table i.e. no second copy of the key.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    serial TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    reference_timestamp INTEGER,
+    unit TEXT NOT NULL,
+    mode TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_context ON segments (reference_timestamp, unit, mode);
+CREATE TABLE IF NOT EXISTS history (
+    device INTEGER NOT NULL REFERENCES devices (id),
+    timestamp INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    segment INTEGER NOT NULL REFERENCES segments (id),
+    PRIMARY KEY (device, timestamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+CREATE TABLE IF NOT EXISTS notes (
+    device INTEGER NOT NULL REFERENCES devices (id),
+    timestamp INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (device, timestamp)
+) WITHOUT ROWID;
+CREATE VIEW IF NOT EXISTS history_view AS
+SELECT
+    devices.serial,
+    history.timestamp,
+    history.count,
+    segments.unit,
+    segments.mode,
+    segments.reference_timestamp,
+    notes.note
+FROM history
+JOIN devices ON devices.id = history.device
+JOIN segments ON segments.id = history.segment
+LEFT JOIN notes ON notes.device = history.device AND notes.timestamp = history.timestamp;
+"""
+
+_INSERT_HISTORY = "INSERT OR IGNORE INTO history VALUES (?, ?, ?, ?)"
+_INSERT_NOTE = "INSERT OR IGNORE INTO notes VALUES (?, ?, ?)"
+
+
+class SqliteStore:
+    """History of many devices in one SQLite database."""
+
+    columns = [
+        "serial",
+        "datetime",
+        "count",
+        "unit",
+        "mode",
+        "reference_datetime",
+        "notes",
+    ]
+
+    def __init__(self, file_path, batch_size=10000):
+        """
+        Open (or create) a SQLite history store.
+
+        The database is in WAL mode, readers aren't blocked while history is imported.
+
+        Parameters
+        ----------
+        file_path: str | Path
+            Database file.
+        batch_size: int
+            Default=10000 rows per executemany() when importing.
+
+        """
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(str(file_path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # with WAL, a commit is durable once checkpointed; plenty for history
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        """Use as context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close database."""
+        self.close()
+
+    def close(self) -> None:
+        """Close database."""
+        self._db.close()
+
+    def ingest(self, serial: str, rows) -> int:
+        """
+        Import history rows of a device, skipping rows already stored.
+
+        Rows are collected into typed columns (history_columnar.collect_columns) before
+        the database is written, a slow source e.g. iter_history_data() doesn't lock it
+        for the whole download. Rows are committed batch_size at a time; on an error
+        the batches already committed stay, import again to add the rest.
+
+        Parameters
+        ----------
+        serial: str
+            Device serial number e.g. get_serial()
+        rows: Iterable | Columns
+            Rows of HistoryParser data e.g. iter_history_data() or get_history_data()
+            (the column names row is skipped), or collect_columns()
+
+        Returns
+        -------
+        int
+            Number of new rows.
+
+        """
+        if not isinstance(rows, Columns):
+            rows = iter(rows)
+            first = next(rows, None)
+            # get_history_data() starts with the column names
+            if first is not None and first[0] != "datetime":
+                rows = chain([first], rows)
+        timestamps, counts, segments, notes = collect_columns(rows)
+        n = len(timestamps)
+
+        with self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO devices (serial) VALUES (?)", (serial,)
+            )
+            device = self._db.execute(
+                "SELECT id FROM devices WHERE serial = ?", (serial,)
+            ).fetchone()[0]
+            # segment id of every row, looked up once per context segment
+            segment_ids = array("q")
+            ends = [x[0] for x in segments[1:]] + [n]
+            for (start, reference, unit, mode), end in zip(segments, ends):
+                segment = self._get_segment_id(reference, UNITS[unit], MODES[mode])
+                segment_ids.extend(repeat(segment, end - start))
+
+        added = 0
+        for start in range(0, n, self.batch_size):
+            end = start + self.batch_size
+            batch_timestamps = timestamps[start:end]
+            records = zip(
+                repeat(device),
+                batch_timestamps,
+                counts[start:end],
+                segment_ids[start:end],
+            )
+            with self._db:
+                # overlapping dumps are mostly stored rows, skipping them is much
+                # cheaper than INSERT OR IGNORE
+                stored = self._get_stored_timestamps(device, batch_timestamps)
+                if stored:
+                    records = [x for x in records if x[1] not in stored]
+                # rowcount is the sum of inserted i.e. not ignored rows
+                added += self._db.executemany(_INSERT_HISTORY, records).rowcount
+        with self._db:
+            self._db.executemany(
+                _INSERT_NOTE, [(device, timestamps[row], note) for row, note in notes]
+            )
+        logger.debug(f"Imported {added} new rows of serial={serial}")
+        return added
+
+    def _get_stored_timestamps(self, device, timestamps) -> set:
+        """Get timestamps of a device stored between the min & max of timestamps."""
+        rows = self._db.execute(
+            "SELECT timestamp FROM history WHERE device = ? AND timestamp BETWEEN ? AND ?",
+            (device, min(timestamps), max(timestamps)),
+        )
+        return {row[0] for row in rows}
+
+    def _get_segment_id(self, reference, unit, mode) -> int:
+        """Get id of a context segment, added if new."""
+        if reference == _NO_TIMESTAMP:
+            reference = None
+        row = self._db.execute(
+            "SELECT id FROM segments WHERE reference_timestamp IS ? AND unit = ? AND mode = ?",
+            (reference, unit, mode),
+        ).fetchone()
+        if row:
+            return row[0]
+        cursor = self._db.execute(
+            "INSERT INTO segments (reference_timestamp, unit, mode) VALUES (?, ?, ?)",
+            (reference, unit, mode),
+        )
+        return cursor.lastrowid
+
+    def ingest_raw(self, serial: str, data: bytes) -> int:
+        """
+        Import raw history of a device e.g. get_raw_history() or a saved raw file.
+
+        Parameters
+        ----------
+        serial: str
+            Device serial number e.g. get_serial()
+        data: bytes
+            Raw device history.
+
+        Returns
+        -------
+        int
+            Number of new rows.
+
+        """
+        from ..history import HistoryParser
+
+        # parsed straight into typed columns
+        return self.ingest(serial, HistoryParser(data=data, lazy=True)._get_columns())
+
+    def query(self, serial=None, start=None, end=None) -> Generator[tuple, None, None]:
+        """
+        Get stored history rows in time order.
+
+        Parameters
+        ----------
+        serial: str | None
+            Default=None all devices.
+        start: datetime.datetime | None
+            Default=None from the first row. Inclusive.
+        end: datetime.datetime | None
+            Default=None to the last row. Exclusive.
+
+        Yields
+        ------
+        tuple
+            ("serial", "datetime", "count", "unit", "mode", "reference_datetime", "notes")
+
+        """
+        conditions = []
+        params = []
+        if serial is not None:
+            conditions.append("serial = ?")
+            params.append(serial)
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(_to_timestamp(start))
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(_to_timestamp(end))
+        sql = "SELECT * FROM history_view"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp, serial"
+
+        for row in self._db.execute(sql, params):
+            yield (
+                row[0],
+                _from_timestamp(row[1]),
+                row[2],
+                row[3],
+                row[4],
+                None if row[5] is None else _from_timestamp(row[5]),
+                row[6],
+            )
+
+    def get_serials(self) -> list:
+        """Get serial numbers of stored devices."""
+        return [row[0] for row in self._db.execute("SELECT serial FROM devices")]
@@ -36,3 +36,12 @@ def build(ctx):
 def docs(ctx):
     # Run in ./docs
     ctx.run("make html", pty=True)
+
+
+@task
+def importtime(ctx):
+    # slowest imports last
+    ctx.run(
+        'python -X importtime -c "import pygmc" 2>&1 | sort -t"|" -k2 -n | tail -15',
+        pty=True,
+    )
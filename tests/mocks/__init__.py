@@ -1 +1,2 @@
 from .connection import MockConnection
+from .flash import MockFlashConnection
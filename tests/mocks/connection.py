@@ -9,24 +9,47 @@ class MockConnection(connection.Connection):
     Limitation is it doesn't mock the buffer. That limits the testing of get_at_least.
     """
 
+    # no serial connection to hold the timeout
+    timeout = 5
+
     def __init__(self, cmd_response_map):
         super().__init__(port="dummy", baudrate=123, serial_connection="DUMMY")
-        self._cmd_response_map = cmd_response_map
+        self._cmd_response_map = dict(cmd_response_map)
         self._cmd = None
         self._cmd_calls_dict = defaultdict(int)
 
     def reset_buffers(self):
         print("reset_buffers")
 
+    def _split_cmds(self, cmd):
+        """Split back-to-back known commands e.g. b"<GETCPM>><GETCPS>>"."""
+        cmds = []
+        while cmd:
+            for known in self._cmd_response_map:
+                if cmd.startswith(known):
+                    cmds.append(known)
+                    cmd = cmd[len(known) :]
+                    break
+            else:
+                return []
+        return cmds
+
     def write(self, cmd, log=True):
         self._cmd = cmd
         self._cmd_calls_dict[cmd] += 1
         print(cmd)
+        if cmd not in self._cmd_response_map:
+            # device answers back-to-back commands with back-to-back responses
+            cmds = self._split_cmds(cmd)
+            if len(cmds) > 1:
+                self._cmd_response_map[cmd] = b"".join(
+                    self._cmd_response_map[x] for x in cmds
+                )
 
     def read(self, wait_sleep=0.3):
         return self._cmd_response_map[self._cmd]
 
-    def read_until(self, expected=b"", size=None):
+    def read_until(self, expected=b"", size=None, timeout=None):
         response = self._cmd_response_map[self._cmd]
         cut_off_index = -1
         if expected and size:
@@ -46,6 +69,10 @@ class MockConnection(connection.Connection):
 
         return response[0:cut_off_index]
 
+    def read_samples(self, size):
+        # stream of the same response e.g. heartbeat
+        return self._cmd_response_map[self._cmd]
+
     def read_at_least(self, size, wait_sleep=0.05) -> bytes:
         response = self.read()
         if size > len(response):
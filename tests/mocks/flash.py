@@ -0,0 +1,43 @@
+import struct
+
+from .connection import MockConnection
+
+
+class MockFlashConnection(MockConnection):
+    """Device answering <SPIR from a flash that wraps around at its size."""
+
+    def __init__(self, flash, extra_byte=False, max_size=None):
+        super().__init__({})
+        self.flash = flash
+        # firmware bug, sends one byte more than asked for
+        self._extra_byte = extra_byte
+        # largest read the firmware sends in full
+        self._max_size = max_size
+        self.buffer = bytearray()
+        self.resets = 0
+
+    def reset_buffers(self):
+        self.resets += 1
+        self.buffer.clear()
+
+    def get_connection_details(self):
+        deets = super().get_connection_details()
+        deets["in_waiting"] = len(self.buffer)
+        return deets
+
+    def write(self, cmd, log=True):
+        self._cmd_calls_dict[cmd] += 1
+        if not cmd.startswith(b"<SPIR"):
+            return
+        position = struct.unpack(">I", b"\x00" + cmd[5:8])[0] % len(self.flash)
+        size = struct.unpack(">H", cmd[8:10])[0]
+        if self._max_size:
+            size = min(size, self._max_size)
+        self.buffer += self.flash[position : position + size]
+        if self._extra_byte:
+            self.buffer += b"\x00"
+
+    def read_until(self, expected=b"", size=None, timeout=None):
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
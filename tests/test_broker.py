@@ -0,0 +1,145 @@
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+import pygmc
+from pygmc import broker
+
+from .data import data_gmc500_plus
+from .mocks import MockConnection
+
+if not sys.platform.startswith("linux"):
+    pytest.skip("skipping tests - not running linux", allow_module_level=True)
+
+
+@pytest.fixture()
+def served():
+    """A broker serving a mock GMC-500+ in a background thread."""
+    connection = MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    connection.close_connection = lambda: None  # nothing to close
+    gc = pygmc.GMC500Plus(None, connection=connection)
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+    b = broker.Broker({"303021572157f6": gc}, socket_path=socket_path)
+    thread = threading.Thread(target=b.serve_forever, daemon=True)
+    thread.start()
+
+    client = broker.BrokerDevice(socket_path=socket_path, timeout=5)
+    yield client, connection
+
+    client.close()
+    b.shutdown()
+    b.close()
+    assert not os.path.exists(socket_path)
+
+
+encode_test_cases = [
+    None,
+    True,
+    False,
+    0,
+    -(2**40),
+    1.5,
+    "GMC-500+Re 2.22",
+    b"\x00\xff",
+    datetime.datetime(2023, 11, 10, 18, 33, 4),
+    (1, "a", None),
+    [1, [2, (3,)]],
+    {"Power": 0, "Calibration_uSv_0": 0.65},
+]
+
+
+@pytest.mark.parametrize("value", encode_test_cases)
+def test_encode_round_trip(value):
+    assert broker._loads(broker._dumps(value)) == value
+
+
+def test_encode_unknown_type():
+    with pytest.raises(TypeError):
+        broker._dumps(object())
+
+
+def test_remote_methods(served):
+    client, connection = served
+    for method, expected in data_gmc500_plus.gets_device_result_map.items():
+        if isinstance(expected, float):
+            expected = pytest.approx(expected)
+        assert getattr(client, method)() == expected, method
+
+
+def test_list_devices(served):
+    client, connection = served
+    assert client.list_devices() == ["303021572157f6"]
+
+
+def test_unknown_device(served):
+    client, connection = served
+    client._serial_number = "nope"
+    with pytest.raises(KeyError):
+        client.get_cpm()
+
+
+@pytest.mark.parametrize("method", ["get_nothing", "_heartbeat_on", "heartbeat_live"])
+def test_methods_not_served(served, method):
+    client, connection = served
+    with pytest.raises(AttributeError):
+        getattr(client, method)()
+
+
+@pytest.mark.parametrize("method", ["iter_raw_history", "iter_history_data"])
+def test_history_generators_not_served(served, method):
+    client, connection = served
+    with pytest.raises(AttributeError, match="not served"):
+        getattr(client, method)()
+    # refused before touching the device, no history download started
+    assert not any(x.startswith(b"<SPIR") for x in connection._cmd_calls_dict)
+
+
+def test_remote_error_is_raised(served):
+    client, connection = served
+    with pytest.raises(ValueError):
+        client.send_key(9)
+
+
+def test_second_broker_on_same_socket(served):
+    client, connection = served
+    with pytest.raises(OSError):
+        broker.Broker({"x": None}, socket_path=client._socket_path)
+
+
+class _SlowDevice:
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+
+    def get_cpm(self):
+        self.calls += 1
+        self.started.set()
+        time.sleep(0.2)
+        return 42
+
+
+def test_identical_reads_are_coalesced():
+    device = _SlowDevice()
+    coalescing = broker._CoalescingDevice(device)
+    results = []
+
+    def call():
+        results.append(coalescing.call("get_cpm", (), {}))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    device.started.wait()
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert results == [42] * 5
+    assert device.calls == 1
@@ -0,0 +1,43 @@
+import os
+
+from pygmc.cache import JsonCache, get_cache_dir
+
+
+def test_cache_dir_follows_xdg(tmp_path):
+    assert get_cache_dir() == tmp_path / "cache" / "pygmc"
+
+
+def test_missing_cache_is_empty():
+    cache = JsonCache("nothing")
+    assert cache.load() == {}
+    assert cache.get("key", "default") == "default"
+
+
+def test_set_get_delete(tmp_path):
+    cache = JsonCache("test", cache_dir=tmp_path)
+    cache.set("a", {"baudrate": 115200})
+    cache.set("b", 1)
+    # a new instance reads what the other one wrote
+    assert JsonCache("test", cache_dir=tmp_path).get("a") == {"baudrate": 115200}
+
+    cache.delete("a")
+    cache.delete("not-there")
+    assert cache.load() == {"b": 1}
+    # no temp files left behind
+    assert os.listdir(tmp_path) == ["test.json"]
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    cache = JsonCache("test", cache_dir=tmp_path)
+    cache.path.write_text("{not json")
+    assert cache.load() == {}
+    cache.set("a", 1)
+    assert cache.load() == {"a": 1}
+
+
+def test_unwritable_cache_is_ignored(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = JsonCache("test", cache_dir=blocker / "sub")  # parent is a file
+    cache.set("a", 1)  # logs a warning, doesn't raise
+    assert cache.load() == {}
@@ -0,0 +1,121 @@
+import pytest
+
+import pygmc
+from pygmc.connection import Connection
+
+
+class FakeSerial:
+    """Serial that replies instantly & records the timeout of each read."""
+
+    def __init__(self, responses, baudrate=115200, timeout=5):
+        self.baudrate = baudrate
+        self.timeout = timeout
+        # each read_until returns the next response
+        self._responses = list(responses)
+        self.read_timeouts = []
+
+    def write(self, cmd):
+        pass
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def read_until(self, expected=b"\n", size=None):
+        self.read_timeouts.append(self.timeout)
+        return self._responses.pop(0)
+
+
+def get_connection(responses, **kwargs):
+    serial_connection = FakeSerial(responses)
+    connection = Connection(
+        port="dummy", baudrate=115200, serial_connection=serial_connection, **kwargs
+    )
+    return connection, serial_connection
+
+
+def test_adaptive_timeout_off_by_default():
+    connection, serial_connection = get_connection([b"\xaa"])
+    assert connection.get_exact(b"<WiFiON>>", size=1) == b"\xaa"
+    assert serial_connection.read_timeouts == [5]
+
+
+def test_adaptive_timeout_scales_with_size():
+    connection = Connection(
+        port="dummy", baudrate=115200, serial_connection=FakeSerial([])
+    )
+    small = connection.get_adaptive_timeout(1)
+    large = connection.get_adaptive_timeout(2048)
+    assert small == pytest.approx(3 * (10 / 115200 + 0.03))
+    assert small < 0.1
+    assert large > small
+    # never more than the connection timeout
+    connection.timeout = 0.2
+    assert connection.get_adaptive_timeout(2048) == 0.2
+
+
+def test_adaptive_timeout_per_call():
+    connection, serial_connection = get_connection([b"\xaa"], adaptive_timeout=True)
+    assert connection.get_exact(b"<WiFiON>>", size=1) == b"\xaa"
+    assert serial_connection.read_timeouts[0] < 0.1
+    # connection timeout restored
+    assert connection.timeout == 5
+
+
+def test_adaptive_timeout_late_reply_waited_for():
+    connection, serial_connection = get_connection([b"", b"\xaa"], adaptive_timeout=True)
+    # not left in the buffer for the next command
+    assert connection.get_exact(b"<GETCPM>>", size=1) == b"\xaa"
+    assert serial_connection.read_timeouts[0] < 0.1
+    assert serial_connection.read_timeouts[1] == 5
+    assert connection.turnaround > 0.03
+
+
+def test_adaptive_timeout_lost_reply_raises_estimate():
+    connection, _ = get_connection([b"", b""] * 3, adaptive_timeout=True)
+    limit = connection.get_adaptive_timeout(1)
+    for _ in range(3):
+        assert connection.get_exact(b"<GETCPM>>", size=1) == b""
+    # a slow device doesn't fail every small command for good
+    assert connection.turnaround == pytest.approx(0.03 * 2**3)
+    assert connection.get_adaptive_timeout(1) > 4 * limit
+
+
+def test_adaptive_timeout_partial_reply_reads_rest():
+    connection, serial_connection = get_connection(
+        [b"\x00" * 1000, b"\x00" * 1048], adaptive_timeout=True
+    )
+    result = connection.get_exact(b"<SPIR\x00\x00\x00\x08\x00>>", size=2048)
+    assert result == b"\x00" * 2048
+    # rest is read with the connection timeout
+    assert serial_connection.read_timeouts[1] == 5
+
+
+def test_adaptive_timeout_measures_turnaround(monkeypatch):
+    connection, _ = get_connection([b"\xaa"] * 20, adaptive_timeout=True)
+    clock = iter(range(0, 40))
+    # every get_exact takes 1 "second"
+    monkeypatch.setattr("pygmc.connection.connection.time.monotonic", lambda: next(clock))
+    for _ in range(20):
+        connection.get_exact(b"<WiFiON>>", size=1)
+    assert connection.turnaround == pytest.approx(1, abs=0.02)
+
+
+def test_explicit_timeout_not_adaptive():
+    connection, serial_connection = get_connection([b"\xaa"], adaptive_timeout=True)
+    connection.get_exact(b"<WiFiON>>", size=1, timeout=2)
+    assert serial_connection.read_timeouts == [2]
+    assert connection.turnaround == 0.03
+
+
+def test_write_ack_uses_connection_timeout():
+    connection, serial_connection = get_connection([b"\xaa"], adaptive_timeout=True)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_wifi_on()
+    # a write may take longer than a 1 byte reply's adaptive limit
+    assert serial_connection.read_timeouts == [5]
@@ -1,6 +1,11 @@
+import time
+from unittest import mock
+
 import pytest
 
 from pygmc import Discovery
+from pygmc.connection.const import BAUDRATES
+from pygmc.connection.discovery import DeviceDetails
 
 # position: 0=<GETVER>, 1=model, 2=revision
 version_to_model_rev_test_cases = [
@@ -24,3 +29,241 @@ def test_model_revision_parser(ver, model, rev):
     result_model, result_rev = Discovery._get_model_rev_from_version(ver)
     assert result_model == model, f"Input {ver=} - {result_model=}|{model=}"
     assert result_rev == rev, f"Input {ver=} - {result_rev=}|{rev=}"
+
+
+def test_ports_are_probed_concurrently():
+    ports = ["/dev/ttyUSB3", "/dev/ttyUSB0", "/dev/ttyUSB2", "/dev/ttyUSB1"]
+    delays = {"/dev/ttyUSB0": 0.3, "/dev/ttyUSB1": 0.1, "/dev/ttyUSB2": 0.2}
+
+    def fake_validate_device(self, port, baudrate, fast=True):
+        time.sleep(delays.get(port, 0))
+        if port not in delays:
+            return False  # not a GMC
+        with self._lock:
+            self._discovered_devices.append(
+                DeviceDetails(port, baudrate, "GMC-500+Re 2.22", "00", "GMC-500+", "2.22")
+            )
+        return True
+
+    with mock.patch.object(Discovery, "_get_gmc_usb_ports", return_value=sorted(ports)):
+        with mock.patch.object(Discovery, "_validate_device", fake_validate_device):
+            start = time.monotonic()
+            discovery = Discovery()
+            elapsed = time.monotonic() - start
+
+    # bounded by the slowest port (0.3s) not the sum (0.6s)
+    assert elapsed < 0.5
+    found_ports = [x.port for x in discovery.get_all_devices()]
+    assert found_ports == ["/dev/ttyUSB0", "/dev/ttyUSB1", "/dev/ttyUSB2"]
+
+
+def test_sym_links_not_probed_concurrently():
+    # /dev/gmc is a sym-link to /dev/ttyUSB0, one device
+    ports = ["/dev/gmc", "/dev/ttyUSB0", "/dev/ttyUSB1"]
+    real = {"/dev/gmc": "/dev/ttyUSB0"}
+    active = []
+    overlap = []
+
+    def fake_validate_device(self, port, baudrate, fast=True):
+        device = real.get(port, port)
+        with self._lock:
+            if device in active:
+                overlap.append(port)
+            active.append(device)
+        time.sleep(0.01)
+        with self._lock:
+            active.remove(device)
+        return False
+
+    with mock.patch.object(Discovery, "_get_gmc_usb_ports", return_value=ports):
+        with mock.patch.object(Discovery, "_validate_device", fake_validate_device):
+            with mock.patch("os.path.realpath", lambda x: real.get(x, x)):
+                Discovery()
+    assert overlap == []
+
+
+def test_cached_baudrate_is_probed_first():
+    probes = []
+
+    def fake_validate_device(self, port, baudrate, fast=True):
+        probes.append(baudrate)
+        if baudrate != 9600:
+            return False
+        details = DeviceDetails(
+            port, baudrate, "GMC-500+Re 2.22", "00", "GMC-500+", "2.22"
+        )
+        self._discovered_devices.append(details)
+        self._cache_device(details)
+        return True
+
+    with mock.patch.object(Discovery, "_validate_device", fake_validate_device):
+        with mock.patch.object(Discovery, "_get_hwid", return_value="USB VID:PID=1A86"):
+            # cold start sweeps baudrates until 9600
+            Discovery(port="/dev/ttyUSB0")
+            assert probes[-1] == 9600 and len(probes) > 1
+
+            # warm start is a single probe
+            probes.clear()
+            discovery = Discovery(port="/dev/ttyUSB0")
+            assert probes == [9600]
+            assert discovery.get_all_devices()[0].baudrate == 9600
+
+            # disabled cache does the full sweep
+            probes.clear()
+            Discovery(port="/dev/ttyUSB0", use_cache=False)
+            assert len(probes) > 1
+
+        # another USB device on the same port ignores the cache
+        with mock.patch.object(Discovery, "_get_hwid", return_value="USB VID:PID=0403"):
+            probes.clear()
+            Discovery(port="/dev/ttyUSB0")
+            assert probes[0] == 115200
+
+
+def test_probe_timeout_is_short_and_scales_with_baudrate():
+    timeouts = [Discovery._get_probe_timeout(x) for x in BAUDRATES]
+    assert timeouts == sorted(timeouts)  # BAUDRATES are fastest first
+    assert timeouts[0] < 0.1
+    # a full sweep over every baudrate is a small fraction of one user timeout
+    assert sum(timeouts) < 3
+
+
+class _FakeSerial:
+    in_waiting = 0
+    out_waiting = 0
+    timeout = None
+
+
+class _FakeConnection:
+    """Connection with a GMC answering only at 57600 & recording timeouts."""
+
+    opened = []
+    commands = []
+    # seconds the device takes to reply
+    reply_time = 0
+
+    def __init__(self, port, baudrate, timeout):
+        self.closed = False
+        self._con = _FakeSerial()
+        self._con.timeout = timeout
+        self.baudrate = baudrate
+        self.opened.append((baudrate, timeout))
+
+    @property
+    def timeout(self):
+        return self._con.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._con.timeout = value
+        self.opened.append((self.baudrate, value))
+
+    def reset_buffers(self):
+        pass
+
+    def get_exact(self, cmd, size=None):
+        self.commands.append((cmd, self.timeout))
+        if self.baudrate != 57600 or self.timeout < self.reply_time:
+            return b""
+        return b"00!W!W\xf6"
+
+    def get_at_least(self, cmd, size, wait_sleep=0.05):
+        self.commands.append((cmd, self.timeout))
+        if self.baudrate != 57600 or self.timeout < self.reply_time:
+            return b""
+        return b"GMC-500+Re 2.22"
+
+    def close_connection(self):
+        self.closed = True
+
+
+def test_two_phase_probe():
+    _FakeConnection.opened = []
+    _FakeConnection.commands = []
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        discovery = Discovery(port="/dev/ttyUSB0", timeout=5, use_cache=False)
+
+    device = discovery.get_all_devices()[0]
+    assert device.baudrate == 57600
+    # phase one - short timeouts for every candidate up to the responding one
+    assert _FakeConnection.opened[0] == (115200, Discovery._get_probe_timeout(115200))
+    assert _FakeConnection.opened[1] == (57600, Discovery._get_probe_timeout(57600))
+    # phase two - confirmation at the user timeout only for the winner
+    assert _FakeConnection.opened[2:] == [(57600, 5)]
+    # <GETVER>> only at the user timeout
+    assert [x for x in _FakeConnection.commands if x[0] == b"<GETVER>>"] == [
+        (b"<GETVER>>", 5)
+    ]
+
+
+def test_slow_device_found_at_user_timeout():
+    _FakeConnection.reply_time = 0.5
+    try:
+        with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+            # nothing cached, only found with the full slow sweep
+            assert not Discovery(port="/dev/ttyUSB0", timeout=5).get_all_devices()
+            assert Discovery(
+                port="/dev/ttyUSB0", timeout=5, slow_sweep=True
+            ).get_all_devices()
+            # cached baudrate, the fast probe misses the slow reply too
+            _FakeConnection.opened = []
+            discovery = Discovery(port="/dev/ttyUSB0", timeout=5)
+    finally:
+        _FakeConnection.reply_time = 0
+
+    assert discovery.get_all_devices()[0].baudrate == 57600
+    # fast sweep of every baudrate, then the cached baudrate first at the user timeout
+    assert _FakeConnection.opened[0] == (57600, Discovery._get_probe_timeout(57600))
+    assert len(_FakeConnection.opened) == len(BAUDRATES) + 1
+    assert _FakeConnection.opened[-1] == (57600, 5)
+
+
+def test_port_without_gmc_only_fast_probes():
+    _FakeConnection.opened = []
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        with mock.patch.object(_FakeConnection, "get_exact", return_value=b""):
+            discovery = Discovery(port="/dev/ttyUSB0", timeout=5)
+
+    assert discovery.get_all_devices() == []
+    # no retry at the user timeout
+    assert [x[0] for x in _FakeConnection.opened] == list(BAUDRATES)
+    assert all(x[1] < 1 for x in _FakeConnection.opened)
+
+
+def test_known_port_and_baudrate_uses_user_timeout():
+    _FakeConnection.opened = []
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        discovery = Discovery(port="/dev/ttyUSB0", baudrate=57600, timeout=5)
+
+    assert len(discovery.get_all_devices()) == 1
+    assert _FakeConnection.opened == [(57600, 5)]
+
+
+def test_keep_connection_for_device():
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        discovery = Discovery(port="/dev/ttyUSB0", keep_connections=True, timeout=5)
+        device = discovery.get_all_devices()[0]
+
+        conn = discovery.pop_connection(device)
+        assert not conn.closed
+        assert conn.timeout == 5  # ready for the device with the user timeout
+        assert discovery.pop_connection(device) is None  # handed over only once
+
+        discovery.close_connections()
+        assert not conn.closed  # owned by the caller now
+
+
+def test_kept_connections_are_closed():
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        discovery = Discovery(port="/dev/ttyUSB0", keep_connections=True)
+        conn = discovery._connections["/dev/ttyUSB0"]
+        discovery.close_connections()
+        assert conn.closed
+        assert discovery.pop_connection(discovery.get_all_devices()[0]) is None
+
+
+def test_connections_are_closed_by_default():
+    with mock.patch("pygmc.connection.discovery.Connection", _FakeConnection):
+        discovery = Discovery(port="/dev/ttyUSB0")
+        assert discovery._connections == {}
+        assert discovery.pop_connection(discovery.get_all_devices()[0]) is None
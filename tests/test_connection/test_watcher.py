@@ -0,0 +1,169 @@
+import threading
+from collections import namedtuple
+from unittest import mock
+
+from pygmc.connection import HotplugEvent, HotplugWatcher
+from pygmc.connection.discovery import DeviceDetails
+
+Port = namedtuple("Port", ["device", "hwid"])
+
+GMC_A = DeviceDetails("/dev/ttyUSB0", 115200, "GMC-500+Re 2.22", "aa", "GMC-500+", "2.22")
+GMC_B = DeviceDetails("/dev/ttyUSB1", 57600, "GMC-320Re 4.26", "bb", "GMC-320", "4.26")
+
+
+class _FakeUsb:
+    """Plug & unplug fake USB ports; count discovery probes per port."""
+
+    def __init__(self):
+        self.ports = []
+        self.gmcs = {GMC_A.port: GMC_A, GMC_B.port: GMC_B}
+        self.probed = []
+
+    def get_gmc_usb_devices(self, **kwargs):
+        return list(self.ports)
+
+    def discovery(self, port, timeout):
+        self.probed.append(port)
+        discovery = mock.Mock()
+        found = [self.gmcs[port]] if port in self.gmcs else []
+        discovery.get_all_devices.return_value = found
+        return discovery
+
+
+def _patched(usb):
+    return (
+        mock.patch(
+            "pygmc.connection.watcher.get_gmc_usb_devices", usb.get_gmc_usb_devices
+        ),
+        mock.patch("pygmc.connection.watcher.Discovery", usb.discovery),
+    )
+
+
+def test_attach_detach_incremental():
+    usb = _FakeUsb()
+    patch_usb, patch_discovery = _patched(usb)
+    with patch_usb, patch_discovery:
+        watcher = HotplugWatcher(use_netlink=False)
+
+        usb.ports = [Port("/dev/ttyUSB0", "1A86:7523 LOCATION=1-1")]
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB0", GMC_A)]
+
+        # nothing changed - nothing probed
+        assert watcher.poll() == []
+        assert usb.probed == ["/dev/ttyUSB0"]
+
+        # second device plugged in - only the new port is probed
+        usb.ports.append(Port("/dev/ttyUSB1", "1A86:7523 LOCATION=1-2"))
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB1", GMC_B)]
+        assert usb.probed == ["/dev/ttyUSB0", "/dev/ttyUSB1"]
+        assert watcher.get_devices() == [GMC_A, GMC_B]
+
+        # unplug
+        usb.ports.pop(0)
+        assert watcher.poll() == [HotplugEvent("detach", "/dev/ttyUSB0", GMC_A)]
+        assert watcher.get_devices() == [GMC_B]
+
+        # replug
+        usb.ports.append(Port("/dev/ttyUSB0", "1A86:7523 LOCATION=1-1"))
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB0", GMC_A)]
+
+
+def test_port_without_gmc_is_re_probed_with_backoff():
+    usb = _FakeUsb()
+    clock = [100.0]
+    patch_usb, patch_discovery = _patched(usb)
+    patch_clock = mock.patch("pygmc.connection.watcher.time.monotonic", lambda: clock[0])
+    with patch_usb, patch_discovery, patch_clock:
+        watcher = HotplugWatcher(
+            use_netlink=False, retry_interval=2, max_retry_interval=4
+        )
+        # counter plugged in while off
+        usb.gmcs = {}
+        usb.ports = [Port("/dev/ttyUSB0", "1A86:7523 LOCATION=1-1")]
+        assert watcher.poll() == []
+        assert watcher.poll() == []
+        assert usb.probed == ["/dev/ttyUSB0"]
+
+        clock[0] += 2
+        assert watcher.poll() == []
+        assert len(usb.probed) == 2
+        # backoff doubled
+        clock[0] += 2
+        assert watcher.poll() == []
+        assert len(usb.probed) == 2
+
+        # switched on
+        usb.gmcs = {GMC_A.port: GMC_A}
+        clock[0] += 2
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB0", GMC_A)]
+        assert len(usb.probed) == 3
+        clock[0] += 10
+        assert watcher.poll() == []
+        assert len(usb.probed) == 3
+
+
+def test_non_gmc_port_detach():
+    usb = _FakeUsb()
+    patch_usb, patch_discovery = _patched(usb)
+    with patch_usb, patch_discovery:
+        watcher = HotplugWatcher(use_netlink=False)
+        usb.ports = [Port("/dev/ttyUSB9", "1A86:7523 LOCATION=1-9")]
+        assert watcher.poll() == []
+        assert watcher.poll() == []
+        assert usb.probed == ["/dev/ttyUSB9"]
+
+        usb.ports = []
+        assert watcher.poll() == [HotplugEvent("detach", "/dev/ttyUSB9", None)]
+        assert watcher._retries == {}
+
+
+def test_slow_port_does_not_block_others():
+    usb = _FakeUsb()
+    release = threading.Event()
+    discovery = usb.discovery
+
+    def slow_discovery(port, timeout):
+        if port == GMC_A.port:
+            # e.g. a dead port waiting out the timeout
+            release.wait(timeout=5)
+        return discovery(port, timeout)
+
+    patch_usb, _ = _patched(usb)
+    patch_discovery = mock.patch("pygmc.connection.watcher.Discovery", slow_discovery)
+    with patch_usb, patch_discovery:
+        watcher = HotplugWatcher(poll_interval=0.05, use_netlink=False)
+        usb.ports = [
+            Port("/dev/ttyUSB0", "1A86:7523 LOCATION=1-1"),
+            Port("/dev/ttyUSB1", "1A86:7523 LOCATION=1-2"),
+        ]
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB1", GMC_B)]
+
+        # detach is seen while the other port's probe is still running
+        usb.ports.pop(1)
+        assert watcher.poll() == [HotplugEvent("detach", "/dev/ttyUSB1", GMC_B)]
+
+        release.set()
+        assert watcher.poll() == [HotplugEvent("attach", "/dev/ttyUSB0", GMC_A)]
+        # probed once
+        assert usb.probed == ["/dev/ttyUSB1", "/dev/ttyUSB0"]
+        watcher.stop()
+
+
+def test_background_thread_callback():
+    usb = _FakeUsb()
+    usb.ports = [Port("/dev/ttyUSB0", "1A86:7523 LOCATION=1-1")]
+    received = []
+    attached = threading.Event()
+
+    def callback(event):
+        received.append(event)
+        attached.set()
+
+    patch_usb, patch_discovery = _patched(usb)
+    with patch_usb, patch_discovery:
+        watcher = HotplugWatcher(poll_interval=0.01, use_netlink=False)
+        watcher.start(callback)
+        assert attached.wait(timeout=5)
+        watcher.stop()
+
+    assert received == [HotplugEvent("attach", "/dev/ttyUSB0", GMC_A)]
@@ -5,6 +5,7 @@ mock_serial only works on Linux, so skip test if not on Linux.
 """
 
 import sys  # noqa: I001
+import time
 import pytest
 from serial import Serial
 
@@ -188,3 +189,23 @@ def test_long_response_logger():
 
     response = connection.get_at_least(cmd=b"<CONY>>", size=51, wait_sleep=0.0005)
     assert len(response) == 51
+
+
+def test_read_samples_drains_whole_samples():
+    mock_dev = get_mock_dev()
+    # 2.5 heartbeat samples waiting
+    mock_dev.stub(
+        receive_bytes=b"<HEARTBEAT1>>", send_bytes=b"\x00\x00\x00\x01" * 2 + b"\x00\x00"
+    )
+    connection = pygmc.connection.Connection(
+        port="dummy", baudrate=123, serial_connection=Serial(mock_dev.port, timeout=1)
+    )
+    connection.write(b"<HEARTBEAT1>>")
+    for _ in range(100):
+        if connection._con.in_waiting == 10:
+            break
+        time.sleep(0.01)
+    result = connection.read_samples(size=4)
+    assert result == b"\x00\x00\x00\x01" * 2
+    assert connection.read_until(size=2) == b"\x00\x00"
+    connection.close_connection()
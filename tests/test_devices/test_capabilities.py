@@ -0,0 +1,161 @@
+import pytest
+
+import pygmc
+
+from ..data import data_gmc320, data_gmc500_plus
+from ..mocks import MockConnection
+
+# a GMC-500 (not plus) has one tube i.e. no <GETCPMH>> reply
+cmd_response_map = {**data_gmc500_plus.gets_cmd_response_map, b"<GETCPMH>>": b""}
+
+
+def get_gc(version="GMC-500Re 1.00", response_map=None):
+    connection = MockConnection(response_map or cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_identity("0123", version)
+    return gc, connection
+
+
+def get_unsupported(gc, name="cpmh"):
+    # marked unsupported after a few misses in a row
+    for _ in range(gc._capability_max_failures - 1):
+        with pytest.raises(RuntimeError, match=f"No {name} response"):
+            getattr(gc, f"get_{name}")()
+    with pytest.raises(RuntimeError, match=f"does not support {name}"):
+        getattr(gc, f"get_{name}")()
+
+
+def test_unsupported_reading_fails_fast():
+    gc, connection = get_gc()
+    get_unsupported(gc)
+    assert connection.get_cmd_calls(b"<GETCPMH>>") == 3
+
+    with pytest.raises(RuntimeError, match="does not support cpmh"):
+        gc.get_cpmh()
+    assert connection.get_cmd_calls(b"<GETCPMH>>") == 3
+
+    # & in a snapshot
+    with pytest.raises(RuntimeError, match="does not support cpmh"):
+        gc.get_snapshot(fields=["cpm", "cpmh"])
+    assert connection.get_cmd_calls(b"<GETCPM>><GETCPMH>>") == 0
+
+
+def test_default_snapshot_without_unsupported_reading():
+    response_map = {**data_gmc500_plus.gets_cmd_response_map, b"<GETMAXCPS>>": b""}
+    gc, connection = get_gc(response_map=response_map)
+    get_unsupported(gc, name="max_cps")
+
+    snapshot = gc.get_snapshot()
+    assert "max_cps" not in snapshot
+    assert "cpm" in snapshot
+    assert "usv_h" in snapshot
+    # asked for explicitly it still fails fast
+    with pytest.raises(RuntimeError, match="does not support max_cps"):
+        gc.get_snapshot(fields=["cpm", "max_cps"])
+
+
+def test_one_failure_is_not_cached():
+    gc, connection = get_gc()
+    with pytest.raises(RuntimeError, match="No cpmh response"):
+        gc.get_cpmh()
+    assert gc.get_capabilities()["cpmh"] is None
+
+    # a good reply resets the count
+    connection._cmd_response_map = dict(data_gmc500_plus.gets_cmd_response_map)
+    assert gc.get_cpmh() == 5
+    assert gc._capability_failures == {}
+
+    gc, _ = get_gc()
+    assert gc.get_capabilities()["cpmh"] is True
+
+
+def test_capabilities_cached_per_model_revision():
+    gc, _ = get_gc()
+    gc.get_cpml()
+    get_unsupported(gc)
+    assert gc.get_capabilities() == {
+        "max_cps": None,
+        "cpmh": False,
+        "cpml": True,
+        "gyro": None,
+    }
+
+    # another GMC-500 of the same revision, e.g. a new process
+    gc, connection = get_gc()
+    assert gc.get_capabilities()["cpmh"] is False
+    with pytest.raises(RuntimeError):
+        gc.get_cpmh()
+    assert connection.get_cmd_calls(b"<GETCPMH>>") == 0
+
+    # firmware update may add it
+    gc, connection = get_gc(version="GMC-500Re 1.01")
+    assert gc.get_capabilities()["cpmh"] is None
+
+
+def test_cached_capabilities_expire():
+    gc, _ = get_gc()
+    get_unsupported(gc)
+
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    gc.set_identity("0123", "GMC-500Re 1.00", capabilities_max_age=0)
+    assert gc.get_capabilities()["cpmh"] is None
+
+
+def test_reset_capabilities():
+    gc, _ = get_gc()
+    get_unsupported(gc)
+    gc.reset_capabilities()
+    assert gc.get_capabilities()["cpmh"] is None
+
+    gc, connection = get_gc()
+    assert gc.get_capabilities()["cpmh"] is None
+    with pytest.raises(RuntimeError, match="No cpmh response"):
+        gc.get_cpmh()
+    assert connection.get_cmd_calls(b"<GETCPMH>>") == 1
+
+
+def test_supported_reading():
+    gc, connection = get_gc(response_map=data_gmc500_plus.gets_cmd_response_map)
+    assert gc.get_cpmh() == 5
+    assert gc.get_cpmh() == 5
+    assert connection.get_cmd_calls(b"<GETCPMH>>") == 2
+    assert gc.get_capabilities()["cpmh"] is True
+
+
+def test_probe_capabilities():
+    gc, _ = get_gc()
+    # a miss isn't proof
+    assert gc.probe_capabilities(timeout=0.1) == {
+        "max_cps": True,
+        "cpmh": None,
+        "cpml": True,
+        "gyro": True,
+    }
+    # same failure count as get_cpmh()
+    with pytest.raises(RuntimeError, match="No cpmh response"):
+        gc.get_cpmh()
+    assert gc.probe_capabilities(timeout=0.1)["cpmh"] is False
+
+
+def test_probe_capabilities_late_reply():
+    gc, connection = get_gc(response_map=data_gmc500_plus.gets_cmd_response_map)
+    get_exact = connection.get_exact
+
+    def slow_get_exact(cmd, *args, **kwargs):
+        # reply comes after the probe time limit
+        result = get_exact(cmd, *args, **kwargs)
+        return result[:1] if cmd == b"<GETCPMH>>" else result
+
+    connection.get_exact = slow_get_exact
+    assert gc.probe_capabilities(timeout=0.1)["cpmh"] is True
+
+
+def test_probe_capabilities_rfc1201():
+    # <GETTEMP>> isn't answered
+    response_map = {**data_gmc320.cmd_response_map, b"<GETTEMP>>": b""}
+    gc = pygmc.GMC320Plus(None, connection=MockConnection(response_map))
+    for _ in range(gc._capability_max_failures):
+        gc.probe_capabilities(timeout=0.1)
+    assert gc.get_capabilities() == {"temp": False, "gyro": True}
+    with pytest.raises(RuntimeError, match="does not support temp"):
+        gc.get_temp()
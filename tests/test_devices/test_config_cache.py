@@ -0,0 +1,112 @@
+import time
+from unittest import mock
+
+import pytest
+
+import pygmc
+
+from ..data import data_gmc320, data_gmc500_plus, data_gmc800
+from ..mocks import MockConnection
+
+parametrize_data = [
+    (pygmc.GMC500Plus, data_gmc500_plus.gets_cmd_response_map),
+    (pygmc.GMC320Plus, data_gmc320.cmd_response_map),
+    (pygmc.GMC800, data_gmc800.cmd_response_map),
+]
+
+
+@pytest.mark.parametrize("device_class,cmd_response_map", parametrize_data)
+def test_config_restored_from_cache(device_class, cmd_response_map):
+    gc = device_class(None, connection=MockConnection(cmd_response_map))
+    gc.set_identity("0123", "GMC-TEST Re 1.00")
+    config = gc.get_config()
+    usv_h = gc.get_usv_h(cpm=100)
+
+    # a new process... the device isn't asked for its config
+    connection = MockConnection(cmd_response_map)
+    gc = device_class(None, connection=connection)
+    gc.set_identity("0123", "GMC-TEST Re 1.00")
+    assert gc.get_usv_h(cpm=100) == usv_h
+    assert gc._config == config
+    assert connection.get_cmd_calls(b"<GETCFG>>") == 0
+
+
+def test_cache_keyed_by_serial_and_version():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    gc.get_config()
+
+    for identity in [("0123", "GMC-500+Re 2.23"), ("4567", "GMC-500+Re 2.22")]:
+        connection = MockConnection(cmd_response_map)
+        gc = pygmc.GMC500Plus(None, connection=connection)
+        gc.set_identity(*identity)
+        gc.get_usv_h(cpm=100)
+        assert connection.get_cmd_calls(b"<GETCFG>>") == 1
+
+
+def test_no_identity_no_cache():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    gc.get_config()
+    assert gc._config_cache.load() == {}
+
+
+@pytest.mark.parametrize(
+    "method,args",
+    [
+        ("power_off", ()),
+        ("power_on", ()),
+        ("send_key", (1,)),
+        ("set_wifi_on", ()),
+        ("set_gmcmap_user_id", ("001",)),
+    ],
+)
+def test_writes_invalidate_cache(method, args):
+    cmd_response_map = dict(data_gmc500_plus.gets_cmd_response_map)
+    cmd_response_map.update(data_gmc500_plus.actions_cmd_response_map)
+    connection = MockConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    gc.get_config()
+
+    getattr(gc, method)(*args)
+
+    assert gc._config_cache.load() == {}
+    gc.get_usv_h(cpm=100)
+    assert connection.get_cmd_calls(b"<GETCFG>>") == 2
+
+
+def test_bad_cache_entry_is_ignored():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    connection = MockConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    entry = {"cfg": "00ff", "time": time.time()}  # too short
+    gc._config_cache.set("0123/GMC-500+Re 2.22", entry)
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    assert gc._config == {}
+    gc.get_usv_h(cpm=100)
+    assert connection.get_cmd_calls(b"<GETCFG>>") == 1
+
+
+def test_stale_cache_entry_is_not_restored():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    gc.get_config()
+
+    # e.g. config changed from the device menu since
+    later = time.time() + 24 * 3600 + 1
+    with mock.patch("pygmc.devices.device.time.time", return_value=later):
+        connection = MockConnection(cmd_response_map)
+        gc = pygmc.GMC500Plus(None, connection=connection)
+        gc.set_identity("0123", "GMC-500+Re 2.22")
+        assert gc._config == {}
+        gc.get_usv_h(cpm=100)
+        assert connection.get_cmd_calls(b"<GETCFG>>") == 1
+
+    # max age is configurable
+    connection = MockConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_identity("0123", "GMC-500+Re 2.22", config_max_age=0)
+    assert gc._config == {}
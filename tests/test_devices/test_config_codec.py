@@ -0,0 +1,196 @@
+import struct
+
+import pytest
+
+import pygmc
+
+from ..data import data_gmc320, data_gmc500_plus, data_gmc800
+from ..mocks import MockConnection
+
+parametrize_data = [
+    (pygmc.GMC500Plus, data_gmc500_plus.gets_cmd_response_map),
+    (pygmc.GMC320Plus, data_gmc320.cmd_response_map),
+    (pygmc.GMC800, data_gmc800.cmd_response_map),
+]
+
+
+class MockConfigConnection(MockConnection):
+    """Device accepts every config write command."""
+
+    def __init__(self, cmd_response_map, response=b"\xaa", failures=None):
+        super().__init__(cmd_response_map)
+        self._response = response
+        # cmd -> number of times it fails (None, always)
+        self._failures = dict(failures or {})
+        self.cfg_writes = []
+        self.timeouts = []
+
+    def write(self, cmd, log=True):
+        if cmd.startswith((b"<WCFG", b"<ECFG", b"<CFGUPDATE")):
+            response = self._response
+            if cmd in self._failures:
+                response = b""
+                if self._failures[cmd] is not None:
+                    self._failures[cmd] -= 1
+                    if not self._failures[cmd]:
+                        del self._failures[cmd]
+            self._cmd_response_map[cmd] = response
+            self.cfg_writes.append(cmd)
+        super().write(cmd, log=log)
+
+    def get_exact(self, cmd, size=None, expected=b"", timeout=None):
+        self.timeouts.append(timeout)
+        return super().get_exact(cmd, size=size, expected=expected, timeout=timeout)
+
+
+def _parse_cfg_per_field(cfg_spec_map, cfg_bytes):
+    """The one struct.unpack per field way of parsing config."""
+    config = {}
+    for name, d in cfg_spec_map.items():
+        raw = cfg_bytes[d["index"] : d["index"] + d["size"]]
+        if d["type"] is None:
+            config[name] = raw[0]
+        elif d["type"] == "tbd":
+            config[name] = None
+        else:
+            config[name] = struct.unpack(d["type"], raw)[0]
+    return config
+
+
+@pytest.mark.parametrize("device_class,cmd_response_map", parametrize_data)
+def test_codec_matches_per_field_parse(device_class, cmd_response_map):
+    gc = device_class(None, connection=MockConnection(cmd_response_map))
+    config = gc.get_config()
+    expected = _parse_cfg_per_field(gc._cfg_spec_map, cmd_response_map[b"<GETCFG>>"])
+    assert list(config) == list(expected)
+    assert config == expected
+
+
+@pytest.mark.parametrize("device_class,cmd_response_map", parametrize_data)
+def test_codec_encode_round_trip(device_class, cmd_response_map):
+    gc = device_class(None, connection=MockConnection(cmd_response_map))
+    config = dict(gc.get_config())
+    cfg_bytes = cmd_response_map[b"<GETCFG>>"]
+    assert gc._encode_cfg(config) == cfg_bytes
+
+    # a raw byte & a struct field e.g. CalibrationCPM_0
+    name = next(k for k, v in gc._cfg_spec_map.items() if v["type"] in (">H", ">I"))
+    gc._parse_cfg(gc._encode_cfg({"Power": 1, name: 1234}))
+    assert gc._config == {**config, "Power": 1, name: 1234}
+
+
+def test_encode_invalid():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    gc.get_config()
+    with pytest.raises(ValueError, match="Unknown config"):
+        gc._encode_cfg({"NotAConfig": 1})
+    with pytest.raises(ValueError, match="Invalid value"):
+        gc._encode_cfg({"Power": 256})
+
+
+def test_set_config_clear_bits_writes_changed_bytes_only():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    connection = MockConfigConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.get_config()
+    assert gc._config["SaveDataType"] == 2
+
+    # 2 -> 0 only clears a bit
+    gc.set_config({"SaveDataType": 0})
+    assert connection.cfg_writes == [b"<WCFG\x00\x20\x00>>", b"<CFGUPDATE>>"]
+    assert gc._config["SaveDataType"] == 0
+    assert connection.get_cmd_calls(b"<GETCFG>>") == 1
+
+
+def test_set_config_set_bits_erases():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    connection = MockConfigConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+
+    gc.set_config({"Power": 1})
+    cfg_bytes = bytearray(cmd_response_map[b"<GETCFG>>"])
+    cfg_bytes[0] = 1
+    writes = _get_erase_writes(cfg_bytes)
+    assert connection.cfg_writes == [b"<ECFG>>", *writes, b"<CFGUPDATE>>"]
+    assert gc._config["Power"] == 1
+    assert gc._cfg_bytes == bytes(cfg_bytes)
+
+
+def test_set_config_unchanged():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    connection = MockConfigConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    config = gc.get_config()
+    gc.set_config({"Power": config["Power"]})
+    assert connection.cfg_writes == []
+
+
+def test_set_config_updates_cache_and_calibration():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    gc = pygmc.GMC500Plus(None, connection=MockConfigConnection(cmd_response_map))
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    usv_h = gc.get_usv_h(cpm=100)
+    cpm = gc._config["CalibrationCPM_0"]
+    gc.set_config({"CalibrationCPM_0": cpm * 2})
+    assert gc.get_usv_h(cpm=100) != usv_h
+
+    connection = MockConnection(cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    assert gc._config["CalibrationCPM_0"] == cpm * 2
+    assert connection.get_cmd_calls(b"<GETCFG>>") == 0
+
+
+def test_set_config_unexpected_response():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    connection = MockConfigConnection(cmd_response_map, response=b"\x00")
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    with pytest.raises(RuntimeError, match="Unexpected response"):
+        gc.set_config({"SaveDataType": 0})
+
+
+def _get_erase_writes(cfg_bytes):
+    return [
+        b"<WCFG" + struct.pack(">HB", i, x) + b">>"
+        for i, x in enumerate(cfg_bytes)
+        if x != 0xFF
+    ]
+
+
+def test_set_config_retries_failed_write():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    write = b"<WCFG\x00\x20\x00>>"
+    connection = MockConfigConnection(cmd_response_map, failures={write: 1})
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.get_config()
+    gc.connection.adaptive_timeout = True
+
+    gc.set_config({"SaveDataType": 0})
+    assert connection.cfg_writes == [write, write, b"<CFGUPDATE>>"]
+    assert gc._config["SaveDataType"] == 0
+    # full timeout, not the adaptive 1 byte time limit
+    assert set(connection.timeouts[1:]) == {connection.timeout}
+
+
+def test_set_config_failure_restores_old_config():
+    cmd_response_map = data_gmc500_plus.gets_cmd_response_map
+    old = cmd_response_map[b"<GETCFG>>"]
+    new = bytearray(old)
+    new[0] = 1
+    # device stops answering half way through the rewrite
+    failing = _get_erase_writes(new)[10]
+    connection = MockConfigConnection(cmd_response_map, failures={failing: 2})
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.set_identity("0123", "GMC-500+Re 2.22")
+    gc.get_config()
+
+    with pytest.raises(RuntimeError, match="Unexpected response"):
+        gc.set_config({"Power": 1})
+
+    restore = connection.cfg_writes[connection.cfg_writes.index(failing) + 2 :]
+    assert restore == [b"<ECFG>>", *_get_erase_writes(old), b"<CFGUPDATE>>"]
+    # not trusted until re-read
+    assert gc._config == {}
+    assert gc._cfg_bytes == b""
+    assert gc._config_cache.load() == {}
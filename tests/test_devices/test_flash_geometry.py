@@ -0,0 +1,70 @@
+import pytest
+
+import pygmc
+
+from ..mocks import MockFlashConnection
+
+PAGE_SIZE = 16
+
+
+def get_device(flash):
+    gc = pygmc.devices.BaseDevice(MockFlashConnection(flash))
+    gc._flash_memory_page_size_bytes = PAGE_SIZE
+    gc._spir_chunk_sizes = ()
+    return gc
+
+
+@pytest.mark.parametrize(
+    "device_class,flash_size",
+    [
+        (pygmc.GMC300, 2**16),
+        (pygmc.GMCSE, 2**21),
+        (pygmc.GMC500Plus, 2**20),
+        (pygmc.GMC800, 2**20),
+    ],
+)
+def test_flash_size_per_model(device_class, flash_size):
+    assert device_class._flash_memory_size_bytes == flash_size
+    assert device_class._flash_memory_page_size_bytes == 2**11
+
+
+def test_instance_override():
+    gc = get_device(b"\xff" * PAGE_SIZE)
+    gc._flash_memory_size_bytes = 2**17
+    assert pygmc.devices.BaseDevice._flash_memory_size_bytes == 2**20
+
+
+@pytest.mark.parametrize("flash_size", [2**16, 2**18, 2**21])
+def test_probe_flash_size(flash_size):
+    flash = bytes(x % 251 for x in range(flash_size))
+    gc = get_device(flash)
+    assert gc.probe_flash_size() == flash_size
+    assert gc._flash_memory_size_bytes == flash_size
+
+
+def test_probe_flash_size_empty_flash():
+    gc = get_device(b"\xff" * 2**16)
+    assert gc.probe_flash_size() == 2**20
+
+
+def test_probe_flash_size_short_read():
+    flash = bytes(x % 251 for x in range(2**18))
+    gc = get_device(flash)
+    write = gc.connection.write
+
+    def write_timeout_at_64k(cmd, log=True):
+        write(cmd, log=log)
+        if cmd[5:8] == b"\x01\x00\x00":
+            gc.connection.buffer.clear()
+
+    gc.connection.write = write_timeout_at_64k
+    assert gc.probe_flash_size() == 2**20
+    assert gc._flash_memory_size_bytes == 2**20
+
+
+def test_raw_history_stops_at_flash_end():
+    # full flash, no empty page
+    flash = bytes(x % 251 for x in range(2**16))
+    gc = get_device(flash)
+    gc._flash_memory_size_bytes = 2**16
+    assert gc.get_raw_history() == flash
@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+import pygmc
+
+from ..mocks import MockConnection
+
+
+class _StreamConnection(MockConnection):
+    """Returns queued heartbeat reads, then nothing (timeout)."""
+
+    def __init__(self, reads):
+        super().__init__({})
+        self.reads = list(reads)
+
+    def read_samples(self, size):
+        if self.reads:
+            return self.reads.pop(0)
+        return b""
+
+
+def test_stalled_consumer_catches_up():
+    # three samples piled up in the buffer, then one more
+    connection = _StreamConnection(
+        [b"\x00\x00\x00\x01\x00\x00\x00\x02\x00\x00\x00\x03", b"\x00\x00\x00\x04"]
+    )
+    gc = pygmc.devices.DeviceRFC1801(connection)
+
+    samples = list(gc.heartbeat_samples(count=4))
+
+    assert [x.cps for x in samples] == [1, 2, 3, 4]
+    # read together -> same receive time, one second apart
+    assert samples[0].received == samples[2].received
+    assert samples[2].timestamp - samples[0].timestamp == datetime.timedelta(seconds=2)
+    assert connection.get_cmd_calls(b"<HEARTBEAT0>>") == 2  # init & after
+
+
+def test_count_limits_batch():
+    connection = _StreamConnection([b"\x00\x00\x00\x01\x00\x00\x00\x02"])
+    gc = pygmc.devices.DeviceSpec404(connection)
+    assert list(gc.heartbeat_live(count=1)) == [1]
+
+
+def test_partial_sample_waits_for_rest():
+    connection = _StreamConnection([b"\x00\x00\x00\x01\x00\x00", b"\x00\x02"])
+    gc = pygmc.devices.DeviceRFC1801(connection)
+    assert list(gc.heartbeat_live(count=2)) == [1, 2]
+
+
+def test_rfc1201_uses_14_bits():
+    connection = _StreamConnection([b"\xc0\x17\x00\x18"])
+    gc = pygmc.devices.DeviceRFC1201(connection)
+    assert list(gc.heartbeat_live(count=2)) == [23, 24]
+
+
+def test_no_heartbeat_raises():
+    connection = _StreamConnection([])
+    gc = pygmc.devices.DeviceRFC1801(connection)
+    with pytest.raises(TimeoutError):
+        list(gc.heartbeat_samples(count=1))
+    assert connection.get_cmd_calls(b"<HEARTBEAT0>>") == 2
+
+
+def test_closing_live_turns_heartbeat_off():
+    connection = _StreamConnection([b"\x00\x00\x00\x01"] * 10)
+    gc = pygmc.devices.DeviceRFC1801(connection)
+    live = gc.heartbeat_live(count=10)
+    assert next(live) == 1
+    live.close()
+    assert connection.get_cmd_calls(b"<HEARTBEAT0>>") == 2
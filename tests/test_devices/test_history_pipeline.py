@@ -0,0 +1,49 @@
+import pytest
+
+import pygmc
+
+from ..data import data_history_parser
+from ..mocks import MockFlashConnection
+from .test_flash_geometry import PAGE_SIZE
+
+
+def get_device(flash):
+    gc = pygmc.devices.BaseDevice(MockFlashConnection(flash))
+    gc._flash_memory_page_size_bytes = PAGE_SIZE
+    gc._flash_memory_size_bytes = len(flash)
+    gc._spir_chunk_sizes = ()
+    return gc
+
+
+def get_spir_calls(gc):
+    calls = gc.connection._cmd_calls_dict
+    return sum(n for cmd, n in calls.items() if cmd.startswith(b"<SPIR"))
+
+
+def test_pipelined_same_as_download_then_parse():
+    raw = data_history_parser.raw_history_with_notes2
+    flash = raw + b"\xff" * (PAGE_SIZE * 4 - len(raw) % PAGE_SIZE)
+    gc = get_device(flash)
+
+    h = pygmc.HistoryParser(data=gc.get_raw_history())
+    expected = [h.get_columns()] + h.get_data()
+    assert gc.get_history_data() == expected
+
+
+def test_download_stops_when_parser_done():
+    gc = get_device(b"\x01" * PAGE_SIZE * 8)
+    stream = pygmc.history.HistoryStream()
+    stream.close()
+    gc._download_history(stream)
+    assert get_spir_calls(gc) == 1
+
+
+def test_download_error_raised():
+    gc = get_device(b"\x01" * PAGE_SIZE * 8)
+
+    def unplugged(*args, **kwargs):
+        raise TimeoutError("device unplugged")
+
+    gc.connection.get_exact = unplugged
+    with pytest.raises(TimeoutError, match="unplugged"):
+        gc.get_history_data()
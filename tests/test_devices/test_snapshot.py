@@ -0,0 +1,77 @@
+import datetime
+
+import pytest
+
+import pygmc
+
+from ..data import data_gmc320, data_gmc500_plus, data_gmc800
+from ..mocks import MockConnection
+
+parametrize_data = [
+    (pygmc.GMC500Plus, data_gmc500_plus.gets_cmd_response_map),
+    (pygmc.GMC320Plus, data_gmc320.cmd_response_map),
+    (pygmc.GMC800, data_gmc800.cmd_response_map),
+]
+
+
+@pytest.mark.parametrize("device_class,cmd_response_map", parametrize_data)
+def test_snapshot_matches_single_reads(device_class, cmd_response_map):
+    gc = device_class(None, connection=MockConnection(cmd_response_map))
+    fields = [
+        x
+        for x in gc.get_snapshot_fields()
+        if x == "usv_h" or gc._snapshot_spec_map[x]["cmd"] in cmd_response_map
+    ]
+
+    snapshot = gc.get_snapshot(fields=fields)
+
+    assert isinstance(snapshot.pop("timestamp"), datetime.datetime)
+    assert list(snapshot) == fields
+    for field, value in snapshot.items():
+        assert value == getattr(gc, f"get_{field}")(), field
+
+
+def test_snapshot_is_one_exchange():
+    connection = MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    gc = pygmc.GMC500Plus(None, connection=connection)
+    gc.get_config()  # for usv_h
+
+    snapshot = gc.get_snapshot(fields=["cpm", "cpmh", "cpml", "usv_h", "datetime"])
+
+    assert snapshot["cpm"] == 1210
+    assert snapshot["cpmh"] == 5
+    assert snapshot["cpml"] == 1500
+    assert snapshot["usv_h"] == pytest.approx(7.865)
+    assert snapshot["datetime"] == datetime.datetime(2023, 11, 10, 18, 33, 4)
+    cmd = b"<GETCPM>><GETCPMH>><GETCPML>><GETDATETIME>>"
+    assert connection.get_cmd_calls(cmd) == 1
+    assert connection.get_cmd_calls(b"<GETCPM>>") == 0
+
+
+def test_snapshot_default_fields():
+    gc = pygmc.GMC500Plus(
+        None, connection=MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    )
+    snapshot = gc.get_snapshot()
+    assert list(snapshot) == [
+        "timestamp",
+        "cpm",
+        "cps",
+        "max_cps",
+        "voltage",
+        "datetime",
+        "usv_h",
+    ]
+
+
+def test_snapshot_unknown_field():
+    gc = pygmc.GMC800(None, connection=MockConnection(data_gmc800.cmd_response_map))
+    with pytest.raises(ValueError):
+        gc.get_snapshot(fields=["cpm", "temp"])
+
+
+def test_snapshot_incomplete_response():
+    cmd_response_map = {b"<GETCPM>>": b"\x00\x00\x04\xba", b"<GETCPS>>": b"\x00"}
+    gc = pygmc.GMC500Plus(None, connection=MockConnection(cmd_response_map))
+    with pytest.raises(RuntimeError):
+        gc.get_snapshot(fields=["cpm", "cps"])
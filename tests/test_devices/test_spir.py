@@ -0,0 +1,157 @@
+import struct
+
+import pytest
+
+import pygmc
+
+from ..mocks import MockFlashConnection
+
+PAGE_SIZE = 10
+# two pages of history then empty flash
+FLASH = bytes(range(2 * PAGE_SIZE)) + b"\xff" * (8 * PAGE_SIZE)
+# history past the largest chunk size tried
+LONG_FLASH = bytes(range(6 * PAGE_SIZE)) + b"\xff" * (4 * PAGE_SIZE)
+
+
+def get_device(extra_byte, version=None, max_size=None, chunk_sizes=(), flash=FLASH):
+    connection = MockFlashConnection(flash, extra_byte=extra_byte, max_size=max_size)
+    gc = pygmc.devices.BaseDevice(connection)
+    gc._flash_memory_size_bytes = len(flash)
+    gc._flash_memory_page_size_bytes = PAGE_SIZE
+    gc._spir_chunk_sizes = chunk_sizes
+    if version:
+        gc.set_identity("0123", version)
+    connection.resets = 0
+    return gc, connection
+
+
+@pytest.mark.parametrize("extra_byte", [True, False])
+def test_spir_extra_byte_detected(extra_byte):
+    gc, connection = get_device(extra_byte)
+    assert gc.get_raw_history() == FLASH[: 2 * PAGE_SIZE]
+    assert gc._capabilities["spir_extra_byte"] is extra_byte
+    # only the first two pages reset the buffers, confirmed then cached
+    assert connection.resets == 2
+    assert connection.buffer == b""
+
+
+def test_spir_extra_byte_confirmed_on_two_pages():
+    gc, connection = get_device(False, version="GMC-500+Re 2.22")
+    pages = gc.iter_raw_history()
+    # e.g. the extra byte came too late on the first page
+    assert next(pages) == FLASH[:PAGE_SIZE]
+    assert gc._capabilities.get("spir_extra_byte") is None
+
+    connection._extra_byte = True
+    assert b"".join(pages) == FLASH[PAGE_SIZE : 2 * PAGE_SIZE]
+    assert gc._capabilities["spir_extra_byte"] is True
+    assert connection.buffer == b""
+
+
+def test_spir_stray_byte_detects_again():
+    gc, connection = get_device(True, version="GMC-500+Re 2.22")
+    # wrongly cached
+    gc._capabilities["spir_extra_byte"] = False
+    assert gc.get_raw_history() == FLASH[: 2 * PAGE_SIZE]
+    assert gc._capabilities["spir_extra_byte"] is True
+    assert connection.buffer == b""
+
+
+@pytest.mark.parametrize("extra_byte", [True, False])
+def test_spir_extra_byte_cached(extra_byte):
+    gc, _ = get_device(extra_byte, version="GMC-500+Re 2.22")
+    gc.get_raw_history()
+
+    gc, connection = get_device(extra_byte, version="GMC-500+Re 2.22")
+    assert gc._capabilities["spir_extra_byte"] is extra_byte
+    assert gc.get_raw_history() == FLASH[: 2 * PAGE_SIZE]
+    assert connection.resets == 0
+
+
+def test_spir_short_read_resets():
+    gc, connection = get_device(extra_byte=False)
+    gc._capabilities["spir_extra_byte"] = False
+    # device stops sending mid-page
+    connection.write = lambda cmd, log=True: connection.buffer.extend(FLASH[:5])
+    assert gc._read_history_position(0, PAGE_SIZE) == FLASH[:5]
+    assert connection.resets == 1
+
+
+def get_spir_calls(connection, size):
+    return sum(
+        n
+        for cmd, n in connection._cmd_calls_dict.items()
+        if cmd.startswith(b"<SPIR") and cmd[8:10] == struct.pack(">H", size)
+    )
+
+
+@pytest.mark.parametrize("extra_byte", [True, False])
+@pytest.mark.parametrize(
+    "max_size,expected,reads", [(None, 40, 2), (30, 20, 4), (10, 10, 7)]
+)
+def test_spir_chunk_size_tuned(extra_byte, max_size, expected, reads):
+    kwargs = dict(version="GMC-500+Re 2.22", chunk_sizes=(40, 20), flash=LONG_FLASH)
+    gc, connection = get_device(extra_byte, max_size=max_size, **kwargs)
+    assert gc.get_raw_history() == LONG_FLASH[: 6 * PAGE_SIZE]
+    assert gc._capabilities["spir_chunk_size/None"] == expected
+    # the pages read before tuning are the reference, not read again
+    assert connection._cmd_calls_dict[b"<SPIR\x00\x00\x00\x00\x0a>>"] == 1
+
+    # remembered, the download is in chunks from the start (until an empty page)
+    gc, connection = get_device(extra_byte, max_size=max_size, **kwargs)
+    assert gc.get_raw_history() == LONG_FLASH[: 6 * PAGE_SIZE]
+    assert get_spir_calls(connection, expected) == reads
+    # <HEARTBEAT0>> & the chunk reads, no reference reads
+    assert sum(connection._cmd_calls_dict.values()) == 1 + reads
+
+
+@pytest.mark.parametrize(
+    "version,flash",
+    [
+        # can't be cached, would tune every download
+        (None, LONG_FLASH),
+        # history shorter than the largest chunk size, nothing to gain
+        ("GMC-500+Re 2.22", FLASH),
+    ],
+)
+def test_spir_chunk_size_not_tuned(version, flash):
+    gc, connection = get_device(False, version=version, chunk_sizes=(40, 20), flash=flash)
+    assert gc.get_raw_history() == flash.rstrip(b"\xff")
+    assert get_spir_calls(connection, 40) == get_spir_calls(connection, 20) == 0
+    assert "spir_chunk_size/None" not in gc._capabilities
+
+
+def test_spir_chunk_size_capped_by_timeout():
+    kwargs = dict(version="GMC-500+Re 2.22", chunk_sizes=(40, 20), flash=LONG_FLASH)
+    gc, connection = get_device(False, **kwargs)
+    # 40 bytes don't fit in the timeout with room to spare
+    connection._get_transfer_time = lambda size: size * 0.1
+    assert gc.get_raw_history() == LONG_FLASH[: 6 * PAGE_SIZE]
+    assert gc._capabilities["spir_chunk_size/None"] == 20
+
+    # tuned with a longer timeout
+    gc, connection = get_device(False, **kwargs)
+    gc._capabilities["spir_chunk_size/None"] = 40
+    connection._get_transfer_time = lambda size: size * 0.1
+    assert gc._get_spir_chunk_size() == 20
+
+
+@pytest.mark.parametrize("extra_byte", [True, False])
+def test_spir_short_chunk_read_by_page(extra_byte):
+    kwargs = dict(version="GMC-500+Re 2.22", chunk_sizes=(40, 20), flash=LONG_FLASH)
+    gc, _ = get_device(extra_byte, **kwargs)
+    gc.get_raw_history()
+    assert gc._capabilities["spir_chunk_size/None"] == 40
+
+    # e.g. a shorter timeout, reads are cut short
+    gc, connection = get_device(extra_byte, max_size=PAGE_SIZE, **kwargs)
+    assert gc.get_raw_history() == LONG_FLASH[: 6 * PAGE_SIZE]
+    assert get_spir_calls(connection, 40) == 1
+    # tuned again next time
+    assert gc._capabilities["spir_chunk_size/None"] is None
+
+
+def test_spir_short_page_raises():
+    gc, _ = get_device(False, max_size=PAGE_SIZE - 1)
+    with pytest.raises(TimeoutError, match="got 9/10 bytes"):
+        gc.get_raw_history()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import pygmc
+
+from ..data import data_gmc320, data_gmc500_plus, data_gmc800
+from ..mocks import MockConnection
+
+
+def _linear_search_usv_h(calibration_tuple, cpm):
+    """The original one-value-at-a-time conversion."""
+    for max_cpm, slope, intercept in calibration_tuple:
+        if cpm <= max_cpm:
+            return cpm * slope + intercept
+    max_cpm, slope, intercept = calibration_tuple[-1]
+    return cpm * slope + intercept
+
+
+parametrize_data = [
+    (pygmc.GMC500Plus, data_gmc500_plus.gets_cmd_response_map),
+    (pygmc.GMC320Plus, data_gmc320.cmd_response_map),
+    (pygmc.GMC800, data_gmc800.cmd_response_map),
+]
+
+# edges & beyond the last calibration
+cpm_values = [0, 1, 24, 25, 26, 99, 100, 101, 1615, 29999, 30000, 30001, 10**6, 12.5]
+cpm_values.extend(random.Random(0).randint(0, 100_000) for _ in range(500))  # noqa: S311
+
+
+@pytest.mark.parametrize("device_class,cmd_response_map", parametrize_data)
+def test_matches_per_value(device_class, cmd_response_map):
+    gc = device_class(None, connection=MockConnection(cmd_response_map))
+    usv_h = gc.cpm_to_usv_h(cpm_values)
+    calibration = gc._usv_calibration_tuple
+    assert usv_h == [_linear_search_usv_h(calibration, x) for x in cpm_values]
+    assert usv_h == [gc.get_usv_h(cpm=x) for x in cpm_values]
+
+
+calibration_cases = [
+    # GMC-500+ default: 2nd calibration max cpm > 3rd
+    [(100, 0.65), (30000, 195.0), (25, 4.85)],
+    # unreachable calibration between reachable ones
+    [(100, 0.65), (50, 0.5), (80, 0.55), (200, 1.3)],
+    # last calibration is unreachable but used to extrapolate
+    [(100, 0.65), (300, 2.0), (200, 1.1)],
+    [(10, 0.1)],
+]
+
+
+@pytest.mark.parametrize("calibrations", calibration_cases)
+def test_compiled_calibration(calibrations):
+    gc = pygmc.devices.DeviceRFC1801(MockConnection({}))
+    gc._set_usv_calibration(list(calibrations))
+    gc._config = {"loaded": True}
+    expected = [_linear_search_usv_h(gc._usv_calibration_tuple, x) for x in cpm_values]
+    assert gc.cpm_to_usv_h(cpm_values) == expected
+    assert [gc.cpm_to_usv_h(x) for x in cpm_values] == expected
+
+
+def test_numpy_array():
+    numpy = pytest.importorskip("numpy")
+    gc = pygmc.GMC500Plus(
+        None, connection=MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    )
+    cpm = numpy.array(cpm_values[:-501] + cpm_values[-500:])  # ints only
+    usv_h = gc.cpm_to_usv_h(cpm)
+    assert isinstance(usv_h, numpy.ndarray)
+    assert usv_h.tolist() == [gc.get_usv_h(cpm=int(x)) for x in cpm]
+    assert gc.cpm_to_usv_h(cpm[3]) == gc.get_usv_h(cpm=int(cpm[3]))
+
+
+def test_history_to_usv_h():
+    gc = pygmc.GMC500Plus(
+        None, connection=MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    )
+    history = [
+        ("datetime", "count", "unit", "mode", "reference_datetime", "notes"),
+        (None, 10, "CPM", "every minute", None, None),
+        (None, 2, "CPS", "every second", None, None),
+    ]
+    assert gc.history_to_usv_h(history) == [gc.get_usv_h(cpm=10), gc.get_usv_h(cpm=120)]
+    assert gc.history_to_usv_h(history[1:]) == gc.history_to_usv_h(history)
@@ -0,0 +1,95 @@
+import argparse
+import datetime
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import pygmc
+from pygmc import cli
+
+from .data import data_history_parser
+from .test_cli import _get_gc_for_save_hist_tests
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_to_arrow():
+    h = pygmc.HistoryParser(data=data_history_parser.raw_history_with_save_modes)
+    table = h.to_arrow()
+    assert table.schema == pygmc.history_arrow.get_schema()
+    assert table.schema.field("datetime").type == pa.timestamp("s")
+    assert pa.types.is_dictionary(table.schema.field("unit").type)
+
+    rows = [tuple(row.values()) for row in table.to_pylist()]
+    assert rows == data_history_parser.raw_history_with_save_modes_tidy
+    # a chunk per context segment
+    contexts = {(row[4], row[2], row[3]) for row in rows}
+    assert table.column("count").num_chunks == len(contexts)
+
+
+def test_none_datetimes_are_null():
+    dt = datetime.datetime(2024, 1, 1)
+    rows = [
+        (dt, 1, "CPM", "every minute", None, None),
+        (None, 2, "CPM", "every minute", None, "note"),
+        (dt, 3, "CPS", "every second", dt, None),
+    ]
+    table = pygmc.history_arrow.to_arrow(rows)
+    assert [tuple(row.values()) for row in table.to_pylist()] == rows
+    assert table.column("datetime").null_count == 1
+    assert table.column("reference_datetime").null_count == 2
+
+
+def test_write_parquet_row_group_per_segment(tmp_path):
+    expected = pygmc.HistoryParser(
+        data=data_history_parser.raw_history_with_notes2
+    ).get_data()
+    path = tmp_path / "hist.parquet"
+    assert pygmc.history_arrow.write_parquet(path, expected) == len(expected)
+
+    table = pq.read_table(path)
+    assert [tuple(row.values()) for row in table.to_pylist()] == expected
+
+    metadata = pq.ParquetFile(path).metadata
+    starts = [
+        i for i, row in enumerate(expected) if i == 0 or row[4] != expected[i - 1][4]
+    ]
+    assert metadata.num_row_groups == len(starts)
+    # datetime statistics allow skipping row groups
+    stats = metadata.row_group(0).column(0).statistics
+    assert stats.has_min_max
+    assert stats.min == expected[0][0]
+
+
+def test_empty_history(tmp_path):
+    path = tmp_path / "hist.parquet"
+    assert pygmc.history_arrow.write_parquet(path, []) == 0
+    assert pq.read_table(path).num_rows == 0
+    assert pygmc.history_arrow.to_arrow([]).num_rows == 0
+
+
+def test_missing_pyarrow():
+    with patch.dict(sys.modules, {"pyarrow": None}):
+        with pytest.raises(ImportError, match=r"pip install pygmc\[arrow\]"):
+            pygmc.history_arrow.get_schema()
+
+
+def test_cli_save_parquet(tmp_path):
+    path = tmp_path / "hist.parquet"
+    args = argparse.Namespace(
+        port=None,
+        baudrate=None,
+        actions="save",
+        file_name=path,
+        raw=False,
+        format="parquet",
+    )
+    with patch("argparse.ArgumentParser.parse_args", return_value=args), patch(
+        "pygmc.cli._get_gc", return_value=_get_gc_for_save_hist_tests()
+    ):
+        cli.main()
+
+    rows = [tuple(row.values()) for row in pq.read_table(path).to_pylist()]
+    assert rows == data_history_parser.raw_history_with_notes1_tidy
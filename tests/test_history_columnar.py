@@ -0,0 +1,119 @@
+import argparse
+import datetime
+import os
+from unittest.mock import patch
+
+import pytest
+
+import pygmc
+from pygmc import cli
+from pygmc.history_columnar import ColumnarHistory, collect_columns, write_columnar
+
+from .data import data_history_parser
+from .test_cli import _get_gc_for_save_hist_tests
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        data_history_parser.raw_history_with_save_modes,
+        data_history_parser.raw_history_with_notes2,
+        data_history_parser.raw_history_tube_selection,
+        data_history_parser.raw_history_4byte_count,
+    ],
+)
+def test_round_trip(tmp_path, raw):
+    expected = pygmc.HistoryParser(data=raw).get_data()
+    path = tmp_path / "hist.col"
+    assert write_columnar(path, expected) == len(expected)
+
+    with ColumnarHistory(path) as h:
+        assert len(h) == len(expected)
+        assert h.get_data() == expected
+        assert list(h.counts) == [row[1] for row in expected]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        data_history_parser.raw_history_with_save_modes,
+        data_history_parser.raw_history_with_notes2,
+        # trailing 255's are dropped like get_data()
+        data_history_parser.raw_history_with_notes2 + b"\xff" * 20,
+        data_history_parser.raw_history_4byte_count,
+    ],
+)
+def test_parser_builds_columns(raw):
+    expected = collect_columns(pygmc.HistoryParser(data=raw).get_data())
+    h = pygmc.HistoryParser(data=raw, lazy=True)
+    assert h._get_columns() == expected
+    # no row tuples
+    assert h._data == []
+
+
+def test_smaller_than_csv(tmp_path):
+    rows = pygmc.HistoryParser(
+        data=data_history_parser.raw_history_with_notes2
+    ).get_data()
+    write_columnar(tmp_path / "hist.col", rows)
+    with open(tmp_path / "hist.csv", "w", newline="") as f:
+        pygmc.history.write_csv(f, rows, columns=pygmc.HistoryParser.columns)
+    assert os.path.getsize(tmp_path / "hist.col") < os.path.getsize(tmp_path / "hist.csv")
+
+
+def test_columns_zero_copy(tmp_path):
+    start = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    rows = [
+        (start + datetime.timedelta(seconds=i), i, "CPS", "every second", start, None)
+        for i in range(100)
+    ]
+    write_columnar(tmp_path / "hist.col", rows)
+
+    with ColumnarHistory(tmp_path / "hist.col") as h:
+        timestamps = h.timestamps
+        assert timestamps.format == "q"
+        assert timestamps.obj is h.counts.obj  # both views of the mmap
+        assert timestamps[0] == int(
+            start.replace(tzinfo=datetime.timezone.utc).timestamp()
+        )
+        assert timestamps[99] - timestamps[0] == 99
+        assert h.segments == [(0, start, "CPS", "every second")]
+        assert h.notes == {}
+        timestamps.release()
+
+
+def test_to_numpy(tmp_path):
+    np = pytest.importorskip("numpy")
+    rows = pygmc.HistoryParser(
+        data=data_history_parser.raw_history_with_notes2
+    ).get_data()
+    write_columnar(tmp_path / "hist.col", rows)
+
+    h = ColumnarHistory(tmp_path / "hist.col")
+    columns = h.to_numpy()
+    assert columns["datetime"].dtype == np.dtype("datetime64[s]")
+    assert columns["count"].tolist() == [row[1] for row in rows]
+    assert columns["datetime"][0].item() == rows[0][0]
+    assert not columns["count"].flags.owndata
+
+
+def test_not_columnar_file(tmp_path):
+    path = tmp_path / "hist.csv"
+    path.write_bytes(b"datetime,count,unit,mode,reference_datetime,notes\r\n")
+    with pytest.raises(ValueError, match="Not a pygmc columnar"):
+        ColumnarHistory(path)
+
+
+def test_cli_save_col(tmp_path):
+    path = tmp_path / "hist.col"
+    args = argparse.Namespace(
+        port=None, baudrate=None, actions="save", file_name=path, raw=False, format="col"
+    )
+    with patch("argparse.ArgumentParser.parse_args", return_value=args), patch(
+        "pygmc.cli._get_gc", return_value=_get_gc_for_save_hist_tests()
+    ):
+        cli.main()
+
+    with ColumnarHistory(path) as h:
+        assert h.get_data() == data_history_parser.raw_history_with_notes1_tidy
+        assert h.notes
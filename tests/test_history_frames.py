@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+
+import pygmc
+
+from .data import data_history_parser
+
+np = pytest.importorskip("numpy")
+
+RAW = [
+    data_history_parser.raw_history_with_save_modes,
+    data_history_parser.raw_history_with_notes2,
+    data_history_parser.raw_history_tube_selection,
+]
+
+
+@pytest.mark.parametrize("raw", RAW)
+def test_to_pandas(raw):
+    pd = pytest.importorskip("pandas")
+    expected = pygmc.HistoryParser(data=raw).get_data()
+    df = pygmc.HistoryParser(data=raw, lazy=True).to_pandas()
+
+    assert list(df.columns) == pygmc.HistoryParser.columns
+    assert df["datetime"].dtype.kind == "M"
+    assert df["count"].dtype == np.uint32
+    assert isinstance(df["unit"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["mode"].dtype, pd.CategoricalDtype)
+
+    expected_df = pd.DataFrame(expected, columns=pygmc.HistoryParser.columns)
+    assert (df["datetime"] == pd.to_datetime(expected_df["datetime"])).all()
+    assert df["count"].tolist() == expected_df["count"].tolist()
+    assert df["unit"].astype(str).tolist() == expected_df["unit"].tolist()
+    assert df["mode"].astype(str).tolist() == expected_df["mode"].tolist()
+    assert (
+        df["reference_datetime"] == pd.to_datetime(expected_df["reference_datetime"])
+    ).all()
+    assert df["notes"].tolist() == expected_df["notes"].tolist()
+
+
+@pytest.mark.parametrize("raw", RAW)
+def test_to_polars(raw):
+    pl = pytest.importorskip("polars")
+    expected = pygmc.HistoryParser(data=raw).get_data()
+    df = pygmc.HistoryParser(data=raw).to_polars()
+
+    assert df.columns == pygmc.HistoryParser.columns
+    assert df.schema["datetime"] == pl.Datetime("ms")
+    assert df.schema["count"] == pl.UInt32
+    assert df.schema["unit"] == pl.Categorical
+    assert df.rows() == expected
+
+
+def test_none_reference_datetime():
+    pd = pytest.importorskip("pandas")
+    dt = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    rows = [(dt, 1, "CPS", "every second", None, "note")]
+    df = pygmc.history_frames.to_pandas(rows)
+    assert pd.isna(df["reference_datetime"][0])
+    assert df["datetime"][0] == dt
+    assert df["notes"][0] == "note"
+
+
+def test_empty():
+    pd = pytest.importorskip("pandas")
+    df = pygmc.history_frames.to_pandas([])
+    assert len(df) == 0
+    assert list(df.columns) == pygmc.HistoryParser.columns
+    assert isinstance(df["unit"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("method", ["to_pandas", "to_polars"])
+def test_lazy_second_use_raises(method):
+    pytest.importorskip(method[3:])
+    raw = data_history_parser.raw_history_with_save_modes
+    h = pygmc.HistoryParser(data=raw, lazy=True)
+    assert len(getattr(h, method)()) == len(pygmc.HistoryParser(data=raw).get_data())
+    # source consumed, not an empty frame
+    with pytest.raises(RuntimeError, match="already consumed"):
+        getattr(h, method)()
+    with pytest.raises(RuntimeError, match="already consumed"):
+        list(h.iter_data())
+
+    # rows kept, any number of times
+    h = pygmc.HistoryParser(data=raw)
+    assert len(getattr(h, method)()) == len(getattr(h, method)())
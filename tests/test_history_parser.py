@@ -1,3 +1,11 @@
+import csv
+import datetime
+import io
+import threading
+import time
+
+import pytest
+
 import pygmc
 
 from .data import data_history_parser
@@ -45,3 +53,108 @@ def test_four_byte_count():
     # fake/synthetic data - not validated because I don't have a source to do so
     h = pygmc.HistoryParser(data_history_parser.raw_history_4byte_count)
     assert h.get_data() == data_history_parser.raw_history_4byte_count_tidy
+
+
+def _get_stream(data, chunk_size):
+    stream = pygmc.history.HistoryStream()
+    for i in range(0, len(data), chunk_size):
+        stream.put(data[i : i + chunk_size])
+    stream.put_eof()
+    return stream
+
+
+@pytest.mark.parametrize(
+    "raw_data",
+    [
+        data_history_parser.raw_history_with_save_modes,
+        data_history_parser.raw_history_with_notes2,
+        data_history_parser.raw_history_tube_selection,
+        data_history_parser.raw_history_4byte_count,
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 2048])
+def test_history_stream_same_as_bytes(raw_data, chunk_size):
+    expected = pygmc.HistoryParser(data=raw_data).get_data()
+    h = pygmc.HistoryParser(filename=_get_stream(raw_data, chunk_size))
+    assert h.get_data() == expected
+
+
+def test_history_stream_from_thread():
+    raw_data = data_history_parser.raw_history_with_save_modes
+    stream = pygmc.history.HistoryStream()
+
+    def produce():
+        for i in range(0, len(raw_data), 5):
+            stream.put(raw_data[i : i + 5])
+            time.sleep(0.001)
+        stream.put_eof()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    h = pygmc.HistoryParser(filename=stream)
+    producer.join()
+    assert h.get_data() == data_history_parser.raw_history_with_save_modes_tidy
+    assert stream.closed
+
+
+def test_history_stream_read_tell_seek():
+    stream = _get_stream(b"0123456789", 3)
+    assert stream.read(4) == b"0123"
+    assert stream.tell() == 4
+    stream.seek(3)
+    assert stream.read(2) == b"34"
+    with pytest.raises(EOFError):
+        stream.read(6)
+
+
+def test_history_stream_error():
+    stream = pygmc.history.HistoryStream()
+    stream.put(b"\x01\x02")
+    stream.put_error(TimeoutError("device unplugged"))
+    assert stream.read(2) == b"\x01\x02"
+    with pytest.raises(TimeoutError):
+        stream.read(1)
+
+
+history_data = [
+    data_history_parser.raw_history_with_save_modes,
+    data_history_parser.raw_history_with_notes2,
+    data_history_parser.raw_history_tube_selection,
+    data_history_parser.raw_history_3byte_count,
+    # a run of 255 that isn't the end of data
+    data_history_parser.raw_history_with_save_modes[:50] + b"\xff" * 60 + b"\x01",
+]
+
+
+@pytest.mark.parametrize("raw_data", history_data)
+def test_iter_data_lazy(raw_data):
+    expected = pygmc.HistoryParser(data=raw_data).get_data()
+    h = pygmc.HistoryParser(data=raw_data, lazy=True)
+    assert list(h.iter_data()) == expected
+    # not kept
+    assert h.get_data() == []
+    with pytest.raises(RuntimeError, match="already consumed"):
+        list(h.iter_data())
+
+
+@pytest.mark.parametrize("raw_data", history_data)
+def test_write_csv_same_as_writerows(raw_data):
+    h = pygmc.HistoryParser(data=raw_data)
+    expected = io.StringIO()
+    csv.writer(expected).writerows([h.get_columns(), *h.get_data()])
+
+    result = io.StringIO()
+    rows = pygmc.HistoryParser(data=raw_data, lazy=True).iter_data()
+    pygmc.history.write_csv(result, rows, columns=h.get_columns(), chunk_size=3)
+    assert result.getvalue() == expected.getvalue()
+
+
+def test_datetime_formatter():
+    format_datetime = pygmc.history._DatetimeFormatter()
+    dt = datetime.datetime(2023, 12, 31, 23, 58, 0)
+    for _ in range(200):
+        dt += datetime.timedelta(seconds=7)
+        assert format_datetime(dt) == str(dt)
+    dt = datetime.datetime(2023, 12, 31, 23, 58, 0, 5)
+    assert format_datetime(dt) == str(dt)
+    assert format_datetime(None) is None
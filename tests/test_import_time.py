@@ -0,0 +1,64 @@
+"""
+Import-time benchmark/guard.
+
+`import pygmc` & the CLI are used from cron & shell loops - keep them light-weight.
+Run `invoke importtime` for the full report.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import pygmc
+
+
+def _get_imported_modules(code) -> dict:
+    """Run code in a fresh interpreter, return {module: cumulative import time us}."""
+    result = subprocess.run(  # noqa: S603 - our own interpreter & code
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        # e.g. "import time:       471 |      53304 |   pygmc.connection"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_import_pygmc_is_light():
+    modules = _get_imported_modules("import pygmc")
+    took = f"import pygmc took {modules['pygmc'] / 1000:.1f} ms"
+    heavy = [x for x in modules if x.startswith(("serial", "pygmc.devices"))]
+    assert heavy == [], took
+    assert "pygmc.history" not in modules, took
+
+
+def test_cli_usb_does_not_import_discovery():
+    modules = _get_imported_modules("import pygmc.cli as c; c.main(['usb'])")
+    assert "serial.tools.list_ports" in modules  # needed
+    assert "pygmc.connection.discovery" not in modules
+    assert "pygmc.connection.udev_rule_check" not in modules
+    assert "pygmc.devices" not in modules
+
+
+def test_cli_help_is_light():
+    modules = _get_imported_modules("import pygmc.cli")
+    assert not [x for x in modules if x.startswith("serial")]
+
+
+def test_lazy_attributes():
+    assert pygmc.GMC500Plus is pygmc.devices.GMC500Plus
+    assert pygmc.Discovery is pygmc.connection.discovery.Discovery
+    assert pygmc.HistoryParser is pygmc.history.HistoryParser
+    assert "GMC800" in dir(pygmc)
+    assert "watcher" in dir(pygmc.connection)
+    with pytest.raises(AttributeError):
+        pygmc.GMC9000  # noqa: B018
+    with pytest.raises(AttributeError):
+        pygmc.connection.nope  # noqa: B018
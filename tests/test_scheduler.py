@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+import pygmc
+from pygmc import scheduler
+
+from .data import data_gmc500_plus
+from .mocks import MockConnection
+
+
+class _FakeClock:
+    """Time only moves when the scheduler waits or a device read 'takes' time."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.now += seconds
+        return False
+
+
+class _FakeDevice:
+    def __init__(self, clock, read_time=0.0):
+        self.clock = clock
+        self.read_time = read_time
+        self.calls = []
+
+    def get_snapshot_fields(self):
+        return ["cpm", "voltage", "usv_h"]
+
+    def get_snapshot(self, fields):
+        self.calls.append(("snapshot", self.clock.now, list(fields)))
+        self.clock.now += self.read_time
+        snapshot = {"timestamp": self.clock.now}
+        snapshot.update({x: 1 for x in fields})
+        return snapshot
+
+    def get_config(self):
+        self.calls.append(("config", self.clock.now))
+        return {"Power": 0}
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _run(sched, clock, until):
+    sched._stop.wait = clock.wait
+    results = []
+    # poll everything due up to (incl.) until
+    while sched._heap[0][0] <= until:
+        results.extend(sched.poll_due())
+    return results
+
+
+def test_multi_rate(clock):
+    sched = scheduler.PollScheduler()
+    device = _FakeDevice(clock)
+    sched.add(device, {"cpm": 1, "voltage": 5, "config": 10}, name="gmc")
+
+    results = _run(sched, clock, until=1000 + 10.5)
+
+    snapshots = [x for x in device.calls if x[0] == "snapshot"]
+    assert [x[1] - 1000 for x in snapshots] == list(range(11))
+    # due together -> one exchange
+    assert snapshots[0] == ("snapshot", 1000.0, ["cpm", "voltage"])
+    assert snapshots[1] == ("snapshot", 1001.0, ["cpm"])
+    assert snapshots[5] == ("snapshot", 1005.0, ["cpm", "voltage"])
+    assert [x[1] - 1000 for x in device.calls if x[0] == "config"] == [0, 10]
+    assert results[0].device == "gmc"
+    assert results[0].values == {"cpm": 1, "voltage": 1, "config": {"Power": 0}}
+
+
+def test_jitter_does_not_drift(clock):
+    sched = scheduler.PollScheduler()
+    device = _FakeDevice(clock, read_time=0.3)
+    sched.add(device, {"cpm": 1})
+
+    _run(sched, clock, until=1000 + 20.5)
+
+    assert [x[1] - 1000 for x in device.calls] == pytest.approx(list(range(21)))
+
+
+def test_overdue_polls_are_skipped(clock):
+    sched = scheduler.PollScheduler()
+    device = _FakeDevice(clock, read_time=2.5)
+    sched.add(device, {"cpm": 1})
+
+    _run(sched, clock, until=1000 + 9)
+
+    # each late poll runs once (not once per missed second) ...
+    assert [x[1] - 1000 for x in device.calls] == [0, 2.5, 5, 7.5, 10]
+    # ... and the schedule stays on the 1 second grid
+    assert sched._heap[0][0] == 1000 + 11
+
+
+def test_several_devices(clock):
+    sched = scheduler.PollScheduler()
+    device_a = _FakeDevice(clock)
+    device_b = _FakeDevice(clock)
+    sched.add(device_a, {"cpm": 1})
+    sched.add(device_b, {"cpm": 2})
+
+    results = _run(sched, clock, until=1000 + 4.5)
+
+    assert len(device_a.calls) == 5
+    assert len(device_b.calls) == 3
+    assert {x.device for x in results} == {"device-0", "device-1"}
+
+
+def test_add_validation():
+    sched = scheduler.PollScheduler()
+    gc = pygmc.GMC500Plus(
+        None, connection=MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    )
+    sched.add(gc, {"cpm": 1}, name="gmc")
+    with pytest.raises(ValueError):
+        sched.add(gc, {"cpm": 1}, name="gmc")
+    with pytest.raises(ValueError):
+        sched.add(gc, {"nope": 1})
+    with pytest.raises(ValueError):
+        sched.add(gc, {"cpm": 0})
+
+
+def test_failed_poll_keeps_running(clock):
+    sched = scheduler.PollScheduler()
+    device = _FakeDevice(clock)
+    device.get_config = None  # not callable -> poll fails
+    sched.add(device, {"config": 1})
+    assert _run(sched, clock, until=1000 + 2.5) == []
+
+
+def test_start_stop_with_device():
+    sched = scheduler.PollScheduler()
+    gc = pygmc.GMC500Plus(
+        None, connection=MockConnection(data_gmc500_plus.gets_cmd_response_map)
+    )
+    sched.add(gc, {"cpm": 0.01, "datetime": 0.02})
+    results = []
+    got_three = threading.Event()
+
+    def callback(result):
+        results.append(result)
+        if len(results) >= 3:
+            got_three.set()
+
+    sched.start(callback)
+    assert got_three.wait(5)
+    sched.stop()
+    assert results[0].values["cpm"] == 1210
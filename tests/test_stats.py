@@ -0,0 +1,90 @@
+import random
+import statistics
+
+import pytest
+
+import pygmc
+from pygmc import stats
+
+from .mocks import MockConnection
+
+
+def _slope(values):
+    n = len(values)
+    if n < 2:
+        return 0.0
+    x_mean = (n - 1) / 2
+    y_mean = sum(values) / n
+    num = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(values))
+    den = sum((i - x_mean) ** 2 for i in range(n))
+    return num / den
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 60])
+def test_window_matches_naive(size):
+    rng = random.Random(size)  # noqa: S311 - not crypto
+    window = stats.RollingWindow(size)
+    seen = []
+    for _ in range(size * 3 + 5):
+        value = rng.randint(0, 500)
+        window.add(value)
+        seen.append(value)
+        expected = seen[-size:]
+
+        assert window.get_values() == expected
+        assert window.count == len(expected)
+        assert window.sum == sum(expected)
+        assert window.mean == pytest.approx(statistics.mean(expected))
+        assert window.variance == pytest.approx(statistics.pvariance(expected))
+        assert window.slope == pytest.approx(_slope(expected))
+
+
+def test_window_empty():
+    window = stats.RollingWindow(3)
+    assert window.mean == 0.0
+    assert window.variance == 0.0
+    assert window.slope == 0.0
+    assert window.get_values() == []
+    with pytest.raises(ValueError):
+        stats.RollingWindow(0)
+
+
+def test_rising_counts_slope():
+    window = stats.RollingWindow(10)
+    for cps in range(100):
+        window.add(2 * cps + 5)
+    assert window.slope == pytest.approx(2.0)
+
+
+def test_rolling_stats():
+    rolling = stats.RollingStats(windows=(2, 4))
+    for cps in [1, 2, 3, 4, 5]:
+        rolling.add(cps)
+    result = rolling.get_stats()
+    assert result[2]["sum"] == 9
+    assert result[4]["sum"] == 14
+    assert result[4]["mean"] == 3.5
+    assert rolling.total == 15
+    assert rolling.max == 5
+    assert rolling.count == 5
+
+
+def test_default_windows():
+    rolling = stats.RollingStats()
+    for _ in range(61):
+        rolling.add(1)
+    result = rolling.get_stats()
+    assert result[60]["sum"] == 60  # moving CPM
+    assert result[600]["count"] == 61
+    assert list(result) == [60, 600, 3600]
+
+
+def test_feed_heartbeat():
+    connection = MockConnection({b"<HEARTBEAT1>>": b"\x00\x00\x00\x02"})
+    gc = pygmc.devices.DeviceRFC1801(connection)
+    rolling = stats.RollingStats(windows=(60,))
+    assert list(rolling.feed(gc.heartbeat_live(count=3))) == [2, 2, 2]
+    assert rolling.get_stats()[60]["sum"] == 6
+    samples = list(rolling.feed(gc.heartbeat_samples(count=2)))
+    assert samples[0].cps == 2
+    assert rolling.total == 10
@@ -0,0 +1,134 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import pygmc
+from pygmc.store import SqliteStore
+
+from ..data import data_history_parser
+
+RAW = data_history_parser.raw_history_with_notes2
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SqliteStore(tmp_path / "history.db", batch_size=7) as store:
+        yield store
+
+
+def test_ingest_query(store):
+    expected = pygmc.HistoryParser(data=RAW).get_data()
+    assert store.ingest("0123", expected) == len(expected)
+    assert [row[1:] for row in store.query()] == expected
+    assert store.get_serials() == ["0123"]
+
+
+def test_ingest_idempotent(store):
+    rows = pygmc.HistoryParser(data=RAW).get_data()
+    store.ingest_raw("0123", RAW)
+    assert store.ingest_raw("0123", RAW) == 0
+    # overlapping dump
+    assert store.ingest("0123", rows[: len(rows) // 2]) == 0
+    # another device, same times
+    assert store.ingest("4567", rows) == len(rows)
+    assert len(list(store.query())) == 2 * len(rows)
+    assert [row[1:] for row in store.query(serial="4567")] == rows
+
+
+def test_query_time_range(store):
+    start = datetime.datetime(2024, 1, 1)
+    rows = [
+        (start + datetime.timedelta(minutes=i), i, "CPM", "every minute", start, None)
+        for i in range(60)
+    ]
+    store.ingest("0123", rows)
+    result = list(
+        store.query(
+            serial="0123",
+            start=start + datetime.timedelta(minutes=10),
+            end=start + datetime.timedelta(minutes=20),
+        )
+    )
+    assert [row[2] for row in result] == list(range(10, 20))
+
+
+def test_ingest_source_error_imports_nothing(store):
+    rows = pygmc.HistoryParser(data=RAW).get_data()
+
+    def unplugged():
+        yield from rows[:20]
+        raise TimeoutError("device unplugged")
+
+    with pytest.raises(TimeoutError):
+        store.ingest("0123", unplugged())
+    assert list(store.query()) == []
+
+
+def test_ingest_write_error_keeps_committed_batches(store, monkeypatch):
+    rows = pygmc.HistoryParser(data=RAW).get_data()
+    executemany = store._db.executemany
+    calls = []
+
+    class Db:
+        # sqlite3.Connection attributes are read-only, wrap it
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        def __enter__(self):
+            return db.__enter__()
+
+        def __exit__(self, *args):
+            return db.__exit__(*args)
+
+        def executemany(self, sql, params):
+            calls.append(sql)
+            if len(calls) == 3:
+                raise sqlite3.OperationalError("disk I/O error")
+            return executemany(sql, params)
+
+    db = store._db
+    monkeypatch.setattr(store, "_db", Db())
+    with pytest.raises(sqlite3.OperationalError):
+        store.ingest("0123", rows)
+    monkeypatch.setattr(store, "_db", db)
+    # whole batches of 7
+    assert [row[1:] for row in store.query()] == rows[:14]
+    # import again adds the rest
+    assert store.ingest("0123", rows) == len(rows) - 14
+
+
+def test_ingest_history_data_with_column_names(store):
+    rows = pygmc.HistoryParser(data=RAW).get_data()
+    history = [list(pygmc.HistoryParser.columns)] + rows
+    assert store.ingest("0123", history) == len(rows)
+    assert [row[1:] for row in store.query()] == rows
+
+
+def test_ingest_does_not_lock_while_reading_rows(store, tmp_path):
+    rows = pygmc.HistoryParser(data=RAW).get_data()
+    other = sqlite3.connect(str(tmp_path / "history.db"), timeout=0)
+
+    def slow_download():
+        for i, row in enumerate(rows):
+            if i == 10:
+                # e.g. another process writing mid download
+                with other:
+                    other.execute("INSERT INTO devices (serial) VALUES ('4567')")
+            yield row
+
+    assert store.ingest("0123", slow_download()) == len(rows)
+    other.close()
+    assert sorted(store.get_serials()) == ["0123", "4567"]
+
+
+def test_wal_mode(tmp_path):
+    path = tmp_path / "history.db"
+    SqliteStore(path).close()
+    db = sqlite3.connect(str(path))
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM history WHERE timestamp >= 0"
+    ).fetchall()
+    assert "history_timestamp" in str(plan)
+    db.close()